@@ -0,0 +1,41 @@
+"""
+Gunicorn configuration for the Real Estate RAG API server
+Run from the api directory: gunicorn -c gunicorn_conf.py server:app
+"""
+import os
+import subprocess
+import sys
+
+bind = os.getenv("RAG_BIND", "0.0.0.0:5000")
+
+# gevent workers switch to another request while one waits on the Gemini API,
+# disk or network, so a single worker serves many queries at once.
+# Gunicorn monkey-patches the worker itself before the app is imported.
+worker_class = os.getenv("RAG_WORKER_CLASS", "gevent")
+worker_connections = 1000
+
+# Each worker loads its own RealEstateRAG (embeddings model + index), and index
+# changes made through the API (ingest, delete, MahaRERA update) only reach the
+# worker that handled them - keep one worker unless the index is read-only
+workers = int(os.getenv("RAG_WEB_WORKERS", "1"))
+
+# Reindex / MahaRERA update requests run OCR and can take minutes
+timeout = int(os.getenv("RAG_WORKER_TIMEOUT", "900"))
+
+
+def on_starting(arbiter):
+    """Index new PDFs once, before any worker loads the index"""
+    # Run in a child process so the master stays free of torch/PaddleOCR and
+    # forks clean workers
+    print("\nChecking for new documents to index...")
+    result = subprocess.run(
+        [sys.executable, "-c", "from auto_indexer import auto_index_on_startup; auto_index_on_startup()"]
+    )
+    if result.returncode != 0:
+        print(f"WARNING: Auto-indexing skipped (exit code {result.returncode})")
+
+
+def post_worker_init(worker):
+    """Load the RAG system in each worker"""
+    from server import initialize_rag
+    initialize_rag()
@@ -2,18 +2,112 @@
 Flask API Server for Real Estate RAG System
 Provides REST API endpoints for the web UI
 """
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import hashlib
+import logging
 import os
 import json
+import threading
+import time
+import traceback
+import uuid
+
+try:
+    import numpy as np  # optional - near-duplicate question matching in the query cache
+except ImportError:
+    np = None
+
+try:
+    import psutil  # optional - memory usage in /api/status
+except ImportError:
+    psutil = None
+
+try:
+    from flask_compress import Compress  # optional - brotli/gzip compressed responses
+except ImportError:
+    Compress = None
+
+try:
+    import gevent  # optional - present when running under gunicorn's gevent workers
+    from gevent import monkey as gevent_monkey
+except ImportError:
+    gevent = None
+
+try:
+    import orjson  # optional - much faster JSON responses and request parsing
+    from flask.json.provider import DefaultJSONProvider  # Flask 2.2+
+except ImportError:
+    orjson = None
+
+# RAG engine progress is logged (not printed); show it at INFO like the server's output
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend
 
-# Global RAG instance
+# Largest request body accepted (larger ones get 413 before being read)
+MAX_REQUEST_BYTES = 1024 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
+
+if Compress is not None:
+    # Compress JSON and static responses over 1 KiB for clients accepting br or gzip
+    # (the text/event-stream answer stream is not a compressed type, so events still
+    # go out as they are generated)
+    app.config.update(COMPRESS_ALGORITHM=['br', 'gzip'], COMPRESS_MIN_SIZE=1024, COMPRESS_LEVEL=5)
+    Compress(app)
+
+if orjson is not None:
+    class ORJSONProvider(DefaultJSONProvider):
+        """Flask JSON provider backed by orjson (jsonify, request.json)"""
+        
+        def dumps(self, obj, **kwargs):
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            if kwargs.get('sort_keys', self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            try:
+                return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+            except TypeError:  # e.g. integers beyond 64 bits
+                return super().dumps(obj, **kwargs)
+        
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+    
+    app.json = ORJSONProvider(app)
+
+# Global RAG instance. It is never modified once published: writers hold _rag_lock,
+# change a separate copy (load_rag_copy), save it and then swap it in. Request
+# handlers read rag_system once into a local without locking, so a concurrent
+# swap can't change it mid-request
 rag_system = None
+_rag_lock = threading.RLock()
 INDEX_PATH = "realestate_index"
 
+# Serialized document list responses by endpoint: (rag_system, index_version, body, etag).
+# The frontend polls these, so they are rebuilt only when the index changes
+_list_cache = {}
+
+# psutil memory sample reused by /api/status for MEMORY_SAMPLE_TTL seconds, and the
+# psutil.Process it was read from (recreated if this is a forked worker)
+MEMORY_SAMPLE_TTL = 1.0
+_memory_cache = {'expires': 0.0, 'info': None, 'process': None}
+
+# /api/query response bodies for the current index, most recently used last.
+# 'exact' is keyed on the normalized question + filters; 'semantic' maps the same
+# keys to (filters, question embedding) for rag_settings.query_cache_similarity
+_query_cache = {'rag': None, 'version': None, 'exact': OrderedDict(), 'semantic': OrderedDict()}
+_query_cache_lock = threading.Lock()
+
+# Background jobs (reindex, MahaRERA update) by id, polled through /api/jobs/<id>;
+# only the most recent MAX_JOBS are kept. Jobs run one at a time since each
+# one modifies the index
+MAX_JOBS = 50
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+_index_job_lock = threading.Lock()
+
 
 def initialize_rag():
     """Initialize or load RAG system"""
@@ -24,43 +118,131 @@ def initialize_rag():
     
     if os.path.exists(INDEX_PATH):
         print("Loading existing index...")
-        rag_system = RealEstateRAG(use_llm=True)
-        print(f"   Before load: {len(rag_system.documents)} documents")
-        rag_system.load_index(INDEX_PATH)
-        print(f"   After load: {len(rag_system.documents)} documents")
-        print(f"Loaded {len(rag_system.documents)} documents")
+        rag = RealEstateRAG(use_llm=True)
+        print(f"   Before load: {len(rag.documents)} documents")
+        rag.load_index(INDEX_PATH)
+        print(f"   After load: {len(rag.documents)} documents")
+        print(f"Loaded {len(rag.documents)} documents")
     else:
         print("WARNING: No index found. Please ingest documents first.")
         print("   Run: python realestate_chatbot.py ingest <folder>")
-        rag_system = None
+        rag = None
+    
+    with _rag_lock:
+        rag_system = rag
+
+
+def load_rag_copy(path=INDEX_PATH):
+    """
+    A separate RealEstateRAG loaded from the index saved at path, for a writer to modify,
+    save and publish (a new empty one if there is no saved index). Call with _rag_lock held
+    """
+    from realestate_rag import RealEstateRAG
+    
+    rag = RealEstateRAG(use_llm=True)
+    if os.path.exists(path):
+        rag.load_index(path)
+    return rag
+
+
+def cached_list_response(rag, name, build):
+    """Return build()'s JSON for the current index, cached until the index changes, with an ETag"""
+    entry = _list_cache.get(name)
+    if entry is None or entry[0] is not rag or entry[1] != rag.index_version:
+        body = app.json.dumps(build()).encode('utf-8')
+        entry = (rag, rag.index_version, body, hashlib.blake2b(body, digest_size=8).hexdigest())
+        _list_cache[name] = entry
+    
+    response = Response(entry[2], mimetype='application/json')
+    response.set_etag(entry[3])
+    # Answers 304 Not Modified when the browser already has this version
+    return response.make_conditional(request)
+
+
+def read_json_body():
+    """The request body parsed as a JSON object (by orjson when installed), or None"""
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else None
+
+
+@app.errorhandler(413)
+def request_too_large(error):
+    """JSON error for bodies over MAX_REQUEST_BYTES"""
+    return jsonify({'error': f'Request body too large (max {MAX_REQUEST_BYTES} bytes)'}), 413
+
+
+def start_job(kind, target):
+    """Run target() in a background OS thread and answer 202 Accepted with the job id"""
+    job_id = uuid.uuid4().hex
+    job = {'id': job_id, 'type': kind, 'state': 'queued', 'created': time.time(), 'result': None}
+    with _jobs_lock:
+        _jobs[job_id] = job
+        while len(_jobs) > MAX_JOBS:
+            _jobs.popitem(last=False)
+    
+    def run():
+        with _index_job_lock:
+            job['state'] = 'running'
+            try:
+                job['result'] = target()
+                job['state'] = 'done'
+            except Exception as e:
+                print(f"ERROR: {kind} job failed: {str(e)}")
+                traceback.print_exc()
+                job['result'] = {'success': False, 'message': f'Error: {str(e)}'}
+                job['state'] = 'failed'
+            job['finished'] = time.time()
+    
+    if gevent is not None and gevent_monkey.is_module_patched('threading'):
+        # Under gevent a threading.Thread is a greenlet, and a CPU-bound job (OCR,
+        # embedding) would stall every request in the worker until it finished;
+        # run it on the hub's pool of real OS threads instead
+        gevent.get_hub().threadpool.spawn(run)
+    else:
+        threading.Thread(target=run, name=f"{kind}-{job_id[:8]}", daemon=True).start()
+    return jsonify({'job_id': job_id, 'state': job['state'], 'status_url': f'/api/jobs/{job_id}'}), 202
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the state ('queued', 'running', 'done', 'failed') and result of a background job"""
+    job = _jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+    return jsonify(job)
 
 
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """Get server status, document count, and memory usage"""
-    if rag_system:
-        # Get memory usage for large dataset monitoring
-        import sys
-        memory_info = {}
-        try:
-            import psutil
-            process = psutil.Process()
-            memory_info = {
-                'memory_mb': round(process.memory_info().rss / (1024 * 1024), 1),
-                'memory_percent': round(process.memory_percent(), 1)
-            }
-        except ImportError:
-            memory_info = {'memory_mb': 'N/A (install psutil for monitoring)'}
+    rag = rag_system
+    if rag:
+        # Get memory usage for large dataset monitoring (sampled at most once per TTL)
+        now = time.monotonic()
+        memory_info = _memory_cache['info']
+        if memory_info is None or now >= _memory_cache['expires']:
+            if psutil is not None:
+                process = _memory_cache['process']
+                if process is None or process.pid != os.getpid():
+                    process = _memory_cache['process'] = psutil.Process()
+                memory_info = {
+                    'memory_mb': round(process.memory_info().rss / (1024 * 1024), 1),
+                    'memory_percent': round(process.memory_percent(), 1)
+                }
+            else:
+                memory_info = {'memory_mb': 'N/A (install psutil for monitoring)'}
+            _memory_cache['info'] = memory_info
+            _memory_cache['expires'] = now + MEMORY_SAMPLE_TTL
         
         return jsonify({
             'status': 'ready',
-            'documents': len(rag_system.documents),
-            'chunks': len(rag_system.chunk_to_doc),
-            'llm_available': rag_system.llm is not None,
+            'documents': len(rag.documents),
+            'chunks': len(rag.chunk_to_doc),
+            'llm_available': rag.llm is not None,
             'memory': memory_info,
             'scalability': {
                 'max_recommended_docs': 10000,
-                'current_load_percent': round(len(rag_system.documents) / 100, 1)  # Percentage of 10k
+                'current_load_percent': round(len(rag.documents) / 100, 1)  # Percentage of 10k
             }
         })
     else:
@@ -74,14 +256,15 @@ def get_status():
 @app.route('/api/usage', methods=['GET'])
 def get_api_usage():
     """Get API usage statistics"""
-    if not rag_system or not rag_system.llm:
+    rag = rag_system
+    if not rag or not rag.llm:
         return jsonify({
             'error': 'LLM not available',
             'usage': None
         })
     
     try:
-        usage = rag_system.llm.get_usage_stats()
+        usage = rag.llm.get_usage_stats()
         return jsonify({
             'success': True,
             'usage': usage
@@ -96,11 +279,12 @@ def get_api_usage():
 @app.route('/api/usage/reset', methods=['POST'])
 def reset_api_usage():
     """Reset API usage statistics"""
-    if not rag_system or not rag_system.llm:
+    rag = rag_system
+    if not rag or not rag.llm:
         return jsonify({'error': 'LLM not available'})
     
     try:
-        rag_system.llm.reset_usage_stats()
+        rag.llm.reset_usage_stats()
         return jsonify({'success': True, 'message': 'Usage stats reset'})
     except Exception as e:
         return jsonify({'error': str(e)})
@@ -109,140 +293,141 @@ def reset_api_usage():
 @app.route('/api/documents', methods=['GET'])
 def get_documents():
     """Get list of indexed documents with character counts (excludes authority docs)"""
-    if not rag_system:
+    rag = rag_system
+    if not rag:
         return jsonify({'documents': [], 'message': 'No documents loaded yet'})
     
-    documents = []
-    for doc in rag_system.documents:
-        # Skip authority documents - they have their own endpoint
-        if doc.get('source_type') == 'AUTHORITY':
-            continue
-        documents.append({
-            'filename': doc['filename'],
-            'char_count': doc.get('char_count', len(doc.get('text', ''))),
-            'chunks': len(doc.get('chunks', []))
-        })
+    def build():
+        documents = []
+        for doc in rag.documents:
+            # Skip authority documents - they have their own endpoint
+            if doc.get('source_type') == 'AUTHORITY':
+                continue
+            documents.append({
+                'filename': doc['filename'],
+                'char_count': doc.get('char_count', len(doc.get('text', ''))),
+                'chunks': len(doc.get('chunks', []))
+            })
+        return {'documents': documents}
     
-    return jsonify({'documents': documents})
+    return cached_list_response(rag, 'documents', build)
 
 
 @app.route('/api/maharera', methods=['GET'])
 def get_maharera_documents():
     """Get list of indexed MahaRERA/authority documents"""
-    if not rag_system:
+    rag = rag_system
+    if not rag:
         return jsonify({'documents': [], 'message': 'No documents loaded yet'})
     
-    documents = []
-    for doc in rag_system.documents:
-        # Only include authority documents
-        if doc.get('source_type') != 'AUTHORITY':
-            continue
-        # Title and date are stored directly on document, not in metadata
-        documents.append({
-            'filename': doc.get('filename', 'Unknown'),
-            'title': doc.get('title', doc.get('filename', 'Unknown')),
-            'doc_type': doc.get('doc_type', 'unknown'),
-            'date': doc.get('date', 'Unknown'),
-            'char_count': doc.get('char_count', len(doc.get('text', ''))),
-            'chunks': len(doc.get('chunks', [])),
-            'precedence': doc.get('precedence', 0)
-        })
+    def build():
+        documents = []
+        for doc in rag.documents:
+            # Only include authority documents
+            if doc.get('source_type') != 'AUTHORITY':
+                continue
+            # Title and date are stored directly on document, not in metadata
+            documents.append({
+                'filename': doc.get('filename', 'Unknown'),
+                'title': doc.get('title', doc.get('filename', 'Unknown')),
+                'doc_type': doc.get('doc_type', 'unknown'),
+                'date': doc.get('date', 'Unknown'),
+                'char_count': doc.get('char_count', len(doc.get('text', ''))),
+                'chunks': len(doc.get('chunks', [])),
+                'precedence': doc.get('precedence', 0)
+            })
+        
+        # Sort by precedence (highest first), then by date
+        documents.sort(key=lambda x: (-x['precedence'], x['date'] or ''), reverse=False)
+        return {'documents': documents}
+    
+    return cached_list_response(rag, 'maharera', build)
+
+
+def run_maharera_update():
+    """Run the MahaRERA scraper and add new compliance documents to the index (job body)"""
+    from scraper import MahaRERA_FullScraper
+    from document_processor import DocumentProcessor
+    from auto_indexer import INDEX_PATH
+    
+    print("\nMahaRERA update triggered from frontend...")
     
-    # Sort by precedence (highest first), then by date
-    documents.sort(key=lambda x: (-x['precedence'], x['date'] or ''), reverse=False)
+    # Run scraper
+    scraper = MahaRERA_FullScraper()
+    scraped = scraper.run(dry_run=False) or []
     
-    return jsonify({'documents': documents})
+    if not scraped:
+        return {
+            'success': True,
+            'message': 'No new MahaRERA documents found',
+            'new_docs': 0
+        }
+    
+    # Process and add to index
+    processor = DocumentProcessor()
+    authority_docs = []
+    
+    for adoc in scraped:
+        try:
+            if not adoc.get('text') or not adoc.get('filename'):
+                continue
+            chunks = processor.chunk_text(adoc['text'])
+            if not chunks:
+                continue
+            authority_docs.append({
+                'filename': adoc['filename'],
+                'text': adoc['text'],
+                'chunks': chunks,
+                'source_type': adoc.get('source_type'),
+                'authority': adoc.get('authority'),
+                'doc_type': adoc.get('doc_type'),
+                'precedence': adoc.get('precedence'),
+                'metadata': {
+                    'title': adoc.get('title'),
+                    'date': adoc.get('date'),
+                    'url': adoc.get('url'),
+                    'num_chunks': len(chunks),
+                    'text_length': len(adoc['text'])
+                }
+            })
+        except Exception as e:
+            print(f"WARNING: Failed to process {adoc.get('filename','unknown')}: {e}")
+    
+    if not authority_docs:
+        return {
+            'success': True,
+            'message': 'No valid MahaRERA documents to add',
+            'new_docs': 0
+        }
+    
+    global rag_system
+    
+    with _rag_lock:
+        if rag_system:
+            # Add to a copy of the loaded index: only the new chunks are embedded, and
+            # older versions of the same filenames are removed first
+            rag = load_rag_copy(INDEX_PATH)
+            replaced = [d['filename'] for d in authority_docs if d['filename'] in rag.documents_by_name]
+            rag.upsert_documents(authority_docs, delete_filenames=replaced)
+        else:
+            from realestate_rag import RealEstateRAG
+            rag = RealEstateRAG(use_llm=True)
+            rag.index_documents(authority_docs)
+        rag.save_index(INDEX_PATH)
+        rag_system = rag
+    
+    return {
+        'success': True,
+        'message': f'Successfully added {len(authority_docs)} MahaRERA document(s)',
+        'new_docs': len(authority_docs),
+        'total_docs': len(rag.documents)
+    }
 
 
 @app.route('/api/maharera/update', methods=['POST'])
 def update_maharera():
-    """Trigger MahaRERA scraper to fetch new compliance documents"""
-    try:
-        from scraper import MahaRERA_FullScraper
-        from document_processor import DocumentProcessor
-        from auto_indexer import INDEX_PATH
-        import json
-        
-        print("\nMahaRERA update triggered from frontend...")
-        
-        # Run scraper
-        scraper = MahaRERA_FullScraper()
-        scraped = scraper.run(dry_run=False) or []
-        
-        if not scraped:
-            return jsonify({
-                'success': True,
-                'message': 'No new MahaRERA documents found',
-                'new_docs': 0
-            })
-        
-        # Process and add to index
-        processor = DocumentProcessor()
-        authority_docs = []
-        
-        for adoc in scraped:
-            try:
-                if not adoc.get('text') or not adoc.get('filename'):
-                    continue
-                chunks = processor.chunk_text(adoc['text'])
-                if not chunks:
-                    continue
-                authority_docs.append({
-                    'filename': adoc['filename'],
-                    'text': adoc['text'],
-                    'chunks': chunks,
-                    'source_type': adoc.get('source_type'),
-                    'authority': adoc.get('authority'),
-                    'doc_type': adoc.get('doc_type'),
-                    'precedence': adoc.get('precedence'),
-                    'metadata': {
-                        'title': adoc.get('title'),
-                        'date': adoc.get('date'),
-                        'url': adoc.get('url'),
-                        'num_chunks': len(chunks),
-                        'text_length': len(adoc['text'])
-                    }
-                })
-            except Exception as e:
-                print(f"WARNING: Failed to process {adoc.get('filename','unknown')}: {e}")
-        
-        if not authority_docs:
-            return jsonify({
-                'success': True,
-                'message': 'No valid MahaRERA documents to add',
-                'new_docs': 0
-            })
-        
-        # Clear and reindex
-        global rag_system
-        
-        # Get existing docs (excluding old authority docs with same filenames)
-        new_filenames = {d['filename'] for d in authority_docs}
-        existing_docs = [d for d in rag_system.documents if d['filename'] not in new_filenames]
-        
-        # Rebuild index with merged docs
-        all_docs = existing_docs + authority_docs
-        
-        from realestate_rag import RealEstateRAG
-        rag_system = RealEstateRAG(use_llm=True)
-        rag_system.index_documents(all_docs)
-        rag_system.save_index(INDEX_PATH)
-        
-        return jsonify({
-            'success': True,
-            'message': f'Successfully added {len(authority_docs)} MahaRERA document(s)',
-            'new_docs': len(authority_docs),
-            'total_docs': len(all_docs)
-        })
-        
-    except Exception as e:
-        print(f"ERROR: MahaRERA update failed: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({
-            'success': False,
-            'message': f'Error: {str(e)}'
-        }), 500
+    """Trigger MahaRERA scraper to fetch new compliance documents (returns 202 with a job id)"""
+    return start_job('maharera_update', run_maharera_update)
 
 
 @app.route('/api/maharera/delete', methods=['POST'])
@@ -252,42 +437,37 @@ def delete_all_maharera():
     
     try:
         from auto_indexer import INDEX_PATH
-        from realestate_rag import RealEstateRAG
-        
-        if not rag_system:
-            return jsonify({
-                'success': False,
-                'message': 'No RAG system loaded'
-            }), 400
-        
-        print("\nDeleting all MahaRERA documents...")
-        
-        # Count authority docs before deletion
-        authority_count = sum(1 for doc in rag_system.documents if doc.get('source_type') == 'AUTHORITY')
-        
-        if authority_count == 0:
-            return jsonify({
-                'success': True,
-                'message': 'No MahaRERA documents to delete',
-                'deleted': 0
-            })
-        
-        # Filter out authority documents, keep only user docs
-        user_docs = [doc for doc in rag_system.documents if doc.get('source_type') != 'AUTHORITY']
-        
-        print(f"Removing {authority_count} authority documents, keeping {len(user_docs)} user documents")
-        
-        # Rebuild index with only user documents
-        rag_system = RealEstateRAG(use_llm=True)
         
-        if user_docs:
-            rag_system.index_documents(user_docs)
-            rag_system.save_index(INDEX_PATH)
-        else:
-            # No docs left, just save empty state
-            rag_system.documents = []
-            rag_system.chunk_to_doc = {}
-            rag_system.save_index(INDEX_PATH)
+        with _rag_lock:
+            if not rag_system:
+                return jsonify({
+                    'success': False,
+                    'message': 'No RAG system loaded'
+                }), 400
+            
+            print("\nDeleting all MahaRERA documents...")
+            
+            # Find authority docs before deletion
+            authority_filenames = [doc.get('filename') for doc in rag_system.documents if doc.get('source_type') == 'AUTHORITY']
+            authority_count = len(authority_filenames)
+            
+            if authority_count == 0:
+                return jsonify({
+                    'success': True,
+                    'message': 'No MahaRERA documents to delete',
+                    'deleted': 0
+                })
+            
+            remaining = len(rag_system.documents) - authority_count
+            print(f"Removing {authority_count} authority documents, keeping {remaining} user documents")
+            
+            # Remove authority chunks from a copy of the loaded index; user documents
+            # keep their embeddings
+            rag = load_rag_copy(INDEX_PATH)
+            for filename in authority_filenames:
+                rag.delete_document(filename)
+            rag.save_index(INDEX_PATH)
+            rag_system = rag
         
         # Also clear the scraper metadata so docs can be re-fetched
         scraper_metadata_path = 'extracted_text/metadata.json'
@@ -307,12 +487,11 @@ def delete_all_maharera():
             'success': True,
             'message': f'Successfully deleted {authority_count} MahaRERA document(s)',
             'deleted': authority_count,
-            'remaining_docs': len(user_docs)
+            'remaining_docs': len(rag.documents)
         })
         
     except Exception as e:
         print(f"ERROR: MahaRERA delete failed: {str(e)}")
-        import traceback
         traceback.print_exc()
         return jsonify({
             'success': False,
@@ -320,65 +499,55 @@ def delete_all_maharera():
         }), 500
 
 
+def run_reindex():
+    """Index new PDFs from the watched folder and reload the RAG system (job body)"""
+    # Import here to avoid circular imports
+    from auto_indexer import auto_index_on_startup
+    
+    print("\nManual reindex triggered...")
+    
+    # Run auto-indexing
+    new_docs = auto_index_on_startup()
+    
+    # Reload RAG system if new documents were indexed
+    if new_docs > 0:
+        print("[RELOAD] Reloading RAG system with new documents...")
+        # initialize_rag only replaces the current RAG system once the new one
+        # has loaded, so on failure queries keep using the previous one
+        try:
+            initialize_rag()
+        except Exception as reload_error:
+            print(f"WARNING: Failed to reload RAG system: {reload_error}")
+            raise
+    
+    # Get current status
+    rag = rag_system
+    if rag:
+        total_docs = len(rag.documents)
+        message = f"Indexing completed. {new_docs} new documents added." if new_docs > 0 else "No new documents found."
+        return {
+            'success': True,
+            'message': message,
+            'new_docs': new_docs,
+            'total_docs': total_docs
+        }
+    else:
+        return {
+            'success': True,
+            'message': 'No documents in index',
+            'new_docs': 0,
+            'total_docs': 0
+        }
+
+
 @app.route('/api/reindex', methods=['POST'])
 def reindex():
-    """Trigger auto-indexing of new documents"""
-    try:
-        # Import here to avoid circular imports
-        from auto_indexer import auto_index_on_startup
-        
-        print("\nManual reindex triggered...")
-        
-        # Run auto-indexing
-        new_docs = auto_index_on_startup()
-        
-        # Reload RAG system if new documents were indexed
-        global rag_system
-        if new_docs > 0:
-            print("[RELOAD] Reloading RAG system with new documents...")
-            # Save current state in case of failure
-            old_rag_system = rag_system
-            try:
-                initialize_rag()
-            except Exception as reload_error:
-                print(f"WARNING: Failed to reload RAG system: {reload_error}")
-                rag_system = old_rag_system  # Restore previous state
-                raise
-        
-        # Get current status
-        if rag_system:
-            total_docs = len(rag_system.documents)
-            message = f"Indexing completed. {new_docs} new documents added." if new_docs > 0 else "No new documents found."
-            return jsonify({
-                'success': True,
-                'message': message,
-                'new_docs': new_docs,
-                'total_docs': total_docs
-            })
-        else:
-            return jsonify({
-                'success': True,
-                'message': 'No documents in index',
-                'new_docs': 0,
-                'total_docs': 0
-            })
-    except Exception as e:
-        print(f"ERROR: Error during reindex: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({
-            'success': False,
-            'message': f'Error: {str(e)}'
-        }), 500
+    """Trigger auto-indexing of new documents (returns 202 with a job id)"""
+    return start_job('reindex', run_reindex)
 
 
-@app.route('/api/query', methods=['POST'])
-def query():
-    """Process a query and return answer with sources"""
-    if not rag_system:
-        return jsonify({'error': 'No index loaded'}), 503
-    
-    data = request.json
+def parse_query_request(data):
+    """Validate a query request body; returns (answer_query kwargs, None) or (None, error response)"""
     question = data.get('question', '')
     top_k = data.get('top_k', 3)
     language = data.get('language', 'auto')
@@ -394,48 +563,195 @@ def query():
     
     # Input validation
     if not question:
-        return jsonify({'error': 'Question is required'}), 400
+        return None, (jsonify({'error': 'Question is required'}), 400)
     
     if len(question) > 2000:  # Increased for compliance checks
-        return jsonify({'error': 'Question too long (max 2000 characters)'}), 400
+        return None, (jsonify({'error': 'Question too long (max 2000 characters)'}), 400)
     
     if not isinstance(top_k, int) or top_k < 1 or top_k > 10:
-        return jsonify({'error': 'Invalid top_k value (must be 1-10)'}), 400
+        return None, (jsonify({'error': 'Invalid top_k value (must be 1-10)'}), 400)
+    
+    return {
+        'query': question,
+        'top_k': top_k,
+        'language': language,
+        'file_filter': selected_documents,  # Now accepts list of user docs
+        'authority_filter': selected_maharera,  # Pass selected MahaRERA docs
+        'compliance_check': compliance_check  # Only run red flag detection if True
+    }, None
+
+
+def query_response(result, answer):
+    """Build the /api/query response body from an answer_query result"""
+    return {
+        'answer': answer,
+        'sources': result['sources'],
+        'query': result['query'],
+        'red_flags': result.get('red_flags', []),
+        'compliance_results': result.get('compliance_results', []),
+        'compliance_summary': result.get('compliance_summary', None),
+        'decision': result.get('decision', {'is_red_flag': False, 'override_llm_decision': False, 'is_compliant': True})
+    }
+
+
+def _query_filters(query_args):
+    """The parts of a query request besides the question that determine its answer"""
+    def names(value):
+        if not value:
+            return ()
+        return tuple(sorted({str(v) for v in ([value] if isinstance(value, str) else value)}))
+    return (query_args['top_k'], query_args['language'], names(query_args['file_filter']),
+            names(query_args['authority_filter']), bool(query_args['compliance_check']))
+
+
+def cached_query_response(rag, query_args):
+    """
+    Look up a cached /api/query body for this request
+    
+    Returns (body or None, cache key). rag_settings.query_cache_size bounds the cache
+    (0 disables it); rag_settings.query_cache_similarity, when set, also matches
+    earlier questions whose embedding has at least that cosine similarity.
+    """
+    rag_settings = rag.config.get("rag_settings", {})
+    if not rag_settings.get("query_cache_size", 256):
+        return None, None
+    
+    filters = _query_filters(query_args)
+    key = (' '.join(query_args['query'].casefold().split()),) + filters
+    with _query_cache_lock:
+        # Any index change (or a new RAG instance) can change every answer
+        if _query_cache['rag'] is not rag or _query_cache['version'] != rag.index_version:
+            _query_cache['exact'].clear()
+            _query_cache['semantic'].clear()
+            _query_cache['rag'], _query_cache['version'] = rag, rag.index_version
+        
+        exact = _query_cache['exact']
+        if key in exact:
+            exact.move_to_end(key)
+            return exact[key], key
+        
+        threshold = rag_settings.get("query_cache_similarity")
+        if threshold is None or np is None or not _query_cache['semantic']:
+            return None, key
+        candidates = [(k, v) for k, (f, v) in _query_cache['semantic'].items() if f == filters]
+    
+    if candidates:
+        # Same embedding the search would compute, so a miss costs no extra encode
+        vector = rag.embed_query(query_args['query'])
+        matrix = np.stack([v for _, v in candidates])
+        scores = matrix @ vector / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector) + 1e-12)
+        best = int(np.argmax(scores))
+        if scores[best] >= threshold:
+            with _query_cache_lock:
+                body = _query_cache['exact'].get(candidates[best][0])
+            if body is not None:
+                return body, key
+    return None, key
+
+
+def store_query_response(rag, key, query_args, body):
+    """Remember an /api/query body under the key from cached_query_response"""
+    rag_settings = rag.config.get("rag_settings", {})
+    size = rag_settings.get("query_cache_size", 256)
+    vector = None
+    if rag_settings.get("query_cache_similarity") is not None and np is not None:
+        vector = rag.embed_query(query_args['query'])
+    
+    with _query_cache_lock:
+        if _query_cache['rag'] is not rag or _query_cache['version'] != rag.index_version:
+            return  # Index changed while answering
+        exact, semantic = _query_cache['exact'], _query_cache['semantic']
+        exact[key] = body
+        exact.move_to_end(key)
+        if vector is not None:
+            semantic[key] = (key[1:], vector)
+        while len(exact) > size:
+            old_key, _ = exact.popitem(last=False)
+            semantic.pop(old_key, None)
+
+
+@app.route('/api/query', methods=['POST'])
+def query():
+    """Process a query and return answer with sources"""
+    rag = rag_system
+    if not rag:
+        return jsonify({'error': 'No index loaded'}), 503
+    
+    data = read_json_body()
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    query_args, error = parse_query_request(data)
+    if error:
+        return error
     
     try:
+        cached, cache_key = cached_query_response(rag, query_args)
+        if cached is not None:
+            return jsonify(dict(cached, query=query_args['query']))
+        
         # Get answer from RAG system
-        result = rag_system.answer_query(
-            question, 
-            top_k=top_k, 
-            language=language,
-            file_filter=selected_documents,  # Now accepts list of user docs
-            authority_filter=selected_maharera,  # Pass selected MahaRERA docs
-            compliance_check=compliance_check  # Only run red flag detection if True
-        )
+        llm = rag.llm
+        llm_failures = llm.usage_stats['failed_requests'] if llm else 0
+        result = rag.answer_query(**query_args)
+        body = query_response(result, result['answer'])
+        # Failed LLM calls come back as an error answer; don't keep serving those
+        if cache_key is not None and (not llm or llm.usage_stats['failed_requests'] == llm_failures):
+            store_query_response(rag, cache_key, query_args, body)
         
-        return jsonify({
-            'answer': result['answer'],
-            'sources': result['sources'],
-            'query': result['query'],
-            'red_flags': result.get('red_flags', []),
-            'compliance_results': result.get('compliance_results', []),
-            'compliance_summary': result.get('compliance_summary', None),
-            'decision': result.get('decision', {'is_red_flag': False, 'override_llm_decision': False, 'is_compliant': True})
-        })
+        return jsonify(body)
+    except Exception as e:
+        print(f"ERROR: Error processing query: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@app.route('/api/query/stream', methods=['POST'])
+def query_stream():
+    """
+    Process a query and stream the answer as Server-Sent Events:
+    'data: {"delta": ...}' events as the LLM generates text, then an 'event: done'
+    carrying the same body as /api/query
+    """
+    rag = rag_system
+    if not rag:
+        return jsonify({'error': 'No index loaded'}), 503
+    
+    data = read_json_body()
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    query_args, error = parse_query_request(data)
+    if error:
+        return error
+    
+    try:
+        # Retrieval and compliance checks run before the first byte is sent
+        result, answer_chunks = rag.answer_query_stream(**query_args)
     except Exception as e:
         print(f"ERROR: Error processing query: {str(e)}")
-        import traceback
         traceback.print_exc()
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+    
+    def events():
+        parts = []
+        for piece in answer_chunks:
+            parts.append(piece)
+            yield f"data: {app.json.dumps({'delta': piece})}\n\n"
+        yield f"event: done\ndata: {app.json.dumps(query_response(result, ''.join(parts)))}\n\n"
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 @app.route('/api/batch-process', methods=['POST'])
 def batch_process():
     """Process multiple documents for compliance in batch"""
-    if not rag_system:
+    rag = rag_system
+    if not rag:
         return jsonify({'error': 'No index loaded'}), 503
     
-    data = request.json
+    data = read_json_body()
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
     document_ids = data.get('document_ids', [])
     maharera_ids = data.get('maharera_ids', [])
     options = data.get('options', {})
@@ -447,21 +763,22 @@ def batch_process():
         return jsonify({'error': 'No documents selected for batch processing'}), 400
     
     try:
-        from red_flag_detector import detect_red_flags, check_compliance as verify_compliance, get_compliance_summary
+        from red_flag_detector import detect_red_flags_batch, check_compliance as verify_compliance, get_compliance_summary
+        
+        # The red flag pool settings used by /api/query also spread a batch over
+        # processes (or threads) - every chunk of every selected document is scanned
+        # in one detect_red_flags_batch call, and documents are checked for required
+        # clauses in parallel
+        rag_settings = rag.config.get("rag_settings", {})
+        workers = rag_settings.get("red_flag_workers", 1)
+        executor = rag_settings.get("red_flag_executor", "process")
         
         batch_results = []
-        total_red_flags = 0
-        total_critical = 0
-        total_missing_clauses = 0
-        documents_with_issues = 0
+        pending = []  # (doc_result, chunk texts, full text) for documents found in the index
         
         for doc_id in document_ids:
             # Find document in index
-            doc_data = None
-            for doc in rag_system.documents:
-                if doc.get('filename') == doc_id:
-                    doc_data = doc
-                    break
+            doc_data = rag.documents_by_name.get(doc_id)
             
             if not doc_data:
                 batch_results.append({
@@ -471,11 +788,9 @@ def batch_process():
                 })
                 continue
             
-            # Get full document text from all chunks
+            # Indexed documents always carry their full text, and chunks as plain strings
+            chunk_texts = doc_data.get('chunks', [])
             full_text = doc_data.get('text', '')
-            if not full_text:
-                chunks = doc_data.get('chunks', [])
-                full_text = '\n'.join(c.get('text', '') if isinstance(c, dict) else str(c) for c in chunks)
             
             doc_result = {
                 'filename': doc_id,
@@ -484,60 +799,62 @@ def batch_process():
                 'compliance_results': [],
                 'compliance_summary': None
             }
+            batch_results.append(doc_result)
+            pending.append((doc_result, chunk_texts, full_text))
+        
+        # Red flag detection
+        if check_red_flags and pending:
+            # Get authority chunks for red flag detection (the same for every document)
+            authority_chunks = rag.get_authority_chunks(maharera_ids)
             
-            # Get authority chunks for red flag detection
-            authority_chunks = []
-            if maharera_ids:
-                for adoc in rag_system.documents:
-                    if adoc.get('source_type') == 'AUTHORITY' and adoc.get('filename') in maharera_ids:
-                        for chunk in adoc.get('chunks', []):
-                            chunk_text = chunk.get('text', '') if isinstance(chunk, dict) else str(chunk)
-                            authority_chunks.append({
-                                'text': chunk_text,
-                                'filename': adoc.get('filename', ''),
-                                'source_type': 'AUTHORITY'
-                            })
+            scan = [(doc_result, chunk_text) for doc_result, chunk_texts, _ in pending
+                    for chunk_text in chunk_texts if chunk_text]
+            flags_per_chunk = detect_red_flags_batch([chunk_text for _, chunk_text in scan], authority_chunks,
+                                                     workers=workers, executor=executor)
             
-            # Red flag detection
-            if check_red_flags:
-                all_red_flags = []
-                seen_rules = set()  # Avoid duplicate flags for same rule
-                
-                for chunk in doc_data.get('chunks', []):
-                    chunk_text = chunk.get('text', '') if isinstance(chunk, dict) else str(chunk)
-                    if chunk_text:
-                        flags = detect_red_flags(chunk_text, authority_chunks)
-                        for flag in flags:
-                            # Add clause source info
-                            flag['clause_source'] = {
-                                'filename': doc_id,
-                                'excerpt': chunk_text[:200]
-                            }
-                            # Deduplicate by rule_id
-                            if flag['rule_id'] not in seen_rules:
-                                all_red_flags.append(flag)
-                                seen_rules.add(flag['rule_id'])
-                
-                doc_result['red_flags'] = all_red_flags
-                total_red_flags += len(all_red_flags)
-                total_critical += len([f for f in all_red_flags if f.get('severity') == 'CRITICAL'])
+            seen_rules = {}  # Avoid duplicate flags for same rule, per document result
+            for (doc_result, chunk_text), flags in zip(scan, flags_per_chunk):
+                doc_seen = seen_rules.setdefault(id(doc_result), set())
+                for flag in flags:
+                    # Deduplicate by rule_id
+                    if flag['rule_id'] not in doc_seen:
+                        # Add clause source info
+                        flag['clause_source'] = {
+                            'filename': doc_result['filename'],
+                            'excerpt': chunk_text[:200]
+                        }
+                        doc_result['red_flags'].append(flag)
+                        doc_seen.add(flag['rule_id'])
+        
+        # Compliance verification
+        if check_compliance and pending:
+            full_texts = [full_text for _, _, full_text in pending]
+            if workers > 1 and len(full_texts) > 1:
+                pool_class = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+                with pool_class(max_workers=min(workers, len(full_texts))) as ex:
+                    compliance_per_doc = list(ex.map(verify_compliance, full_texts))
+            else:
+                compliance_per_doc = [verify_compliance(full_text) for full_text in full_texts]
             
-            # Compliance verification
-            if check_compliance:
-                compliance_results = verify_compliance(full_text)
-                compliance_summary = get_compliance_summary(compliance_results)
+            for (doc_result, _, _), compliance_results in zip(pending, compliance_per_doc):
                 doc_result['compliance_results'] = compliance_results
-                doc_result['compliance_summary'] = compliance_summary
-                missing = len([r for r in compliance_results if r.get('status') == 'MISSING'])
-                total_missing_clauses += missing
+                doc_result['compliance_summary'] = get_compliance_summary(compliance_results)
+        
+        total_red_flags = 0
+        total_critical = 0
+        total_missing_clauses = 0
+        documents_with_issues = 0
+        for doc_result, _, _ in pending:
+            red_flags = doc_result['red_flags']
+            total_red_flags += len(red_flags)
+            total_critical += sum(1 for f in red_flags if f.get('severity') == 'CRITICAL')
+            total_missing_clauses += sum(1 for r in doc_result['compliance_results'] if r.get('status') == 'MISSING')
             
             # Track documents with issues
-            has_issues = len(doc_result.get('red_flags', [])) > 0 or \
-                        (doc_result.get('compliance_summary') and not doc_result['compliance_summary'].get('is_compliant', True))
+            has_issues = len(red_flags) > 0 or \
+                        (doc_result['compliance_summary'] and not doc_result['compliance_summary'].get('is_compliant', True))
             if has_issues:
                 documents_with_issues += 1
-            
-            batch_results.append(doc_result)
         
         return jsonify({
             'success': True,
@@ -554,7 +871,6 @@ def batch_process():
         
     except Exception as e:
         print(f"ERROR: Batch processing error: {str(e)}")
-        import traceback
         traceback.print_exc()
         return jsonify({'error': f'Batch processing failed: {str(e)}'}), 500
 
@@ -562,10 +878,13 @@ def batch_process():
 @app.route('/api/search', methods=['POST'])
 def search():
     """Search documents without LLM generation"""
-    if not rag_system:
+    rag = rag_system
+    if not rag:
         return jsonify({'error': 'No index loaded'}), 503
     
-    data = request.json
+    data = read_json_body()
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
     query_text = data.get('query', '')
     top_k = data.get('top_k', 5)
     
@@ -573,7 +892,7 @@ def search():
         return jsonify({'error': 'Query is required'}), 400
     
     try:
-        results = rag_system.search(query_text, top_k=top_k)
+        results = rag.search(query_text, top_k=top_k)
         return jsonify({'results': results})
     
     except Exception as e:
@@ -584,20 +903,22 @@ def search():
 def ingest_documents():
     """Ingest new documents from a folder"""
     # Lazy imports
-    from realestate_rag import RealEstateRAG
     from document_processor import DocumentProcessor
-    from ocr_engine import FolderOCR
     
-    data = request.json
+    data = read_json_body()
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
     folder_path = data.get('folder_path', '')
     
     if not folder_path or not os.path.exists(folder_path):
         return jsonify({'error': 'Invalid folder path'}), 400
     
     try:
-        # Process documents
-        processor = DocumentProcessor(ocr_engine=FolderOCR())
-        documents = processor.process_folder(folder_path)
+        from auto_indexer import OCR_WORKERS
+        
+        # Process documents (RAG_OCR_WORKERS PDFs at a time)
+        processor = DocumentProcessor()
+        documents = processor.process_folder(folder_path, workers=OCR_WORKERS)
         
         if not documents:
             return jsonify({'error': 'No documents found'}), 400
@@ -605,17 +926,15 @@ def ingest_documents():
         # Create or update RAG system
         global rag_system
         
-        # Initialize new if not exists, otherwise use existing to preserve other docs (if intended)
-        # For now, we'll reload existing index first to be safe
-        if not rag_system and os.path.exists(INDEX_PATH):
-             rag_system = RealEstateRAG(use_llm=True)
-             rag_system.load_index(INDEX_PATH)
-        elif not rag_system:
-             rag_system = RealEstateRAG(use_llm=True)
-
-        # Index new documents (this appends/updates)
-        rag_system.index_documents(documents)
-        rag_system.save_index(INDEX_PATH)
+        with _rag_lock:
+            rag = load_rag_copy()
+            
+            # Add to the saved index: only the new chunks are embedded, and older
+            # versions of re-ingested filenames are removed first
+            replaced = [d['filename'] for d in documents if d['filename'] in rag.documents_by_name]
+            rag.upsert_documents(documents, delete_filenames=replaced)
+            rag.save_index(INDEX_PATH)
+            rag_system = rag
         
         return jsonify({
             'message': 'Documents ingested successfully',
@@ -630,26 +949,36 @@ def ingest_documents():
 @app.route('/api/delete', methods=['POST'])
 def delete_document():
     """Delete a document from index and disk"""
+    global rag_system
+    
     if not rag_system:
         return jsonify({'error': 'No index loaded'}), 503
         
-    data = request.json
+    data = read_json_body()
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
     filename = data.get('filename')
     
     if not filename:
         return jsonify({'error': 'Filename is required'}), 400
         
     try:
-        # Delete from RAG system
-        success = rag_system.delete_document(filename)
+        # Delete from a copy of the RAG system and publish it
+        with _rag_lock:
+            success = False
+            if rag_system is not None:
+                rag = load_rag_copy()
+                success = rag.delete_document(filename)
+                if success:
+                    rag.save_index(INDEX_PATH)
+                    rag_system = rag
         
         if success:
-            rag_system.save_index(INDEX_PATH)
             
             # Delete actual file
             # Try to get PDF folder from config or auto_indexer
             try:
-                from auto_indexer import PDF_FOLDER, TRACKING_FILE
+                from auto_indexer import AutoIndexer, PDF_FOLDER, TRACKING_FILE
                 
                 file_path = os.path.join(PDF_FOLDER, filename)
                 if os.path.exists(file_path):
@@ -661,21 +990,12 @@ def delete_document():
                 else:
                     print(f"WARNING: File not found on disk: {file_path}")
 
-                # Update tracking file (indexed_documents.txt)
-                if os.path.exists(TRACKING_FILE):
-                    try:
-                        with open(TRACKING_FILE, 'r', encoding='utf-8') as f:
-                            lines = f.readlines()
-                        
-                        with open(TRACKING_FILE, 'w', encoding='utf-8') as f:
-                            for line in lines:
-                                # Check if it's the exact filename (format is filename:hash)
-                                parts = line.strip().split(':')
-                                if len(parts) >= 1 and parts[0] != filename:
-                                     f.write(line)
-                        print(f"Updated tracking file")
-                    except Exception as e:
-                        print(f"WARNING: Failed to update tracking file: {e}")
+                # Update tracking database (indexed_documents.sqlite)
+                try:
+                    AutoIndexer(PDF_FOLDER, INDEX_PATH, TRACKING_FILE).forget_document(filename)
+                    print(f"Updated tracking database")
+                except Exception as e:
+                    print(f"WARNING: Failed to update tracking database: {e}")
             except ImportError:
                 print("WARNING: Could not import auto_indexer settings, skipping file deletion")
 
@@ -692,11 +1012,19 @@ def delete_document():
 def clear_index():
     """Clear the current index"""
     global rag_system
-    rag_system = None
+    with _rag_lock:
+        rag_system = None
     
     return jsonify({'message': 'Index cleared'})
 
 
+# Browser cache lifetime for the UI's CSS/JS/fonts. The file names carry no content
+# hash, so keep this short; after it expires the browser revalidates with
+# If-None-Match/If-Modified-Since and gets a 304 when the file is unchanged
+STATIC_MAX_AGE = int(os.getenv('RAG_STATIC_MAX_AGE', '3600'))
+STATIC_CACHED_SUFFIXES = ('.js', '.css', '.woff2')
+
+
 @app.route('/', methods=['GET'])
 def index():
     """Serve the web UI"""
@@ -706,7 +1034,8 @@ def index():
 @app.route('/<path:filename>')
 def serve_static(filename):
     """Serve static files (CSS, JS)"""
-    return send_from_directory('.', filename)
+    max_age = STATIC_MAX_AGE if filename.endswith(STATIC_CACHED_SUFFIXES) else 0
+    return send_from_directory('.', filename, max_age=max_age)
 
 
 @app.route('/api', methods=['GET'])
@@ -718,7 +1047,11 @@ def api_info():
         'endpoints': {
             'GET /api/status': 'Get server status',
             'GET /api/documents': 'List indexed documents',
+            'POST /api/reindex': 'Index new PDFs (background job)',
+            'POST /api/maharera/update': 'Fetch new MahaRERA documents (background job)',
+            'GET /api/jobs/<id>': 'Background job state and result',
             'POST /api/query': 'Ask a question',
+            'POST /api/query/stream': 'Ask a question, streaming the answer (Server-Sent Events)',
             'POST /api/search': 'Search documents',
             'POST /api/ingest': 'Ingest new documents',
             'POST /api/clear': 'Clear index'
@@ -748,5 +1081,7 @@ if __name__ == '__main__':
     print("Web UI: http://localhost:5000")
     print("="*70 + "\n")
     
-    # Run Flask server (debug=False to prevent auto-restart during long OCR operations)
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    # Run Flask development server (debug=False to prevent auto-restart during long OCR operations).
+    # For concurrent users run under Gunicorn with gevent workers instead:
+    #   gunicorn -c gunicorn_conf.py server:app
+    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
@@ -1,10 +1,39 @@
+import io
+import os
 import re
-from typing import List, Dict
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Pattern, Tuple
+
+try:
+    import ahocorasick  # pyahocorasick - optional, speeds up the rule prefilter
+except ImportError:
+    ahocorasick = None
+
+try:
+    import re2  # google-re2 - optional linear-time engine for the fused rule scans
+except ImportError:
+    re2 = None
+
+try:
+    import pcre2  # optional PCRE2 bindings, JIT-compiles the fused rule scans to native code
+    from pcre2.exceptions import CompileError as PCRE2CompileError, LibraryError as PCRE2LibraryError, MatchError as PCRE2MatchError
+except ImportError:
+    pcre2 = None
+
+try:
+    import hyperscan  # optional SIMD multi-pattern engine, scans all rules in one pass
+except ImportError:
+    hyperscan = None
 
 
 # Severity ranking for escalation logic
 SEVERITY_RANK = {'LOW': 1, 'MEDIUM': 2, 'HIGH': 3, 'CRITICAL': 4}
 
+# Stop scanning authority chunks for a rule once this many support it
+# (one is enough for the flag itself; a few more are kept for provenance)
+AUTHORITY_SUPPORT_CAP = 3
+
 # Generic implicit authority intent phrases (fallback when explicit patterns don't match)
 IMPLICIT_AUTHORITY_PHRASES = [
     r"\bshall\s+be\s+entitled\b",
@@ -14,17 +43,20 @@ IMPLICIT_AUTHORITY_PHRASES = [
     r"\bas\s+per\s+(the\s+)?(act|rules|regulations)\b",
     r"\bin\s+accordance\s+with\s+(the\s+)?(act|rules)\b",
 ]
-
+# Only existence matters here, so the phrases are fused into one alternation
+_IMPLICIT_AUTHORITY_RE = re.compile('|'.join(f'(?:{p})' for p in IMPLICIT_AUTHORITY_PHRASES))
+IMPLICIT_AUTHORITY_PHRASES = tuple(re.compile(p) for p in IMPLICIT_AUTHORITY_PHRASES)
 
 def _normalize_text(text: str) -> str:
     """Normalize text: lowercase and collapse whitespace."""
     if not text:
         return ""
-    return re.sub(r'\s+', ' ', text.lower()).strip()
+    # str.split() splits on exactly the characters re's Unicode \s matches
+    return " ".join(text.lower().split())
 
 
 # Deterministic, machine-readable red flag rulebook
-# Each rule has: rule_id, domain, severity, reason, clause_patterns, authority_patterns
+# Each rule has: rule_id, domain, severity, reason, clause_patterns, clause_anchors, authority_patterns
 RULES: List[Dict] = [
     {
         'rule_id': 'RF-REFUND-001',
@@ -41,6 +73,7 @@ RULES: List[Dict] = [
             r"\bearnest\s+money\s+(shall\s+be\s+)?forfeit\b",
             r"\bdeposit\s+(is|shall\s+be)\s+non[-\s]?refundable\b",
         ],
+        'clause_anchors': ["refund", "forfeit"],
         'authority_patterns': [
             r"\bentitled\s+to\s+refund\b",
             r"\brefund\s+(along\s+)?with\s+interest\b",
@@ -61,6 +94,7 @@ RULES: List[Dict] = [
             r"\binterest\s+(waived|excluded)\b",
             r"\bexcluding\s+interest\b",
         ],
+        'clause_anchors': ["interest"],
         'authority_patterns': [
             r"\binterest\s+(shall\s+be\s+)?payable\b",
             r"\bstatutory\s+interest\b",
@@ -83,6 +117,7 @@ RULES: List[Dict] = [
             r"\bpossession\s+(date\s+)?(is\s+)?(tentative|approximate|estimated)\b",
             r"\bno\s+claim\s+(for|on\s+account\s+of)\s+delay\b",
         ],
+        'clause_anchors': ["delay", "discretion", "essence", "indefinite", "majeure", "possession"],
         'authority_patterns': [
             r"\bpossession\s+within\s+(the\s+)?stipulated\s+period\b",
             r"\bliability\s+for\s+delay\b",
@@ -105,6 +140,7 @@ RULES: List[Dict] = [
             r"\bdisputes?\s+(shall\s+be\s+)?(subject\s+to\s+)?arbitration\s+only\b",
             r"\bcivil\s+court\s+(of\s+)?\w+\s+(shall\s+have\s+)?jurisdiction\b",
         ],
+        'clause_anchors': ["jurisdiction", "arbitration", "approach", "shall not"],
         'authority_patterns': [
             r"\bjurisdiction\s+of\s+(the\s+)?(authority|tribunal|rera|maharera)\b",
             r"\bright\s+to\s+approach\s+(the\s+)?(authority|tribunal|regulatory|rera)\b",
@@ -126,6 +162,7 @@ RULES: List[Dict] = [
             r"\bunilateral(ly)?\s+(change|modify|alter|cancel)\b",
             r"\bpromoter\s+shall\s+have\s+(the\s+)?(right|liberty|freedom)\s+to\b",
         ],
+        'clause_anchors': ["promoter", "consent", "unilateral"],
         'authority_patterns': [
             r"\bshall\s+(not\s+)?alter\b",
             r"\b(prior|written)\s+consent\b",
@@ -144,6 +181,7 @@ RULES: List[Dict] = [
             r"\bdocuments?\s+(will|shall)\s+not\s+be\s+provided\b",
             r"\bconfidential\s+(and\s+)?proprietary\b.*\b(not\s+share|not\s+disclose)\b",
         ],
+        'clause_anchors': ["disclose", "not required", "provided", "confidential"],
         'authority_patterns': [
             r"\bmandatory\s+disclosure\b",
             r"\bshall\s+disclose\b",
@@ -162,6 +200,7 @@ RULES: List[Dict] = [
             r"\badvance\s+payment\s+(exceeding|more\s+than)\s+10\s*%\b",
             r"\bdemand\s+(of\s+)?payment\s+without\s+agreement\b",
         ],
+        'clause_anchors': ["payment"],
         'authority_patterns': [
             r"\bnot\s+accept\s+(more\s+than\s+)?10\s*%\b",
             r"\bafter\s+execution\s+of\s+(the\s+)?agreement\b",
@@ -179,6 +218,7 @@ RULES: List[Dict] = [
             r"\bbuilt[-\s]?up\s+area\s+(for\s+)?(pricing|calculation|rate)\b",
             r"\bprice\s+(per|based\s+on)\s+(super\s+)?built[-\s]?up\b",
         ],
+        'clause_anchors': ["built", "saleable"],
         'authority_patterns': [
             r"\bcarpet\s+area\b",
             r"\bsection\s+2\s*\(\s*k\s*\)\b",
@@ -195,6 +235,7 @@ RULES: List[Dict] = [
             r"\bsubject\s+to\s+change\s+without\s+notice\b",
             r"\bas\s+per\s+(promoter|builder)['']?s?\s+(sole\s+)?discretion\b",
         ],
+        'clause_anchors': ["specification", "without notice", "discretion"],
         'authority_patterns': [
             r"\bshall\s+specify\b",
             r"\bagreement\s+(shall|must)\s+(contain|include)\b",
@@ -205,30 +246,227 @@ RULES: List[Dict] = [
 ]
 
 
-def _match_any(patterns: List[str], text: str) -> List[str]:
-    """Match patterns against pre-normalized text."""
-    matches = []
-    for p in patterns:
-        if re.search(p, text):
-            matches.append(p)
-    return matches
+if re2 is not None:
+    _RE2_OPTIONS = re2.Options()
+    _RE2_OPTIONS.max_mem = 64 << 20  # headroom for the larger fused alternations
+
+
+def _loosen_pattern(pattern: str) -> str:
+    r"""
+    Rewrite a pattern into a superset that PCRE2/RE2/Hyperscan can compile.
+
+    Their \b, \d and \w don't follow Python's Unicode semantics, so word
+    boundaries are dropped and \d / \w are widened to Unicode classes (e.g.
+    Devanagari digits). Hits on the loosened form are always confirmed by the
+    original re pattern.
+    """
+    return pattern.replace(r'\b', '').replace(r'\d', r'\p{Nd}').replace(r'\w', r'[\p{L}\p{N}\p{M}_]')
+
+
+class _PCRE2Scan:
+    """
+    search() for a pattern compiled by the pcre2 bindings, which have no re API:
+    their Pattern.match() scans the whole subject and raises MatchError when
+    nothing matches. Returns a bool, so it only fits truth tests like the
+    fused scans'.
+    """
+    __slots__ = ('_pattern',)
+
+    def __init__(self, pattern):
+        self._pattern = pattern
+
+    def search(self, text: str) -> bool:
+        try:
+            self._pattern.match(text)
+        except PCRE2MatchError:
+            return False
+        return True
+
+
+def _fuse_patterns(patterns: List[str]) -> Pattern:
+    """
+    Fuse patterns into one alternation used as a fast rejection scan.
+
+    With pcre2 installed the scan is JIT-compiled by PCRE2; otherwise (or if
+    PCRE2 can't compile it) google-re2 is used if installed. Both run over the
+    loosened patterns, and hits are always confirmed by the individual re
+    patterns. Only search() of the result may be used, as a truth value.
+    """
+    if pcre2 is not None:
+        fused = '|'.join(f'(?:{_loosen_pattern(p)})' for p in patterns)
+        try:
+            return _PCRE2Scan(pcre2.compile(fused, jit=True))
+        except (PCRE2CompileError, PCRE2LibraryError):
+            pass
+    if re2 is not None:
+        loosened = [_loosen_pattern(p) for p in patterns]
+        return re2.compile('|'.join(f'(?:{p})' for p in loosened), options=_RE2_OPTIONS)
+    return re.compile('|'.join(f'(?:{p})' for p in patterns))
+
+
+# Precompile rule patterns once at import so the matching loops never go
+# through re's internal pattern cache. Text is already lowercased by
+# _normalize_text, so no IGNORECASE flag is needed. Each pattern list also
+# gets a fused alternation so a single scan can rule out the whole list.
+def _build_scan_db(pattern_lists: List[List[str]]):
+    """
+    Compile every pattern of every list into one Hyperscan block-mode database.
+
+    Match ids are the list index, so a single scan yields the set of lists
+    (rules) that may match.
+    """
+    expressions, ids = [], []
+    for idx, patterns in enumerate(pattern_lists):
+        for p in patterns:
+            expressions.append(_loosen_pattern(p).encode('utf-8'))
+            ids.append(idx)
+    flags = hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP | hyperscan.HS_FLAG_SINGLEMATCH
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    db.compile(expressions=expressions, ids=ids, elements=len(expressions), flags=[flags] * len(expressions))
+    return db
+
+
+# Hyperscan scratch space is not thread-safe, so each thread gets its own
+_SCAN_LOCAL = threading.local()
+
+
+def _scan_rules(db, text: str) -> set:
+    """Scan text once against a Hyperscan database, returning the matched rule indices."""
+    scratch = getattr(_SCAN_LOCAL, 'scratch', None)
+    if scratch is None:
+        scratch = _SCAN_LOCAL.scratch = {}
+    if db not in scratch:
+        scratch[db] = hyperscan.Scratch(db)
+    hits = set()
+    db.scan(text.encode('utf-8'), match_event_handler=lambda id_, start, end, flags, ctx: hits.add(id_),
+            scratch=scratch[db])
+    return hits
+
+
+# Built while RULES still hold pattern sources (they are compiled just below)
+_CLAUSE_DB = _AUTHORITY_DB = None
+if hyperscan is not None:
+    _CLAUSE_DB = _build_scan_db([r['clause_patterns'] for r in RULES])
+    _AUTHORITY_DB = _build_scan_db([r['authority_patterns'] for r in RULES])
+
+_CRITICAL_RANK = SEVERITY_RANK['CRITICAL']
+
+# One-level severity downgrade applied when no authority support is found
+_UNSUPPORTED_SEVERITY = {'CRITICAL': 'HIGH', 'HIGH': 'MEDIUM'}
+
+
+def _resolve_outcomes(rule: Dict) -> Tuple[Tuple[str, str], Tuple[str, str]]:
+    """Return the (severity, reason) a rule reports with and without authority support."""
+    # Jurisdiction violations are ALWAYS CRITICAL
+    severity = rule['severity']
+    if rule['_is_jurisdiction'] and rule['_rank'] < _CRITICAL_RANK:
+        severity = 'CRITICAL'
+    unsupported_reason = f"{rule['reason']} (Note: No explicit MahaRERA regulation match in retrieved docs - verify manually)"
+    return (severity, rule['reason']), (_UNSUPPORTED_SEVERITY.get(severity, severity), unsupported_reason)
+
+
+for _idx, _rule in enumerate(RULES):
+    _rule['_index'] = _idx
+    _rule['_rank'] = SEVERITY_RANK.get(_rule['severity'], 0)
+    _rule['_is_jurisdiction'] = _rule['domain'] == 'jurisdiction'
+    _rule['_supported_outcome'], _rule['_unsupported_outcome'] = _resolve_outcomes(_rule)
+    _rule['_clause_combined'] = _fuse_patterns(_rule['clause_patterns'])
+    _rule['_authority_combined'] = _fuse_patterns(_rule['authority_patterns'])
+    _rule['clause_patterns'] = tuple(re.compile(p) for p in _rule['clause_patterns'])
+    _rule['authority_patterns'] = tuple(re.compile(p) for p in _rule['authority_patterns'])
+
+
+# Literal prefilter: every clause_patterns match contains at least one of the
+# rule's clause_anchors, so rules whose anchors are absent can be skipped
+# without running any regex. Rules without anchors are always evaluated.
+_UNANCHORED_RULES = frozenset(i for i, r in enumerate(RULES) if not r.get('clause_anchors'))
+_ANCHOR_AUTOMATON = None
+if ahocorasick is not None:
+    _ANCHOR_AUTOMATON = ahocorasick.Automaton()
+    _anchor_rules: Dict[str, List[int]] = {}
+    for _idx, _rule in enumerate(RULES):
+        for _anchor in _rule.get('clause_anchors', []):
+            _anchor_rules.setdefault(_anchor, []).append(_idx)
+    for _anchor, _idxs in _anchor_rules.items():
+        _ANCHOR_AUTOMATON.add_word(_anchor, tuple(_idxs))
+    _ANCHOR_AUTOMATON.make_automaton()
+
+
+def _candidate_rules(clause: str) -> List[Dict]:
+    """Return the rules (in rulebook order) that may match the clause."""
+    if _CLAUSE_DB is not None:
+        hits = _scan_rules(_CLAUSE_DB, clause)
+        return [rule for i, rule in enumerate(RULES) if i in hits]
+    if _ANCHOR_AUTOMATON is not None:
+        hits = set(_UNANCHORED_RULES)
+        for _, idxs in _ANCHOR_AUTOMATON.iter(clause):
+            hits.update(idxs)
+        return [rule for i, rule in enumerate(RULES) if i in hits]
+    # Plain substring checks run on CPython's fastsearch and beat both a fused
+    # literal regex and a pure-Python n-gram bloom sketch of the clause.
+    return [
+        rule for i, rule in enumerate(RULES)
+        if i in _UNANCHORED_RULES or any(a in clause for a in rule['clause_anchors'])
+    ]
+
+
+def _match_any(patterns: Tuple[Pattern, ...], combined: Pattern, text: str) -> List[str]:
+    """Match compiled patterns against pre-normalized text, returning their sources."""
+    if not combined.search(text):
+        return []
+    # The fused scan only proves something may match; alternation reports just
+    # the leftmost hit, so each pattern is confirmed individually.
+    return [p.pattern for p in patterns if p.search(text)]
 
 
 def _match_implicit_authority(text: str) -> bool:
     """Check if text contains implicit authority intent phrases."""
-    for p in IMPLICIT_AUTHORITY_PHRASES:
-        if re.search(p, text):
-            return True
-    return False
+    return _IMPLICIT_AUTHORITY_RE.search(text) is not None
+
+
+def prepare_authority(authority_chunks: List[Dict]) -> List[Dict]:
+    """
+    Normalize authority chunks once for reuse across many detect_red_flags_prepared calls.
+
+    Args:
+        authority_chunks: List of retrieved authority chunks, each with at least 'text' and 'filename'.
+
+    Returns:
+        List of prepared chunks (normalized text, filename, excerpt and prefilter state).
+    """
+    normalized_authority = []
+    for ch in authority_chunks or []:
+        atext = _normalize_text(ch.get('text') or '')
+        if atext:
+            normalized_authority.append({
+                'text': atext,
+                'filename': ch.get('filename', 'authority'),
+                'original_excerpt': (ch.get('text') or '')[:240],
+                # One Hyperscan pass gives every rule whose authority patterns may match
+                'rules': _scan_rules(_AUTHORITY_DB, atext) if _AUTHORITY_DB is not None else None,
+                # Implicit intent depends only on the chunk, not on the rule
+                'implicit': _match_implicit_authority(atext),
+            })
+    return normalized_authority
 
 
 def detect_red_flags(clause_text: str, authority_chunks: List[Dict], require_authority_support: bool = False) -> List[Dict]:
     """
     Deterministic rule-based red flag detection at clause level.
 
+    Thin wrapper over detect_red_flags_prepared; callers checking many clauses
+    against the same authority set should call prepare_authority once instead.
+    """
+    return detect_red_flags_prepared(clause_text, prepare_authority(authority_chunks), require_authority_support)
+
+
+def detect_red_flags_prepared(clause_text: str, prepared_authority: List[Dict], require_authority_support: bool = False) -> List[Dict]:
+    """
+    Deterministic rule-based red flag detection at clause level.
+
     Args:
         clause_text: Text of the clause under review.
-        authority_chunks: List of retrieved authority chunks, each with at least 'text' and 'filename'.
+        prepared_authority: Authority chunks as returned by prepare_authority().
         require_authority_support: If True, only flag if authority explicitly supports. 
                                    If False (default), flag problematic clauses even without explicit authority match.
 
@@ -255,69 +493,58 @@ def detect_red_flags(clause_text: str, authority_chunks: List[Dict], require_aut
     if not clause:
         return triggered
 
-    # Pre-normalize all authority chunks once
-    normalized_authority = []
-    for ch in authority_chunks or []:
-        atext = _normalize_text(ch.get('text') or '')
-        if atext:
-            normalized_authority.append({
-                'text': atext,
-                'filename': ch.get('filename', 'authority'),
-                'original_excerpt': (ch.get('text') or '')[:240]
-            })
+    normalized_authority = prepared_authority or []
 
-    for rule in RULES:
-        clause_hits = _match_any(rule['clause_patterns'], clause)
+    for rule in _candidate_rules(clause):
+        clause_hits = _match_any(rule['clause_patterns'], rule['_clause_combined'], clause)
         if not clause_hits:
             continue
 
-        authority_hits: List[str] = []
-        support: List[Dict] = []
+        authority_hits: Dict[str, None] = {}  # insertion-ordered dedup
+        support_by_file: Dict[str, Dict] = {}  # one support entry per authority file
         
         for ach in normalized_authority:
             atext = ach['text']
             # Check explicit authority patterns first
-            ah = _match_any(rule['authority_patterns'], atext)
+            if ach['rules'] is None or rule['_index'] in ach['rules']:
+                ah = _match_any(rule['authority_patterns'], rule['_authority_combined'], atext)
+            else:
+                ah = []
             
             # B) Implicit authority intent fallback
-            if not ah and _match_implicit_authority(atext):
+            if not ah and ach['implicit']:
                 ah = ['[implicit_authority_intent]']
             
             if ah:
-                authority_hits.extend(ah)
-                support.append({
+                authority_hits.update(dict.fromkeys(ah))
+                support_by_file.setdefault(ach['filename'], {
                     'filename': ach['filename'],
                     'excerpt': ach['original_excerpt']
                 })
+                if len(support_by_file) >= AUTHORITY_SUPPORT_CAP:
+                    break
 
+        support = list(support_by_file.values())
         has_authority_support = len(support) > 0
         
         # Flag the clause if:
         # - We have explicit authority support, OR
         # - require_authority_support is False (flag based on clause pattern alone)
         if has_authority_support or not require_authority_support:
-            # C) Severity escalation: jurisdiction violations are ALWAYS CRITICAL
-            severity = rule['severity']
-            if rule['domain'] == 'jurisdiction' and SEVERITY_RANK.get(severity, 0) < SEVERITY_RANK['CRITICAL']:
-                severity = 'CRITICAL'
-            
-            # If no authority support, add a note and potentially lower severity
-            reason = rule['reason']
-            if not has_authority_support:
-                reason = f"{rule['reason']} (Note: No explicit MahaRERA regulation match in retrieved docs - verify manually)"
-                # Lower severity by one level if no authority support
-                if severity == 'CRITICAL':
-                    severity = 'HIGH'
-                elif severity == 'HIGH':
-                    severity = 'MEDIUM'
-            
+            # C) Severity escalation and the no-support downgrade/note are
+            # resolved per rule at import (see _resolve_outcomes)
+            if has_authority_support:
+                severity, reason = rule['_supported_outcome']
+            else:
+                severity, reason = rule['_unsupported_outcome']
+
             triggered.append({
                 'rule_id': rule['rule_id'],
                 'domain': rule['domain'],
                 'severity': severity,
                 'reason': reason,
                 'matched_clause_patterns': clause_hits,
-                'matched_authority_patterns': list(set(authority_hits)) if authority_hits else ['[clause_pattern_only]'],
+                'matched_authority_patterns': list(authority_hits) if authority_hits else ['[clause_pattern_only]'],
                 'authority_support': support,
                 'has_authority_support': has_authority_support,
             })
@@ -328,6 +555,49 @@ def detect_red_flags(clause_text: str, authority_chunks: List[Dict], require_aut
 
     return triggered
 
+# Per-worker authority set for detect_red_flags_batch, installed by the pool initializer
+_WORKER_AUTHORITY: List[Dict] = []
+
+
+def _batch_worker_init(prepared_authority: List[Dict]):
+    """Pool initializer: receive the prepared authority set once per worker."""
+    global _WORKER_AUTHORITY
+    _WORKER_AUTHORITY = prepared_authority
+
+
+def _batch_worker_detect(clause_text: str, require_authority_support: bool) -> List[Dict]:
+    return detect_red_flags_prepared(clause_text, _WORKER_AUTHORITY, require_authority_support)
+
+
+def detect_red_flags_batch(clauses: List[str], authority_chunks: List[Dict], require_authority_support: bool = False,
+                           workers: int = None, chunksize: int = 32, executor: str = "process") -> List[List[Dict]]:
+    """
+    Run detect_red_flags over many clauses of a document in a worker pool.
+
+    Authority chunks are prepared once and shipped to each worker through the
+    pool initializer; the compiled rulebook is built by each worker's import of
+    this module. Small batches (or workers=1) run inline to skip pool startup.
+
+    executor="thread" shares the prepared authority and compiled rules across
+    threads instead, with no pickling or process startup. It only scales as far
+    as the matching engine releases the GIL while scanning.
+
+    Returns:
+        One list of triggered red flags per clause, in input order.
+    """
+    prepared = prepare_authority(authority_chunks)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(clauses) <= chunksize:
+        return [detect_red_flags_prepared(c, prepared, require_authority_support) for c in clauses]
+
+    if executor == "thread":
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(lambda c: detect_red_flags_prepared(c, prepared, require_authority_support), clauses))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_batch_worker_init, initargs=(prepared,)) as ex:
+        return list(ex.map(_batch_worker_detect, clauses, [require_authority_support] * len(clauses),
+                           chunksize=chunksize))
+
 # =============================================================================
 # COMPLIANCE VERIFICATION RULES
 # These check for REQUIRED clauses that MUST be present in a compliant agreement
@@ -466,6 +736,133 @@ COMPLIANCE_RULES: List[Dict] = [
     },
 ]
 
+# One alternation over every required pattern of every rule; the group name
+# r<rule>_<pattern> tells check_compliance which pattern fired.
+_ALL_COMPLIANCE_RE = re.compile('|'.join(
+    f'(?P<r{ri}_{pi}>{p})'
+    for ri, rule in enumerate(COMPLIANCE_RULES)
+    for pi, p in enumerate(rule['required_patterns'])
+))
+_COMPLIANCE_GROUPS: Dict[str, Tuple[int, int]] = {
+    f'r{ri}_{pi}': (ri, pi)
+    for ri, rule in enumerate(COMPLIANCE_RULES)
+    for pi in range(len(rule['required_patterns']))
+}
+
+for _rule in COMPLIANCE_RULES:
+    _rule['_combined'] = _fuse_patterns(_rule['required_patterns'])
+    _rule['required_patterns'] = tuple(re.compile(p) for p in _rule['required_patterns'])
+
+
+def _update_compliance_hits(text: str, best: Dict[int, int]):
+    """
+    Scan one normalized window, lowering best[rule_index] to the first
+    (lowest-index) required pattern of each rule that matches.
+    """
+    # Single pass over the window: lowest pattern index seen per rule
+    first_hit: Dict[int, int] = {}
+    for m in _ALL_COMPLIANCE_RE.finditer(text):
+        ri, pi = _COMPLIANCE_GROUPS[m.lastgroup]
+        if pi < first_hit.get(ri, pi + 1):
+            first_hit[ri] = pi
+
+    for ri, rule in enumerate(COMPLIANCE_RULES):
+        patterns = rule['required_patterns']
+        known = min(best.get(ri, len(patterns)), first_hit.get(ri, len(patterns)))
+        if known == 0:
+            best[ri] = 0
+            continue
+
+        # finditer matches don't overlap, so a hit can hide another pattern's
+        # match. Earlier-ranked patterns of a hit rule are confirmed directly,
+        # and rules with no hit fall back to their own fused scan.
+        pi = None
+        if known < len(patterns):
+            pi = next((i for i in range(known) if patterns[i].search(text)), known)
+        elif rule['_combined'].search(text):
+            pi = next((i for i, p in enumerate(patterns) if p.search(text)), None)
+        if pi is not None:
+            best[ri] = pi
+
+
+def _iter_normalized_windows(source, chunk_size: int, overlap: int):
+    """
+    Yield normalized windows of a text stream. Reads are cut at whitespace so
+    words are never split, and each window is prefixed with the last ~overlap
+    characters (starting at a word) of the previous one.
+    """
+    if hasattr(source, 'read'):
+        reader = source
+        source = iter(lambda: reader.read(chunk_size), '')
+
+    carry = ''  # partial word left over from the previous read
+    tail = ''
+    for block in source:
+        block = carry + block
+        cut = max(block.rfind(' '), block.rfind('\n'), block.rfind('\t'), block.rfind('\r'))
+        if cut == -1:
+            carry = block
+            continue
+        carry = block[cut:]
+        body = _normalize_text(block[:cut])
+        if body:
+            window = f"{tail} {body}" if tail else body
+            yield window
+            if len(window) <= overlap:
+                tail = window
+            else:
+                start = window.find(' ', len(window) - overlap)
+                tail = window[start + 1:] if start != -1 else ''
+
+    body = _normalize_text(carry)
+    if body:
+        yield f"{tail} {body}" if tail else body
+
+
+def check_compliance_streaming(source, chunk_size: int = 65536, overlap: int = 256) -> List[Dict]:
+    """
+    Check a document for required MahaRERA clauses without materializing a
+    normalized copy of the whole text.
+
+    Args:
+        source: Path to a UTF-8 text file, a file-like object, or an iterable of text chunks
+        chunk_size: Characters read per window (file sources)
+        overlap: Characters carried between windows; must exceed the longest pattern match
+
+    Returns:
+        Same structure as check_compliance().
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8') as f:
+            return check_compliance_streaming(f, chunk_size, overlap)
+
+    best: Dict[int, int] = {}
+    seen_text = False
+    for window in _iter_normalized_windows(source, chunk_size, overlap):
+        seen_text = True
+        _update_compliance_hits(window, best)
+        # Early exit: every rule already matched its top-ranked pattern
+        if len(best) == len(COMPLIANCE_RULES) and not any(best.values()):
+            break
+
+    results = []
+    if not seen_text:
+        return results
+
+    for ri, rule in enumerate(COMPLIANCE_RULES):
+        pi = best.get(ri)
+        matched = pi is not None
+        results.append({
+            'rule_id': rule['rule_id'],
+            'domain': rule['domain'],
+            'importance': rule['importance'],
+            'description': rule['description'],
+            'status': 'COMPLIANT' if matched else 'MISSING',
+            'matched_pattern': rule['required_patterns'][pi].pattern if matched else None,
+        })
+
+    return results
+
 
 def check_compliance(full_document_text: str) -> List[Dict]:
     """
@@ -485,32 +882,9 @@ def check_compliance(full_document_text: str) -> List[Dict]:
             'matched_pattern': str or None,
         }]
     """
-    results = []
-    text = _normalize_text(full_document_text)
-    
-    if not text:
-        return results
-    
-    for rule in COMPLIANCE_RULES:
-        matched = False
-        matched_pattern = None
-        
-        for pattern in rule['required_patterns']:
-            if re.search(pattern, text):
-                matched = True
-                matched_pattern = pattern
-                break
-        
-        results.append({
-            'rule_id': rule['rule_id'],
-            'domain': rule['domain'],
-            'importance': rule['importance'],
-            'description': rule['description'],
-            'status': 'COMPLIANT' if matched else 'MISSING',
-            'matched_pattern': matched_pattern,
-        })
-    
-    return results
+    if not full_document_text:
+        return []
+    return check_compliance_streaming(io.StringIO(full_document_text))
 
 
 def get_compliance_summary(compliance_results: List[Dict]) -> Dict:
@@ -3,16 +3,70 @@ Real Estate Agreement RAG System - Document Processor
 Handles PDF ingestion with OCR support for scanned documents (English + Marathi)
 """
 import os
+import gzip
+import io
 import json
-from typing import List, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 from ocr_engine import FolderOCR
 
+try:
+    import zstandard  # optional - zstd compression for .zst processed data files
+except ImportError:
+    zstandard = None
+
+# Per-process DocumentProcessor for OCR worker processes
+_worker_processor = None
+
+
+def _init_pdf_worker(cpu_threads=None):
+    global _worker_processor
+    _worker_processor = DocumentProcessor(ocr_engine=FolderOCR(cpu_threads=cpu_threads))
+
+
+def _pdf_worker_threads(workers):
+    """CPU threads for each of workers OCR processes, so together they use every core once"""
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def _process_pdf_worker(pdf_path):
+    return _worker_processor.process_pdf(pdf_path)
+
+
+def _open_processed(path: str, mode: str):
+    """Open a processed data file as text ('r' or 'w'), compressed for .gz and .zst paths"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', compresslevel=6)
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError("zstandard is required for .zst files (pip install zstandard)")
+        raw = open(path, mode + 'b')
+        if mode == 'w':
+            stream = zstandard.ZstdCompressor(level=6).stream_writer(raw)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(raw)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _manifest_key(path: str, size: int, mtime: float) -> str:
+    """Key identifying one version of a PDF file (see DocumentProcessor.build_manifest)"""
+    return f"{path}:{size}:{mtime}"
+
 
 class DocumentProcessor:
     """Process PDFs and extract text with OCR"""
     
     def __init__(self, ocr_engine=None):
-        self.ocr = ocr_engine or FolderOCR()
+        # Without an engine, FolderOCR (PaddleOCR models) is only loaded once a PDF
+        # is OCR'd here, so chunking-only and worker-pool callers never load it
+        self._ocr = ocr_engine
+    
+    @property
+    def ocr(self):
+        if self._ocr is None:
+            self._ocr = FolderOCR()
+        return self._ocr
         
     def chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
         """Split text into overlapping chunks for better retrieval"""
@@ -66,32 +120,119 @@ class DocumentProcessor:
             'chunks': chunks,
             'metadata': {
                 'num_chunks': len(chunks),
-                'text_length': len(full_text)
+                'text_length': len(full_text),
+                'file_size': file_size,
+                'file_mtime': os.path.getmtime(pdf_path)
             }
         }
     
-    def process_folder(self, folder_path: str) -> List[Dict]:
-        """Process all PDFs in a folder"""
+    @staticmethod
+    def build_manifest(documents: Iterable[Dict]) -> Dict[str, Dict]:
+        """
+        Map previously processed documents by path, size and mtime of their PDF,
+        for iter_folder's previous_manifest (documents saved before file_size and
+        file_mtime were recorded are left out)
+        """
+        manifest = {}
+        for doc in documents:
+            metadata = doc.get('metadata', {})
+            if 'file_size' in metadata and 'file_mtime' in metadata:
+                manifest[_manifest_key(doc['path'], metadata['file_size'], metadata['file_mtime'])] = doc
+        return manifest
+    
+    def process_folder(self, folder_path: str, workers: int = 1,
+                       previous_manifest: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        """Process all PDFs in a folder (see iter_folder)"""
+        return list(self.iter_folder(folder_path, workers, previous_manifest))
+    
+    def iter_folder(self, folder_path: str, workers: int = 1,
+                    previous_manifest: Optional[Dict[str, Dict]] = None) -> Iterator[Dict]:
+        """
+        Process all PDFs in a folder, yielding each document as soon as it's done
+        
+        Args:
+            folder_path: Folder containing the PDFs
+            workers: Processes OCRing PDFs in parallel (each loads its own FolderOCR
+                     with default settings); 1 processes them here with self.ocr
+            previous_manifest: build_manifest() of earlier results; PDFs whose path,
+                     size and mtime are unchanged reuse their earlier document
+        """
         pdf_files = [f for f in os.listdir(folder_path) if f.lower().endswith('.pdf')]
         
         if not pdf_files:
             print("ERROR: No PDF files found in folder")
-            return []
+            return
         
-        documents = []
-        for pdf_name in pdf_files:
-            pdf_path = os.path.join(folder_path, pdf_name)
-            doc = self.process_pdf(pdf_path)
-            documents.append(doc)
-            print(f"Processed: {pdf_name} ({len(doc['chunks'])} chunks)")
+        pdf_paths = [os.path.join(folder_path, pdf_name) for pdf_name in pdf_files]
+        previous_docs = {}
+        if previous_manifest:
+            for pdf_path in pdf_paths:
+                stat = os.stat(pdf_path)
+                doc = previous_manifest.get(_manifest_key(pdf_path, stat.st_size, stat.st_mtime))
+                if doc is not None:
+                    previous_docs[pdf_path] = doc
+            if previous_docs:
+                print(f"Skipping {len(previous_docs)} unchanged PDFs")
         
-        return documents
+        todo = [pdf_path for pdf_path in pdf_paths if pdf_path not in previous_docs]
+        # Distinct chunk strings of this run: a chunk repeated across documents
+        # (shared boilerplate, duplicate PDFs) is kept in memory once
+        chunk_table = {}
+        pool = None
+        if workers > 1 and len(todo) > 1:
+            # Results are still collected in folder order below
+            workers = min(workers, len(todo))
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker,
+                                       initargs=(_pdf_worker_threads(workers),))
+            pending = {pdf_path: pool.submit(_process_pdf_worker, pdf_path) for pdf_path in todo}
+        
+        try:
+            for pdf_name, pdf_path in zip(pdf_files, pdf_paths):
+                if pdf_path in previous_docs:
+                    yield previous_docs[pdf_path]
+                    continue
+                doc = pending[pdf_path].result() if pool is not None else self.process_pdf(pdf_path)
+                doc['chunks'] = [chunk_table.setdefault(chunk, chunk) for chunk in doc['chunks']]
+                print(f"Processed: {pdf_name} ({len(doc['chunks'])} chunks)")
+                yield doc
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
     
     def save_processed_data(self, documents: List[Dict], output_path: str):
-        """Save processed documents to JSON"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(documents, f, ensure_ascii=False, indent=2)
+        """Save processed documents to JSON (compact; gzip/zstd compressed for .gz/.zst paths)"""
+        with _open_processed(output_path, 'w') as f:
+            json.dump(documents, f, ensure_ascii=False)
         print(f"\nSaved processed data to: {output_path}")
+    
+    def save_processed_data_stream(self, documents: Iterable[Dict], output_path: str) -> Tuple[int, int]:
+        """
+        Save processed documents as JSON Lines (one document per line), writing
+        each one as it arrives so the whole set is never held in memory.
+        Paths ending in .gz or .zst are gzip/zstd compressed as they're written.
+        
+        Returns:
+            (number of documents, number of chunks) written
+        """
+        num_documents = num_chunks = 0
+        with _open_processed(output_path, 'w') as f:
+            for doc in documents:
+                f.write(json.dumps(doc, ensure_ascii=False))
+                f.write('\n')
+                num_documents += 1
+                num_chunks += len(doc['chunks'])
+        print(f"\nSaved processed data to: {output_path}")
+        return num_documents, num_chunks
+    
+    def load_processed_data(self, path: str) -> Iterator[Dict]:
+        """Read documents saved by save_processed_data_stream (or save_processed_data for .json paths)"""
+        with _open_processed(path, 'r') as f:
+            if path.endswith(('.json', '.json.gz', '.json.zst')):
+                yield from json.load(f)
+                return
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
 
 
 if __name__ == "__main__":
@@ -101,10 +242,18 @@ if __name__ == "__main__":
     # Example usage - use environment variable or default
     test_folder = os.getenv("RAG_PDF_FOLDER", r"C:\Users\manis\Downloads\cloverrag")
     print(f"Processing folder: {test_folder}")
-    docs = processor.process_folder(test_folder)
+    output_path = "processed_documents.jsonl.gz"
+    
+    # Reuse documents from the previous run for PDFs that haven't changed
+    previous_manifest = {}
+    if os.path.exists(output_path):
+        previous_manifest = processor.build_manifest(processor.load_processed_data(output_path))
+    
+    num_documents, num_chunks = processor.save_processed_data_stream(
+        processor.iter_folder(test_folder, previous_manifest=previous_manifest), output_path
+    )
     
-    if docs:
-        processor.save_processed_data(docs, "processed_documents.json")
+    if num_documents:
         print(f"\nSummary:")
-        print(f"   Total documents: {len(docs)}")
-        print(f"   Total chunks: {sum(d['metadata']['num_chunks'] for d in docs)}")
+        print(f"   Total documents: {num_documents}")
+        print(f"   Total chunks: {num_chunks}")
@@ -2,12 +2,95 @@
 Real Estate Agreement RAG System - Core RAG Engine
 Multilingual embeddings and retrieval system for real estate documents
 """
+import asyncio
+import copy
+import gzip
 import json
+import logging
+import math
+import mmap
 import os
-from typing import List, Dict, Tuple, Optional
+import re
+import sys
+from array import array
+from functools import lru_cache
+from typing import List, Dict, Iterator, Tuple, Optional
 from txtai import Embeddings
 from gemini_llm import GeminiLLM
 
+try:
+    import orjson  # optional - much faster metadata save/load
+except ImportError:
+    orjson = None
+
+try:
+    import faiss  # installed with txtai's faiss backend; enables ID-selector filtered search
+    import numpy as np
+except ImportError:
+    faiss = None
+    np = None
+
+# Progress goes through logging; entry points (server, auto indexer, __main__)
+# configure it at INFO. Set this module's logger to DEBUG for per-query
+# search/compliance details and context previews
+logger = logging.getLogger(__name__)
+
+# Queries asking about red flags/compliance (substring match on the lowercased query;
+# covers red flag(s), redflag(s), violation(s), non-compliant, issue(s), problem(s), ...)
+_RED_FLAG_RE = re.compile(r"red ?flag|violation|non-?compliant|issue|problem|check compliance|compliance check|verify compliance")
+
+# Source type codes for the per-chunk arrays (-1 marks a free/deleted chunk ID)
+SOURCE_USER = 0
+SOURCE_AUTHORITY = 1
+
+# Below this many chunks IVF-PQ can't be trained reliably from the 10% sample,
+# so the index stays on txtai's scalar quantizer
+IVFPQ_MIN_CHUNKS = 20000
+# Training points faiss wants for a PQ codebook (39 per centroid x 256 centroids)
+PQ_TRAIN_POINTS = 39 * 256
+
+# Most FAISS id selectors kept per index version (one per distinct search filter)
+SELECTOR_CACHE_SIZE = 64
+
+# From this many chunks, save_index writes chunk_to_doc as numpy columns in a
+# "<path>_chunks.npz" sidecar instead of one JSON object per chunk
+CHUNK_SIDECAR_MIN_CHUNKS = 50000
+# Integer chunk metadata stored as int64 columns (-1 = missing); every other
+# key is stored as codes into a per-key value table kept in the JSON
+_CHUNK_INT_KEYS = ('doc_id', 'chunk_idx', 'char_count', 'indexid')
+
+
+@lru_cache(maxsize=4)
+def _load_config_cached(path: str, mtime: float) -> Dict:
+    """Parse a config file once per (path, mtime) - edits to the file change mtime and reload it"""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def load_json_file(path: str):
+    """
+    Parse a (potentially large) JSON file such as the index metadata.
+    With orjson the file is memory-mapped and parsed straight from the page
+    cache, so no private copy of the raw bytes is made on the heap.
+    """
+    with open(path, 'rb') as f:
+        if orjson is None:
+            return json.loads(f.read().decode('utf-8'))
+        if os.fstat(f.fileno()).st_size == 0:
+            return orjson.loads(b'')  # mmap can't map an empty file; raises JSONDecodeError as json would
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def _normalize_chunks(doc: Dict):
+    """
+    Make doc['chunks'] a list of plain strings (DocumentProcessor's format), so
+    readers can use chunks as text without per-chunk type checks
+    """
+    chunks = doc.get('chunks') or []
+    if not all(type(chunk) is str for chunk in chunks):
+        doc['chunks'] = [chunk.get('text', '') if isinstance(chunk, dict) else str(chunk) for chunk in chunks]
+
 
 class RealEstateRAG:
     """RAG system for real estate agreement documents with multilingual support"""
@@ -21,31 +104,64 @@ class RealEstateRAG:
                       Default supports 50+ languages including English and Marathi
             use_llm: Whether to use Gemini for answer generation
         """
-        print("Initializing Real Estate RAG System...")
+        logger.info("Initializing Real Estate RAG System...")
         
         # Load config
         self.config = {}
         if os.path.exists("config.json"):
-            with open("config.json", "r") as f:
-                self.config = json.load(f)
+            # Copy so one instance can't change the cached config of the others
+            self.config = copy.deepcopy(_load_config_cached("config.json", os.path.getmtime("config.json")))
         
         # Configure embeddings with content storage and multilingual model
         # Optimized for 1000+ documents
-        self.embeddings = Embeddings({
+        rag_settings = self.config.get("rag_settings", {})
+        embeddings_config = {
             "path": model_name,
             "content": True,  # Store full text for retrieval
             "backend": "faiss",  # FAISS handles millions of vectors efficiently
-            "faiss": {
-                "quantize": True,  # 4x compression - critical for 1000+ docs (reduces memory ~75%)
-                "sample": 0.1,  # 10% sample for IVF training (balances accuracy & speed)
-                "nprobe": 6  # Search 6 clusters (good balance for 1000+ docs)
-            },
+            "faiss": self._faiss_settings(0),  # re-chosen for the chunk count on each full build
             "batch": 64,  # Batch size for embedding generation
             "normalize": True  # Normalize vectors for cosine similarity
-        })
+        }
+
+        # Optional larger model batches (e.g. 256 on GPU). txtai encodes each
+        # streamed batch separately, so the stream batch must be at least as large
+        encode_batch = rag_settings.get("encode_batch")
+        if encode_batch:
+            embeddings_config["encodebatch"] = int(encode_batch)
+            embeddings_config["batch"] = max(embeddings_config["batch"], int(encode_batch))
+
+        # Optional ONNX export of the same model (see export_onnx_model) - runs on
+        # ONNX Runtime instead of PyTorch for faster CPU encoding
+        onnx_model = rag_settings.get("onnx_model")
+        if onnx_model and os.path.exists(onnx_model):
+            logger.info(f"Using ONNX embeddings model: {onnx_model}")
+            embeddings_config["path"] = onnx_model
+            embeddings_config["tokenizer"] = model_name
+
+        self.embeddings = Embeddings(embeddings_config)
         
         self.documents = []
         self.chunk_to_doc = {}  # Map chunk ID to document info
+        self.filename_to_chunk_ids: Dict[str, set] = {}  # Reverse index: filename -> chunk IDs
+        self.documents_by_name: Dict[str, Dict] = {}  # filename -> document
+        self.index_version = 0  # Bumped whenever the document set changes (for caching derived views)
+        self._authority_chunks_by_filename: Dict[str, List[Dict]] = {}  # see get_authority_chunks()
+        self._authority_chunks_version = -1  # index_version the above was built for
+        self._indexid_to_chunk: Dict[int, int] = {}  # FAISS internal id -> chunk ID
+        self._selector_cache: Dict = {}  # see _filter_selector()
+        self._selector_cache_version = -1  # index_version the above was built for
+        self._next_chunk_id = 0  # Monotonic chunk ID counter (IDs are never reused after deletes)
+        # Compact per-chunk columns indexed by chunk ID, derived from chunk_to_doc
+        # for the search filter hot path (chunk_to_doc stays the persisted record)
+        self._filenames: List[str] = []  # Interned filenames
+        self._filename_ids: Dict[str, int] = {}  # filename -> index into _filenames
+        self._chunk_file_id = array('i')  # chunk ID -> filename id
+        self._chunk_source_type = array('b')  # chunk ID -> SOURCE_* code
+        # Memoize query vectors: repeated queries skip the ~20-50ms encoder pass
+        self._encode_query = lru_cache(maxsize=256)(self._encode_raw)
+        self._gpu_index = None  # (cpu index, ntotal, GPU replica); txtai's CPU index stays canonical for save/upsert
+        self._gpu_enabled = None  # None = GPU availability not probed yet
         
         # Initialize LLM
         self.use_llm = use_llm
@@ -60,14 +176,132 @@ class RealEstateRAG:
             if api_key:
                 self.llm = GeminiLLM(api_key, model)
                 if self.llm.is_available():
-                    print(f"LLM connected via Gemini ({model})")
+                    logger.info(f"LLM connected via Gemini ({model})")
                 else:
-                    print("WARNING: Gemini not available, falling back to simple synthesis")
+                    logger.warning("Gemini not available, falling back to simple synthesis")
                     self.llm = None
             else:
-                print("WARNING: No Gemini API key found in config.json")
+                logger.warning("No Gemini API key found in config.json")
                 self.llm = None
     
+    @staticmethod
+    def export_onnx_model(model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+                          output: str = "embeddings.onnx", quantize: bool = True) -> str:
+        """
+        Export the embeddings model (with mean pooling) to ONNX for rag_settings.onnx_model
+
+        Args:
+            model_name: Hugging Face model to export
+            output: Path of the .onnx file to write
+            quantize: Apply dynamic int8 quantization to MatMul weights
+
+        Returns:
+            Path to the exported model
+        """
+        from txtai.pipeline import HFOnnx
+
+        onnx = HFOnnx()
+        onnx(model_name, "pooling", output, quantize)
+        logger.info(f"Exported {model_name} to {output} (quantized: {quantize})")
+        return output
+
+    @staticmethod
+    def _faiss_settings(n_chunks: int) -> Dict:
+        """
+        Build the txtai faiss backend settings for an index of n_chunks vectors
+
+        Large corpora get an OPQ-rotated IVF-PQ index (32 subquantizers of
+        24 dims for 768-dim mpnet vectors, ~96x smaller than FP32 flat).
+        txtai trains on a random sample of the vectors and substitutes the
+        bare "IVF" with min(4*sqrt(s), s/39) cells for a sample of s vectors.
+        nprobe is set from the built index by _recompute_nprobe.
+        """
+        if n_chunks < IVFPQ_MIN_CHUNKS:
+            return {
+                "quantize": True,  # 4x compression - critical for 1000+ docs (reduces memory ~75%)
+                "sample": 0.1,  # 10% sample for IVF training (balances accuracy & speed)
+                "nprobe": 6  # Search 6 clusters (good balance for 1000+ docs)
+            }
+
+        return {
+            "components": "OPQ32,IVF,PQ32",
+            # IVF, OPQ and PQ are trained on the same sample: 10%, but at least
+            # the PQ_TRAIN_POINTS the 256-centroid PQ codebooks need
+            "sample": min(1.0, max(0.1, PQ_TRAIN_POINTS / n_chunks))
+        }
+
+    def _recompute_nprobe(self):
+        """
+        Re-tune IVF nprobe for the built index
+
+        Uses sqrt(nlist) with the IVF list count read from the FAISS index
+        (txtai sizes it from its training sample, not the chunk count), unless
+        rag_settings.nprobe_override pins it for a speed/recall tradeoff.
+        Flat (IDMap) indexes have no lists, so nprobe is left alone.
+        txtai reads the faiss settings on every search, so updating the
+        config takes effect immediately (and is persisted by save_index).
+        """
+        faiss_config = self.embeddings.config.setdefault("faiss", {})
+        override = self.config.get("rag_settings", {}).get("nprobe_override")
+        if override:
+            faiss_config["nprobe"] = int(override)
+            return
+
+        nlist = self._ivf_nlist()
+        if nlist:
+            faiss_config["nprobe"] = max(1, int(math.sqrt(nlist)))
+
+    def _ivf_nlist(self) -> int:
+        """Number of IVF lists of the built FAISS index (0 if it isn't an IVF index)"""
+        ann = getattr(self.embeddings, 'ann', None)
+        if faiss is None or ann is None or getattr(ann, 'backend', None) is None:
+            return 0
+        try:
+            return faiss.extract_index_ivf(ann.backend).nlist
+        except RuntimeError:  # IDMap,SQ8 / flat indexes
+            return 0
+
+    def _set_chunk_columns(self, chunk_id: int, info: Optional[Dict]):
+        """Record a chunk in the per-chunk arrays (info=None marks the ID as free)"""
+        if chunk_id >= len(self._chunk_source_type):
+            grow = chunk_id + 1 - len(self._chunk_source_type)
+            self._chunk_file_id.extend([-1] * grow)
+            self._chunk_source_type.extend([-1] * grow)
+        if info is None:
+            self._chunk_file_id[chunk_id] = -1
+            self._chunk_source_type[chunk_id] = -1
+            return
+        filename = info.get('filename', '')
+        file_id = self._filename_ids.get(filename)
+        if file_id is None:
+            file_id = self._filename_ids[filename] = len(self._filenames)
+            self._filenames.append(filename)
+        self._chunk_file_id[chunk_id] = file_id
+        self._chunk_source_type[chunk_id] = SOURCE_AUTHORITY if info.get('source_type', 'USER') == 'AUTHORITY' else SOURCE_USER
+
+    def _rebuild_lookups(self):
+        """Rebuild the filename reverse indexes and per-chunk arrays from documents and chunk_to_doc"""
+        # One pass with the arrays sized up front (same result as _set_chunk_columns per chunk)
+        n_ids = max(self.chunk_to_doc, default=-1) + 1
+        file_ids, source_types = array('i', [-1]) * n_ids, array('b', [-1]) * n_ids
+        filenames, filename_ids, by_filename = [], {}, {}
+        for chunk_id, info in self.chunk_to_doc.items():
+            by_filename.setdefault(info.get('filename'), set()).add(chunk_id)
+            filename = info.get('filename', '')
+            file_id = filename_ids.get(filename)
+            if file_id is None:
+                file_id = filename_ids[filename] = len(filenames)
+                filenames.append(filename)
+            file_ids[chunk_id] = file_id
+            source_types[chunk_id] = SOURCE_AUTHORITY if info.get('source_type', 'USER') == 'AUTHORITY' else SOURCE_USER
+        self.filename_to_chunk_ids = by_filename
+        self._filenames, self._filename_ids = filenames, filename_ids
+        self._chunk_file_id, self._chunk_source_type = file_ids, source_types
+        self.documents_by_name = {doc.get('filename'): doc for doc in self.documents}
+        self._indexid_to_chunk = {
+            info['indexid']: chunk_id for chunk_id, info in self.chunk_to_doc.items() if 'indexid' in info
+        }
+
     def delete_document(self, filename: str) -> bool:
         """
         Delete a document and its chunks from the index
@@ -78,97 +312,177 @@ class RealEstateRAG:
         Returns:
             True if successful, False otherwise
         """
-        print(f"Deleting document: {filename}")
+        logger.info(f"Deleting document: {filename}")
         
         # Find chunks to delete
-        chunks_to_delete = []
-        for chunk_id, info in self.chunk_to_doc.items():
-            if info.get('filename') == filename:
-                chunks_to_delete.append(chunk_id)
+        chunks_to_delete = sorted(self.filename_to_chunk_ids.pop(filename, ()))
         
         if not chunks_to_delete:
-            print(f"WARNING: No chunks found for {filename}")
+            logger.warning(f"No chunks found for {filename}")
             # Even if no chunks found, check if it's in documents list and remove it
-            initial_doc_count = len(self.documents)
-            self.documents = [doc for doc in self.documents if doc.get('filename') != filename]
-            if len(self.documents) < initial_doc_count:
-                print(f"Removed {filename} from documents list (no chunks found)")
+            if self.documents_by_name.pop(filename, None) is not None:
+                self.documents = [doc for doc in self.documents if doc.get('filename') != filename]
+                self.index_version += 1
+                logger.info(f"Removed {filename} from documents list (no chunks found)")
                 return True
             return False
             
-        print(f"Found {len(chunks_to_delete)} chunks to delete")
+        logger.info(f"Found {len(chunks_to_delete)} chunks to delete")
         
         # Delete from embeddings
         try:
             self.embeddings.delete(chunks_to_delete)
         except Exception as e:
-            print(f"ERROR: Failed to delete from embeddings: {e}")
+            logger.error(f"Failed to delete from embeddings: {e}")
             # Continue to clean up metadata even if embeddings fail
         
+        self._gpu_index = None  # CPU index changed in place; re-copy to GPU on next search
+
         # Clean up metadata
         for chunk_id in chunks_to_delete:
             if chunk_id in self.chunk_to_doc:
-                del self.chunk_to_doc[chunk_id]
+                info = self.chunk_to_doc.pop(chunk_id)
+                self._indexid_to_chunk.pop(info.get('indexid'), None)
+                self._set_chunk_columns(chunk_id, None)
                 
         # Remove from documents list
-        self.documents = [doc for doc in self.documents if doc.get('filename') != filename]
+        if self.documents_by_name.pop(filename, None) is not None:
+            self.documents = [doc for doc in self.documents if doc.get('filename') != filename]
+        self.index_version += 1
         
-        print(f"Successfully deleted {filename}")
+        logger.info(f"Successfully deleted {filename}")
         return True
         
-    def index_documents(self, documents: List[Dict]):
+    def get_authority_chunks(self, filenames) -> List[Dict]:
+        """
+        Chunks of the given authority documents as {'text', 'filename', 'source_type'}
+        dicts (the input red flag detection expects), in filename order
+        
+        The per-document lists are built once per index version and shared between
+        calls, so callers must not modify them.
+        """
+        if self._authority_chunks_version != self.index_version:
+            by_filename = {}
+            for doc in self.documents:
+                if doc.get('source_type') == 'AUTHORITY':
+                    filename = doc.get('filename', '')
+                    by_filename[filename] = [{
+                        'text': chunk,
+                        'filename': filename,
+                        'source_type': 'AUTHORITY'
+                    } for chunk in doc.get('chunks', [])]
+            self._authority_chunks_by_filename = by_filename
+            self._authority_chunks_version = self.index_version
+        
+        authority_chunks = []
+        for filename in dict.fromkeys(filenames):
+            authority_chunks.extend(self._authority_chunks_by_filename.get(filename, ()))
+        return authority_chunks
+
+    def can_upsert(self) -> bool:
+        """
+        True if documents can be appended to the current FAISS index: it has vectors
+        and every chunk records its FAISS id ('indexid'; indexes saved before chunks
+        kept it have to be rebuilt instead)
+        """
+        return self.embeddings.count() > 0 and all('indexid' in info for info in self.chunk_to_doc.values())
+
+    def _take_documents(self) -> List[Dict]:
+        """Remove and return all documents, clearing the chunk metadata for a full rebuild"""
+        documents = self.documents
+        self.documents = []
+        self.chunk_to_doc = {}
+        self._next_chunk_id = 0
+        self._rebuild_lookups()
+        return documents
+
+    def upsert_documents(self, documents: List[Dict], delete_filenames=()):
+        """
+        Add documents to the existing index without re-embedding what's already there
+        
+        Args:
+            documents: List of processed document dicts from DocumentProcessor
+            delete_filenames: Filenames whose current chunks are removed first
+                              (e.g. older versions of documents being replaced)
+        """
+        for filename in delete_filenames:
+            self.delete_document(filename)
+        self.index_documents(documents, append=True)
+
+    def index_documents(self, documents: List[Dict], append: bool = False):
         """
         Index processed documents into the embeddings database
         
         Args:
             documents: List of processed document dicts from DocumentProcessor
+            append: Upsert into the current index instead of rebuilding it with
+                    only these documents' vectors (see upsert_documents)
         """
         if not documents:
-            print("WARNING: No documents to index")
+            logger.warning("No documents to index")
             return
+        
+        if append and self.chunk_to_doc and not self.can_upsert():
+            # New vectors can't be lined up with the existing ones, and a build with
+            # only the new documents would drop them: rebuild with every document
+            logger.warning("Index has no FAISS ids for its chunks (saved by an older version); rebuilding it with all documents")
+            documents = self._take_documents() + list(documents)
+            append = False
             
-        print(f"\nIndexing {len(documents)} documents...")
+        logger.info(f"Indexing {len(documents)} documents...")
         
         # Validate all documents before processing
         valid_documents = []
         for idx, doc in enumerate(documents):
             # Check required fields
             if not isinstance(doc, dict):
-                print(f"   WARNING: Skipping document {idx}: not a dictionary")
+                logger.warning(f"Skipping document {idx}: not a dictionary")
                 continue
             if not doc.get('filename'):
-                print(f"   WARNING: Skipping document {idx}: missing filename")
+                logger.warning(f"Skipping document {idx}: missing filename")
                 continue
             if not doc.get('text'):
-                print(f"   WARNING: Skipping document {idx} ({doc['filename']}): no text content")
+                logger.warning(f"Skipping document {idx} ({doc['filename']}): no text content")
                 continue
             if not doc.get('chunks') or not isinstance(doc.get('chunks'), list):
-                print(f"   WARNING: Skipping document {idx} ({doc['filename']}): no valid chunks")
+                logger.warning(f"Skipping document {idx} ({doc['filename']}): no valid chunks")
                 continue
             if len(doc.get('text', '')) < 50:
-                print(f"   WARNING: Skipping document {idx} ({doc['filename']}): text too short ({len(doc['text'])} chars)")
+                logger.warning(f"Skipping document {idx} ({doc['filename']}): text too short ({len(doc['text'])} chars)")
                 continue
+            _normalize_chunks(doc)
             valid_documents.append(doc)
         
         if not valid_documents:
-            print("ERROR: No valid documents to index after validation")
+            logger.error("No valid documents to index after validation")
             return
             
-        print(f"   Validated {len(valid_documents)}/{len(documents)} documents")
+        logger.info(f"Validated {len(valid_documents)}/{len(documents)} documents")
         
         # Determine start offsets for appending
         start_doc_idx = len(self.documents)
         
-        # Find the next available chunk_id
-        start_chunk_id = 0
-        if self.chunk_to_doc:
-            start_chunk_id = max(self.chunk_to_doc.keys()) + 1
+        # Next available chunk_id
+        start_chunk_id = self._next_chunk_id
             
-        print(f"   Using start_doc_idx={start_doc_idx}, start_chunk_id={start_chunk_id}")
+        logger.debug(f"Using start_doc_idx={start_doc_idx}, start_chunk_id={start_chunk_id}")
         
         # Prepare data for indexing: (id, text, metadata)
         data = []
         chunk_id = start_chunk_id
+
+        appending = append and bool(self._indexid_to_chunk)
+        if appending:
+            # upsert() continues txtai's FAISS ids after the last vector ever added
+            # (deleted ones included), which txtai tracks as the "offset" setting
+            id_offset = self.embeddings.config.get("offset", 0)
+        else:
+            # embeddings.index() below rebuilds the FAISS index from scratch, so
+            # previously indexed chunks no longer have vectors behind them
+            for info in self.chunk_to_doc.values():
+                info.pop('indexid', None)
+            self._indexid_to_chunk = {}
+            id_offset = 0
         
         for i, doc in enumerate(valid_documents):
             doc_idx = start_doc_idx + i
@@ -179,7 +493,7 @@ class RealEstateRAG:
             for chunk_idx, chunk in enumerate(doc['chunks']):
                 # Skip empty or invalid chunks
                 if not chunk or not isinstance(chunk, str) or len(chunk.strip()) < 10:
-                    print(f"   WARNING: Skipping empty chunk {chunk_idx} in {doc['filename']}")
+                    logger.warning(f"Skipping empty chunk {chunk_idx} in {doc['filename']}")
                     continue
                     
                 # Store metadata for each chunk
@@ -199,7 +513,13 @@ class RealEstateRAG:
                 # Keep authority name if provided (e.g., MahaRERA)
                 if 'authority' in doc:
                     chunk_meta['authority'] = doc.get('authority')
+                # txtai assigns FAISS ids sequentially from 0 on index() and
+                # continues them on upsert(), so the id is the position in data
+                chunk_meta['indexid'] = id_offset + len(data)
+                self._indexid_to_chunk[id_offset + len(data)] = chunk_id
                 self.chunk_to_doc[chunk_id] = chunk_meta
+                self.filename_to_chunk_ids.setdefault(doc['filename'], set()).add(chunk_id)
+                self._set_chunk_columns(chunk_id, chunk_meta)
                 
                 # txtai expects metadata as None or simple types, not dict
                 data.append({
@@ -209,39 +529,37 @@ class RealEstateRAG:
                     'chunk_idx': chunk_idx
                 })
                 chunk_id += 1
+        self._next_chunk_id = chunk_id
         
-        # Index all chunks - optimized for large datasets
+        # Index all chunks. txtai encodes them in batches and buffers the vectors
+        # on disk, so a single call handles large datasets; a new index must be
+        # built in one index() call, as its quantizers are trained on that call's vectors
         if data:
             total_chunks = len(data)
-            print(f"\nBuilding FAISS index with {total_chunks} vectors...")
+            logger.info(f"{'Adding' if appending else 'Building FAISS index with'} {total_chunks} vectors...")
             
-            # For large datasets (1000+ docs, ~10k+ chunks), use batched indexing
-            if total_chunks > 5000:
-                print(f"   Large dataset detected - using batched indexing...")
-                batch_size = 2000
-                for i in range(0, total_chunks, batch_size):
-                    batch = data[i:i+batch_size]
-                    progress = min(100, int((i + len(batch)) / total_chunks * 100))
-                    print(f"   Indexing batch {i//batch_size + 1}: {progress}% ({i+len(batch)}/{total_chunks})")
-                    if i == 0:
-                        self.embeddings.index(batch)
-                    else:
-                        self.embeddings.upsert(batch)
+            if appending:
+                self.embeddings.upsert(data)
             else:
+                self.embeddings.config["faiss"] = self._faiss_settings(total_chunks)
                 self.embeddings.index(data)
             
             # Append new documents to the master list
             self.documents.extend(valid_documents)
-            print(f"[OK] Indexed {total_chunks} chunks from {len(valid_documents)} documents")
-            print(f"   Total documents in system: {len(self.documents)}")
+            for doc in valid_documents:
+                self.documents_by_name[doc['filename']] = doc
+            logger.info(f"Indexed {total_chunks} chunks from {len(valid_documents)} documents")
+            logger.info(f"Total documents in system: {len(self.documents)}")
         else:
-            print("WARNING: No chunks to index.")
+            logger.warning("No chunks to index.")
         
         # Store document stats for display
         for doc in self.documents:
             doc['char_count'] = len(doc.get('text', ''))
         
-        print(f"Indexed {chunk_id - start_chunk_id} chunks from {len(valid_documents)} documents")
+        logger.info(f"Indexed {chunk_id - start_chunk_id} chunks from {len(valid_documents)} documents")
+        self.index_version += 1
+        self._recompute_nprobe()
     
     def search(self, query: str, top_k: int = 5, file_filter: list = None, authority_filter: list = None) -> List[Dict]:
         """
@@ -264,63 +582,78 @@ class RealEstateRAG:
         has_file_filter = file_filter and len(file_filter) > 0
         has_authority_filter = authority_filter and len(authority_filter) > 0
         needs_filtering = has_file_filter or has_authority_filter
+        # Hashed membership for the per-result filter checks below
+        file_filter_set = frozenset(file_filter) if has_file_filter else frozenset()
+        authority_filter_set = frozenset(authority_filter) if has_authority_filter else frozenset()
         
         if needs_filtering:
-            print(f"Searching with filters: user_docs={len(file_filter) if file_filter else 0}, authority_docs={len(authority_filter) if authority_filter else 0}")
-            # Post-filtering strategy:
-            # Fetch more results than needed to ensure we find enough matches
-            search_limit = top_k * 15  # Fetch 15x results for better coverage
-            results = self.embeddings.search(query, search_limit)
+            logger.debug(f"Searching with filters: user_docs={len(file_filter) if file_filter else 0}, authority_docs={len(authority_filter) if authority_filter else 0}")
+            # Push the allowed chunk IDs into FAISS so only matching vectors are scored
+            results = self._faiss_search(query, top_k, (file_filter, authority_filter))
+
+            if results is None:
+                # Post-filtering strategy (fallback when FAISS selectors are unavailable):
+                # Fetch more results than needed to ensure we find enough matches
+                search_limit = top_k * 15  # Fetch 15x results for better coverage
+                results = self.embeddings.search(query, search_limit)
             
-            # Filter results
-            filtered_results = []
-            for result in results:
-                try:
-                    chunk_id = result.get('id')
-                    if chunk_id is None:
-                        continue
-                    # Handle string IDs
-                    if isinstance(chunk_id, str):
-                        chunk_id = int(chunk_id)
-                    elif not isinstance(chunk_id, int):
-                        continue
+                # Filter results (vectorized over the per-chunk columns when numpy is available)
+                if np is not None:
+                    results = self._mask_filter(results, top_k, file_filter, authority_filter)
+                else:
+                    filtered_results = []
+                    for result in results:
+                        try:
+                            chunk_id = result.get('id')
+                            if chunk_id is None:
+                                continue
+                            # Handle string IDs
+                            if isinstance(chunk_id, str):
+                                chunk_id = int(chunk_id)
+                            elif not isinstance(chunk_id, int):
+                                continue
                     
-                    chunk_info = self.chunk_to_doc.get(chunk_id, {})
-                    chunk_filename = chunk_info.get('filename', '')
-                    chunk_source_type = chunk_info.get('source_type', 'USER')
+                            # Unknown chunks behave like untitled user chunks
+                            if 0 <= chunk_id < len(self._chunk_source_type) and self._chunk_source_type[chunk_id] >= 0:
+                                chunk_filename = self._filenames[self._chunk_file_id[chunk_id]]
+                                is_authority = self._chunk_source_type[chunk_id] == SOURCE_AUTHORITY
+                            else:
+                                chunk_filename, is_authority = '', False
                     
-                    # Check if this chunk matches our filters
-                    include_chunk = False
+                            # Check if this chunk matches our filters
+                            include_chunk = False
                     
-                    # Handle user documents (source_type != 'AUTHORITY')
-                    if chunk_source_type != 'AUTHORITY':
-                        if has_file_filter:
-                            # If file_filter specified, include matching user docs
-                            if chunk_filename in file_filter:
-                                include_chunk = True
-                        else:
-                            # No specific user doc filter - include all user docs
-                            include_chunk = True
+                            # Handle user documents (source_type != 'AUTHORITY')
+                            if not is_authority:
+                                if has_file_filter:
+                                    # If file_filter specified, include matching user docs
+                                    if chunk_filename in file_filter_set:
+                                        include_chunk = True
+                                else:
+                                    # No specific user doc filter - include all user docs
+                                    include_chunk = True
                     
-                    # Handle authority documents
-                    if chunk_source_type == 'AUTHORITY':
-                        if has_authority_filter and chunk_filename in authority_filter:
-                            include_chunk = True
+                            # Handle authority documents
+                            if is_authority:
+                                if chunk_filename in authority_filter_set:
+                                    include_chunk = True
                     
-                    if include_chunk:
-                        filtered_results.append(result)
+                            if include_chunk:
+                                filtered_results.append(result)
                         
-                    if len(filtered_results) >= top_k:
-                        break
-                except (ValueError, TypeError, KeyError) as e:
-                    print(f"   WARNING: Error filtering result: {e}")
-                    continue
+                            if len(filtered_results) >= top_k:
+                                break
+                        except (ValueError, TypeError, KeyError) as e:
+                            logger.warning(f"Error filtering result: {e}")
+                            continue
             
-            results = filtered_results
+                    results = filtered_results
         else:
-            results = self.embeddings.search(query, top_k)
+            results = self._faiss_search(query, top_k)
+            if results is None:
+                results = self.embeddings.search(query, top_k)
         
-        print(f"   Found {len(results)} results after filtering")
+        logger.debug(f"Found {len(results)} results after filtering")
         
         formatted_results = []
         for result in results:
@@ -330,15 +663,15 @@ class RealEstateRAG:
                 if isinstance(chunk_id, str):
                     chunk_id = int(chunk_id)
                 elif not isinstance(chunk_id, int):
-                    print(f"   WARNING: Skipping result with invalid ID type")
+                    logger.warning("Skipping result with invalid ID type")
                     continue
             except (ValueError, TypeError, KeyError) as e:
-                print(f"   WARNING: Error converting chunk ID: {e}")
+                logger.warning(f"Error converting chunk ID: {e}")
                 continue
             
             chunk_info = self.chunk_to_doc.get(chunk_id)
             if not chunk_info:
-                print(f"   WARNING: No metadata for chunk {chunk_id}, skipping")
+                logger.warning(f"No metadata for chunk {chunk_id}, skipping")
                 continue
                 
             chunk_idx = chunk_info.get('chunk_idx', 0)
@@ -347,7 +680,7 @@ class RealEstateRAG:
             # Validate text content exists
             text_content = result.get('text', '').strip()
             if not text_content:
-                print(f"   WARNING: Empty text in chunk {chunk_id}, skipping")
+                logger.warning(f"Empty text in chunk {chunk_id}, skipping")
                 continue
             
             # Create descriptive section label
@@ -365,6 +698,195 @@ class RealEstateRAG:
         
         return formatted_results
     
+    def _encode_raw(self, query: str):
+        """Embed a query with the index's model (read-only so cached vectors can't be mutated)"""
+        vector = np.asarray(self.embeddings.transform(query), dtype='float32')
+        vector.flags.writeable = False
+        return vector
+
+    def embed_query(self, query: str):
+        """Embedding of a query as search() computes it (shared LRU cache, read-only array)"""
+        return self._encode_query(query)
+
+    def _filter_selector(self, file_filter: list, authority_filter: list) -> Tuple:
+        """
+        FAISS ids a filtered search is restricted to, as (ids, selector, exclude)
+
+        Same inclusion rules as the post-filter: user chunks from file_filter
+        (or all user docs), authority chunks only from authority_filter. With a
+        file_filter, ids are the allowed chunks; without one, ids are the
+        authority chunks outside authority_filter and the selector excludes them
+        (selector is None when nothing is excluded), so user chunks are never
+        walked. Built once per index version and filter.
+        """
+        if self._selector_cache_version != self.index_version or len(self._selector_cache) >= SELECTOR_CACHE_SIZE:
+            self._selector_cache = {}
+            self._selector_cache_version = self.index_version
+        key = (frozenset(file_filter or ()), frozenset(authority_filter or ()))
+        entry = self._selector_cache.get(key)
+        if entry is None:
+            entry = self._selector_cache[key] = self._build_selector(file_filter, authority_filter)
+        return entry
+
+    def _build_selector(self, file_filter: list, authority_filter: list) -> Tuple:
+        """Uncached _filter_selector"""
+        def chunk_indexids(filenames, authority):
+            indexids = []
+            for fname in filenames:
+                for chunk_id in self.filename_to_chunk_ids.get(fname, ()):
+                    info = self.chunk_to_doc[chunk_id]
+                    if (info.get('source_type') == 'AUTHORITY') == authority and 'indexid' in info:
+                        indexids.append(info['indexid'])
+            return indexids
+
+        if file_filter:
+            ids = np.asarray(chunk_indexids(file_filter, False) + chunk_indexids(authority_filter or (), True), dtype=np.int64)
+            return ids, faiss.IDSelectorBatch(ids), False
+
+        allowed_authority = set(authority_filter or ())
+        excluded = [
+            fname for fname, doc in self.documents_by_name.items()
+            if doc.get('source_type') == 'AUTHORITY' and fname not in allowed_authority
+        ]
+        ids = np.asarray(chunk_indexids(excluded, True), dtype=np.int64)
+        if not len(ids):
+            return ids, None, True
+        # faiss's Python wrapper keeps the inner selector referenced by IDSelectorNot
+        return ids, faiss.IDSelectorNot(faiss.IDSelectorBatch(ids)), True
+
+    def _gpu_replica(self, index):
+        """
+        GPU copy of the FAISS index, or None when no GPU is available
+
+        The replica is rebuilt whenever txtai swaps or grows the CPU index and
+        after deletes. The CPU index is never replaced, so save/upsert/delete
+        keep working on it unchanged.
+        """
+        if self._gpu_enabled is None:
+            self._gpu_enabled = faiss is not None and hasattr(faiss, "index_cpu_to_all_gpus") and faiss.get_num_gpus() > 0
+            if self._gpu_enabled:
+                logger.info(f"FAISS: {faiss.get_num_gpus()} GPU(s) available, unfiltered searches run on GPU")
+        if not self._gpu_enabled:
+            return None
+
+        if self._gpu_index is None or self._gpu_index[0] is not index or self._gpu_index[1] != index.ntotal:
+            try:
+                self._gpu_index = (index, index.ntotal, faiss.index_cpu_to_all_gpus(index))
+            except Exception as e:
+                logger.warning(f"Could not copy FAISS index to GPU, searching on CPU: {e}")
+                self._gpu_enabled = False
+                self._gpu_index = None
+                return None
+        return self._gpu_index[2]
+
+    def _faiss_search(self, query: str, top_k: int, filters: Tuple = None) -> Optional[List[Dict]]:
+        """
+        Search the FAISS index directly with a cached query vector
+
+        If filters (file_filter, authority_filter) is given, only the chunks
+        they allow are scored (ID selector, see _filter_selector).
+        Returns None when this path can't be used (faiss not importable, index
+        built before FAISS ids were tracked, or a FAISS error), in which case
+        search() falls back to txtai's search.
+        """
+        if faiss is None or not self._indexid_to_chunk:
+            return None
+        selector = None
+        if filters is not None:
+            ids, selector, exclude = self._filter_selector(*filters)
+            if not exclude and not len(ids):
+                return []
+
+        try:
+            index = self.embeddings.ann.backend
+            query_vector = self._encode_query(query).reshape(1, -1)
+            # Bypassing txtai means applying nprobe here as well
+            is_ivf = faiss.try_extract_index_ivf(index) is not None
+            nprobe = int(self.embeddings.config.get("faiss", {}).get("nprobe", 6))
+
+            # GPU indexes don't take ID selectors, so filtered searches stay on CPU
+            gpu_index = self._gpu_replica(index) if selector is None else None
+            if gpu_index is not None:
+                if is_ivf:
+                    faiss.GpuParameterSpace().set_index_parameter(gpu_index, "nprobe", nprobe)
+                scores, indexids = gpu_index.search(query_vector, top_k)
+            else:
+                if is_ivf:
+                    params = faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+                else:
+                    params = faiss.SearchParameters(sel=selector)
+                if isinstance(index, faiss.IndexPreTransform):
+                    params = faiss.SearchParametersPreTransform(index_params=params)
+                scores, indexids = index.search(query_vector, top_k, params=params)
+        except Exception as e:
+            logger.warning(f"Direct FAISS search failed, falling back to txtai search: {e}")
+            return None
+
+        results = []
+        for score, indexid in zip(scores[0], indexids[0]):
+            chunk_id = self._indexid_to_chunk.get(int(indexid))
+            if chunk_id is None:
+                continue
+            info = self.chunk_to_doc[chunk_id]
+            doc = self.documents_by_name.get(info.get('filename'), {})
+            chunks = doc.get('chunks', [])
+            chunk_idx = info.get('chunk_idx', 0)
+            text = chunks[chunk_idx] if chunk_idx < len(chunks) else ''
+            results.append({'id': chunk_id, 'text': text.strip(), 'score': float(score)})
+        return results
+
+    def _mask_filter(self, results: List[Dict], top_k: int, file_filter: list, authority_filter: list) -> List[Dict]:
+        """
+        Vectorized post-filter over the per-chunk columns
+
+        Same rules as the scalar loop in search(): user chunks must be in
+        file_filter (when given), authority chunks in authority_filter, and
+        unknown chunk IDs count as untitled user chunks.
+        """
+        valid, ids = [], []
+        for result in results:
+            chunk_id = result.get('id')
+            try:
+                if isinstance(chunk_id, str):
+                    chunk_id = int(chunk_id)
+                elif not isinstance(chunk_id, int):
+                    continue
+            except ValueError as e:
+                logger.warning(f"Error filtering result: {e}")
+                continue
+            valid.append(result)
+            ids.append(chunk_id)
+        if not ids:
+            return []
+
+        ids = np.asarray(ids, dtype=np.int64)
+        stypes = np.frombuffer(self._chunk_source_type, dtype=np.int8)
+        file_ids = np.frombuffer(self._chunk_file_id, dtype=np.intc)
+        in_range = (ids >= 0) & (ids < len(stypes))
+        safe_ids = np.where(in_range, ids, 0)
+        chunk_stype = np.where(in_range, stypes[safe_ids] if len(stypes) else -1, -1)
+        known = chunk_stype >= 0
+        chunk_file = np.where(known, file_ids[safe_ids] if len(file_ids) else -1, -1)
+        is_authority = chunk_stype == SOURCE_AUTHORITY
+
+        def file_id_array(filenames):
+            # -1 stands for the '' filename that unknown chunks report
+            return np.fromiter(
+                (self._filename_ids.get(f, -1 if f == '' else -2) for f in filenames), dtype=np.int64, count=len(filenames)
+            )
+
+        if file_filter:
+            user_mask = ~is_authority & np.isin(chunk_file, file_id_array(file_filter))
+        else:
+            user_mask = ~is_authority
+        if authority_filter:
+            authority_mask = is_authority & np.isin(chunk_file, file_id_array(authority_filter))
+        else:
+            authority_mask = np.zeros_like(is_authority)
+
+        keep = np.flatnonzero(user_mask | authority_mask)[:top_k]
+        return [valid[i] for i in keep]
+
     def get_context(self, query: str, top_k: int = 3, file_filter: list = None, authority_filter: list = None) -> Tuple[str, List[Dict]]:
         """
         Get context for RAG generation
@@ -391,46 +913,26 @@ class RealEstateRAG:
         
         context = "\n\n".join(context_parts)
         
-        # Debug: Print retrieved context
-        print(f"\nContext retrieved for query: '{query}'")
-        print("-" * 50)
-        print(context[:500] + "..." if len(context) > 500 else context)
-        print("-" * 50)
+        # Debug: Log retrieved context (preview sliced only when DEBUG is on)
+        if logger.isEnabledFor(logging.DEBUG):
+            n = len(context)
+            preview = context if n <= 500 else context[:500] + "..."
+            logger.debug("Context retrieved for query '%s' (%d chars): %s", query, n, preview)
         
         return context, results
     
-    def answer_query(self, query: str, top_k: int = 3, language: str = 'auto', file_filter: list = None, authority_filter: list = None, compliance_check: bool = False) -> Dict:
-        """
-        Answer a query using RAG with Llama 3
-        
-        Args:
-            query: The question to answer
-            top_k: Number of results to retrieve
-            language: Language preference ('auto', 'english', 'marathi')
-            file_filter: Optional list of user doc filenames to include
-            authority_filter: Optional list of authority doc filenames to include
-            compliance_check: If True, run comprehensive red flag detection
-        
-        Returns:
-            {
-                'query': str,
-                'context': str,
-                'sources': List[Dict],
-                'answer': str (from Llama 3 or synthesized)
-            }
-        """
-        context, sources = self.get_context(query, top_k, file_filter, authority_filter)
-
+    def _prepare_answer(self, query: str, top_k: int, file_filter: list, authority_filter: list, compliance_check: bool) -> Tuple[Dict, str, str]:
+        """Run retrieval and compliance checks for answer_query; returns (result without answer, LLM query, LLM context)"""
         # Check if user is asking about red flags in their query
-        red_flag_keywords = ['red flag', 'redflag', 'red flags', 'redflags', 'violation', 'violations', 
-                             'non-compliant', 'noncompliant', 'issue', 'issues', 'problem', 'problems',
-                             'check compliance', 'compliance check', 'verify compliance']
-        query_lower = query.lower()
-        is_red_flag_query = any(kw in query_lower for kw in red_flag_keywords)
+        is_red_flag_query = _RED_FLAG_RE.search(query.lower()) is not None
         
         # Run compliance check if explicitly requested OR if user is asking about red flags
         should_run_compliance = compliance_check or is_red_flag_query
 
+        # Retrieval still runs for compliance queries: the retrieved authority chunks
+        # back the red flags, and the context/sources feed the answer and response
+        context, sources = self.get_context(query, top_k, file_filter, authority_filter)
+
         # Red flag detection layer - runs on explicit compliance checks OR red flag queries
         red_flags = []
         compliance_results = []
@@ -439,11 +941,11 @@ class RealEstateRAG:
         has_any_flags = False
         
         if should_run_compliance:
-            print(f"   Running compliance check (explicit: {compliance_check}, query-triggered: {is_red_flag_query})...")
+            logger.debug(f"Running compliance check (explicit: {compliance_check}, query-triggered: {is_red_flag_query})...")
             try:
-                from .red_flag_detector import detect_red_flags, check_compliance, get_compliance_summary
+                from .red_flag_detector import detect_red_flags_batch, check_compliance, get_compliance_summary
             except ImportError:
-                from red_flag_detector import detect_red_flags, check_compliance, get_compliance_summary  # fallback import
+                from red_flag_detector import detect_red_flags_batch, check_compliance, get_compliance_summary  # fallback import
 
             # Separate user doc chunks from authority chunks (from search results)
             retrieved_user_chunks = [s for s in (sources or []) if s.get('source_type') != 'AUTHORITY']
@@ -452,12 +954,13 @@ class RealEstateRAG:
             # IMPORTANT: For comprehensive red flag detection, scan ALL chunks of selected user documents
             # not just the semantically retrieved ones (problematic clauses may not match search query)
             all_user_chunks = []
-            full_user_doc_text = ""  # Combine all text for compliance check
+            text_parts = []  # Combine all text for compliance check (joined once below)
             if file_filter:
+                user_files = frozenset([file_filter] if isinstance(file_filter, str) else file_filter)
                 for doc in self.documents:
-                    if doc.get('filename') in file_filter and doc.get('source_type', 'USER') != 'AUTHORITY':
+                    if doc.get('filename') in user_files and doc.get('source_type', 'USER') != 'AUTHORITY':
                         # Get full document text for compliance verification
-                        full_user_doc_text += " " + doc.get('text', '')
+                        text_parts.append(doc.get('text', ''))
                         # Get all chunks from this document
                         doc_chunks = doc.get('chunks', [])
                         for idx, chunk_text in enumerate(doc_chunks):
@@ -468,26 +971,35 @@ class RealEstateRAG:
                                 'chunk_idx': idx,
                                 'source_type': 'USER'
                             })
-                print(f"   Red flag scan: {len(all_user_chunks)} chunks from {len(file_filter)} user doc(s)")
+                logger.debug(f"Red flag scan: {len(all_user_chunks)} chunks from {len(file_filter)} user doc(s)")
             else:
                 # Fallback to retrieved chunks if no file filter
                 all_user_chunks = retrieved_user_chunks
                 for chunk in all_user_chunks:
-                    full_user_doc_text += " " + chunk.get('text', '')
+                    text_parts.append(chunk.get('text', ''))
+            full_user_doc_text = " " + " ".join(text_parts) if text_parts else ""
             
             # Run COMPLIANCE VERIFICATION - check for required clauses
-            print("   Running compliance verification (checking required clauses)...")
+            logger.debug("Running compliance verification (checking required clauses)...")
             compliance_results = check_compliance(full_user_doc_text)
             compliance_summary = get_compliance_summary(compliance_results)
-            print(f"   Compliance: {compliance_summary['compliant_count']}/{compliance_summary['total_checks']} checks passed")
+            logger.debug(f"Compliance: {compliance_summary['compliant_count']}/{compliance_summary['total_checks']} checks passed")
             
             # Run red flag detection on ALL user document chunks against authority
+            # in one batch (authority chunks are normalized once for every clause).
+            # rag_settings.red_flag_workers > 1 spreads large scans over a pool;
+            # rag_settings.red_flag_executor picks "process" (default) or "thread".
+            scan_chunks = [c for c in all_user_chunks if c.get('text')]
+            rag_settings = self.config.get("rag_settings", {})
+            workers = rag_settings.get("red_flag_workers", 1)
+            executor = rag_settings.get("red_flag_executor", "process")
+            # The query itself is scanned too, in case the user pastes a clause directly
+            flags_per_chunk = detect_red_flags_batch([c['text'] for c in scan_chunks] + [query], authority_chunks,
+                                                     workers=workers, executor=executor)
+            query_flags = flags_per_chunk.pop()
             all_red_flags = []
-            for user_chunk in all_user_chunks:
-                clause_text = user_chunk.get('text', '')
-                if not clause_text:
-                    continue
-                flags = detect_red_flags(clause_text, authority_chunks)
+            for user_chunk, flags in zip(scan_chunks, flags_per_chunk):
+                clause_text = user_chunk['text']
                 for flag in flags:
                     # Attach source info to each flag
                     flag['clause_source'] = {
@@ -497,19 +1009,16 @@ class RealEstateRAG:
                     }
                     all_red_flags.append(flag)
             
-            # Also check the query itself in case user pastes a clause directly
-            query_flags = detect_red_flags(query, authority_chunks)
             for flag in query_flags:
                 flag['clause_source'] = {'filename': 'user_query', 'section': '', 'excerpt': query[:200]}
                 all_red_flags.append(flag)
             
-            # Deduplicate by rule_id + clause excerpt
-            seen = set()
+            # Deduplicate by rule_id + clause excerpt (first flag per key wins, in order)
+            unique_flags = {}
             for f in all_red_flags:
-                key = (f['rule_id'], f.get('clause_source', {}).get('excerpt', '')[:50])
-                if key not in seen:
-                    seen.add(key)
-                    red_flags.append(f)
+                excerpt = f['clause_source']['excerpt']
+                unique_flags.setdefault((f['rule_id'], excerpt[:50]), f)
+            red_flags = list(unique_flags.values())
 
             is_red = any(f.get('severity') in ('HIGH', 'CRITICAL') for f in red_flags)
             has_any_flags = len(red_flags) > 0
@@ -553,12 +1062,6 @@ class RealEstateRAG:
                     parts.append("Red Flags: None detected")
             llm_context = "\n".join(parts)
 
-        # Generate explanation/answer
-        if self.llm:
-            answer = self.llm.multilingual_answer(llm_query, llm_context)
-        else:
-            answer = f"Based on the documents:\n\n{llm_context}"
-
         return {
             'query': query,
             'context': context,
@@ -572,26 +1075,84 @@ class RealEstateRAG:
                 'compliance_check': should_run_compliance,  # True if compliance check or red flag query
                 'is_compliant': compliance_summary.get('is_compliant', True) if compliance_summary else True,
                 'override_llm_decision': is_red
-            },
-            'answer': answer
-        }
+            }
+        }, llm_query, llm_context
+
+    def answer_query(self, query: str, top_k: int = 3, language: str = 'auto', file_filter: list = None, authority_filter: list = None, compliance_check: bool = False) -> Dict:
+        """
+        Answer a query using RAG with Llama 3
+        
+        Args:
+            query: The question to answer
+            top_k: Number of results to retrieve
+            language: Language preference ('auto', 'english', 'marathi')
+            file_filter: Optional list of user doc filenames to include
+            authority_filter: Optional list of authority doc filenames to include
+            compliance_check: If True, run comprehensive red flag detection
+        
+        Returns:
+            {
+                'query': str,
+                'context': str,
+                'sources': List[Dict],
+                'answer': str (from Llama 3 or synthesized)
+            }
+        """
+        result, llm_query, llm_context = self._prepare_answer(query, top_k, file_filter, authority_filter, compliance_check)
+
+        # Generate explanation/answer
+        if self.llm:
+            result['answer'] = self.llm.multilingual_answer(llm_query, llm_context)
+        else:
+            result['answer'] = f"Based on the documents:\n\n{llm_context}"
+        return result
+
+    def answer_query_stream(self, query: str, top_k: int = 3, language: str = 'auto', file_filter: list = None, authority_filter: list = None, compliance_check: bool = False) -> Tuple[Dict, Iterator[str]]:
+        """
+        Streaming variant of answer_query(): retrieval and compliance checks run
+        up front, the answer is left to the caller to consume piece by piece
+        
+        Returns:
+            (result dict as from answer_query() but without 'answer',
+             iterator over the answer text as the LLM generates it)
+        """
+        result, llm_query, llm_context = self._prepare_answer(query, top_k, file_filter, authority_filter, compliance_check)
+
+        if self.llm:
+            return result, self.llm.multilingual_answer_stream(llm_query, llm_context)
+        return result, iter([f"Based on the documents:\n\n{llm_context}"])
+
+    async def answer_query_async(self, query: str, top_k: int = 3, language: str = 'auto', file_filter: list = None, authority_filter: list = None, compliance_check: bool = False) -> Dict:
+        """
+        Async variant of answer_query() for event-loop (ASGI) servers: retrieval and
+        compliance checks run in a worker thread, and the Gemini call is awaited so
+        one event loop can keep many answers in flight
+        """
+        result, llm_query, llm_context = await asyncio.to_thread(
+            self._prepare_answer, query, top_k, file_filter, authority_filter, compliance_check)
+
+        if self.llm:
+            result['answer'] = await self.llm.amultilingual_answer(llm_query, llm_context)
+        else:
+            result['answer'] = f"Based on the documents:\n\n{llm_context}"
+        return result
     
     def save_index(self, path: str = "realestate_index"):
         """Save embeddings index and metadata - optimized for large document sets"""
         import time
         start_time = time.time()
         
-        print(f"   Saving FAISS index ({len(self.documents)} documents)...")
+        logger.info(f"Saving FAISS index ({len(self.documents)} documents)...")
         self.embeddings.save(path)
         
         # For large document sets, don't store full text in metadata (it's in FAISS content store)
         # Only store essential metadata to reduce JSON size
-        print(f"   Saving metadata...")
+        logger.info("Saving metadata...")
         metadata_path = f"{path}_metadata.json"
         
         # Optimize: Create lightweight document list without full text for large sets
         if len(self.documents) > 500:
-            print(f"   Optimizing metadata for {len(self.documents)} documents...")
+            logger.info(f"Optimizing metadata for {len(self.documents)} documents...")
             lightweight_docs = []
             for doc in self.documents:
                 # Keep essential fields, exclude full text (it's stored in FAISS)
@@ -611,73 +1172,175 @@ class RealEstateRAG:
         else:
             save_docs = self.documents
         
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'documents': save_docs,
-                'chunk_to_doc': {str(k): v for k, v in self.chunk_to_doc.items()},  # Ensure string keys
-                'doc_count': len(self.documents),
-                'chunk_count': len(self.chunk_to_doc)
-            }, f, ensure_ascii=False)  # Remove indent for faster save on large files
+        metadata = {
+            'documents': save_docs,
+            'doc_count': len(self.documents),
+            'chunk_count': len(self.chunk_to_doc)
+        }
+        sidecar_path = f"{path}_chunks.npz"
+        chunk_values = self._save_chunk_sidecar(sidecar_path) if len(self.chunk_to_doc) >= CHUNK_SIDECAR_MIN_CHUNKS else None
+        if chunk_values is not None:
+            metadata['chunk_values'] = chunk_values
+        else:
+            metadata['chunk_to_doc'] = {str(k): v for k, v in self.chunk_to_doc.items()}  # Ensure string keys
+            if os.path.exists(sidecar_path):
+                os.remove(sidecar_path)  # Stale sidecar from an earlier, larger save
+        if orjson is not None:
+            # orjson emits UTF-8 bytes in one pass (same output as ensure_ascii=False)
+            with open(metadata_path, 'wb') as f:
+                f.write(orjson.dumps(metadata, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(metadata_path, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, ensure_ascii=False)  # Remove indent for faster save on large files
         
         elapsed = time.time() - start_time
-        print(f"   Saved index to: {path} ({elapsed:.1f}s)")
+        logger.info(f"Saved index to: {path} ({elapsed:.1f}s)")
     
+    def _save_chunk_sidecar(self, sidecar_path: str) -> Optional[Dict]:
+        """
+        Write chunk_to_doc as numpy columns to sidecar_path
+
+        Returns the per-key value tables to store in the metadata JSON, or
+        None (nothing written) when numpy is missing or the metadata doesn't
+        fit the column layout - the caller then keeps chunk_to_doc in JSON.
+        """
+        if np is None:
+            return None
+        chunk_ids = np.fromiter(self.chunk_to_doc, dtype=np.int64, count=len(self.chunk_to_doc))
+        columns = {'chunk_id': chunk_ids}
+        for key in _CHUNK_INT_KEYS:
+            column = np.full(len(chunk_ids), -1, dtype=np.int64)
+            for row, info in enumerate(self.chunk_to_doc.values()):
+                value = info.get(key)
+                if value is not None:
+                    if type(value) is not int or value < 0:
+                        return None
+                    column[row] = value
+            columns[key] = column
+
+        value_tables = {}
+        for key in {k for info in self.chunk_to_doc.values() for k in info if k not in _CHUNK_INT_KEYS}:
+            table, codes = [], {}
+            column = np.full(len(chunk_ids), -1, dtype=np.int32)
+            for row, info in enumerate(self.chunk_to_doc.values()):
+                if key in info:
+                    value = info[key]
+                    try:
+                        code = codes.setdefault((type(value), value), len(table))  # keep 1, 1.0 and True apart
+                    except TypeError:  # unhashable (list/dict) metadata
+                        return None
+                    if code == len(table):
+                        table.append(value)
+                    column[row] = code
+            value_tables[key] = table
+            columns[f"values:{key}"] = column
+
+        np.savez(sidecar_path, **columns)
+        return value_tables
+
+    @staticmethod
+    def _load_chunk_sidecar(sidecar_path: str, value_tables: Dict) -> Dict[int, Dict]:
+        """Rebuild chunk_to_doc from the numpy columns written by _save_chunk_sidecar"""
+        with np.load(sidecar_path) as columns:
+            chunk_ids = columns['chunk_id'].tolist()
+            int_columns = [(key, columns[key].tolist()) for key in _CHUNK_INT_KEYS]
+            code_columns = [(key, table, columns[f"values:{key}"].tolist()) for key, table in value_tables.items()]
+
+        chunk_to_doc = {}
+        for row, chunk_id in enumerate(chunk_ids):
+            info = {}
+            for key, column in int_columns:
+                if column[row] >= 0:
+                    info[key] = column[row]
+            for key, table, column in code_columns:
+                if column[row] >= 0:
+                    info[key] = table[column[row]]
+            chunk_to_doc[chunk_id] = info
+        return chunk_to_doc
+
     def load_index(self, path: str = "realestate_index"):
         """Load a saved embeddings index"""
         self.embeddings.load(path)
         
         # Load document metadata
         metadata_path = f"{path}_metadata.json"
-        with open(metadata_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            print(f"   JSON loaded: {len(data['documents'])} documents")
-            self.documents = data['documents']
-            print(f"   After assignment: {len(self.documents)} documents")
-            
-            # Backfill source_type on documents if missing (default to USER)
-            docs_backfilled = 0
-            for doc in self.documents:
-                if 'source_type' not in doc:
-                    doc['source_type'] = 'USER'
-                    docs_backfilled += 1
-            if docs_backfilled > 0:
-                print(f"   Backfilled source_type='USER' for {docs_backfilled} documents")
-            
-            # Build doc filename -> source_type map for chunk backfilling
-            doc_source_map = {}
-            for doc in self.documents:
-                fname = doc.get('filename', '')
-                doc_source_map[fname] = doc.get('source_type', 'USER')
-            
-            # Safely convert keys to integers with validation
-            self.chunk_to_doc = {}
-            backfilled = 0
-            for k, v in data['chunk_to_doc'].items():
-                try:
-                    chunk_data = v.copy() if isinstance(v, dict) else {}
-                    # Backfill source_type if missing
-                    if 'source_type' not in chunk_data:
-                        fname = chunk_data.get('filename', '')
-                        chunk_data['source_type'] = doc_source_map.get(fname, 'USER')
-                        backfilled += 1
-                    self.chunk_to_doc[int(k)] = chunk_data
-                except (ValueError, TypeError) as e:
-                    print(f"WARNING: Skipping invalid chunk ID '{k}': {e}")
-            
-            if backfilled > 0:
-                print(f"   Backfilled source_type for {backfilled} chunks")
+        data = load_json_file(metadata_path)
+        logger.debug(f"JSON loaded: {len(data['documents'])} documents")
+        self.documents = data['documents']
+        logger.debug(f"After assignment: {len(self.documents)} documents")
+        
+        # Backfill source_type on documents if missing (default to USER), and
+        # bring chunks saved in other formats to plain strings
+        docs_backfilled = 0
+        for doc in self.documents:
+            _normalize_chunks(doc)
+            if 'source_type' not in doc:
+                doc['source_type'] = 'USER'
+                docs_backfilled += 1
+        if docs_backfilled > 0:
+            logger.info(f"Backfilled source_type='USER' for {docs_backfilled} documents")
+        
+        # Build doc filename -> source_type map for chunk backfilling
+        doc_source_map = {}
+        for doc in self.documents:
+            fname = doc.get('filename', '')
+            doc_source_map[fname] = doc.get('source_type', 'USER')
         
-        print(f"Loaded index from: {path}")
+        # Safely convert keys to integers with validation
+        chunk_to_doc = self.chunk_to_doc = {}
+        intern = sys.intern
+        backfilled = 0
+        if 'chunk_values' in data:
+            if np is None:
+                raise ImportError(f"numpy is required to load the chunk metadata sidecar {path}_chunks.npz")
+            saved_chunks = self._load_chunk_sidecar(f"{path}_chunks.npz", data['chunk_values'])
+        else:
+            saved_chunks = data['chunk_to_doc']
+        for k, v in saved_chunks.items():
+            try:
+                # The parsed dicts belong to this load, so they're updated in place
+                chunk_data = v if isinstance(v, dict) else {}
+                # JSON decoding gives every chunk its own copy of these strings;
+                # share one object per distinct value (chunks of a document repeat them)
+                for key in ('filename', 'source_type'):
+                    value = chunk_data.get(key)
+                    if type(value) is str:
+                        chunk_data[key] = intern(value)
+                # Backfill source_type if missing
+                if 'source_type' not in chunk_data:
+                    fname = chunk_data.get('filename', '')
+                    chunk_data['source_type'] = doc_source_map.get(fname, 'USER')
+                    backfilled += 1
+                chunk_to_doc[int(k)] = chunk_data
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Skipping invalid chunk ID '{k}': {e}")
+        
+        if backfilled > 0:
+            logger.info(f"Backfilled source_type for {backfilled} chunks")
+        
+        self._rebuild_lookups()
+        self._next_chunk_id = max(self.chunk_to_doc, default=-1) + 1
+        self.index_version += 1
+        self._recompute_nprobe()
+        logger.info(f"Loaded index from: {path}")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
     # Test the RAG system
     rag = RealEstateRAG()
     
-    # Load processed documents
-    if os.path.exists("processed_documents.json"):
-        with open("processed_documents.json", 'r', encoding='utf-8') as f:
-            documents = json.load(f)
+    # Load processed documents (gzipped JSON Lines from document_processor.py,
+    # or an older plain JSON Lines / JSON list)
+    jsonl_path = next((p for p in ("processed_documents.jsonl.gz", "processed_documents.jsonl") if os.path.exists(p)), None)
+    if jsonl_path or os.path.exists("processed_documents.json"):
+        if jsonl_path:
+            with (gzip.open if jsonl_path.endswith('.gz') else open)(jsonl_path, 'rt', encoding='utf-8') as f:
+                documents = [json.loads(line) for line in f if line.strip()]
+        else:
+            with open("processed_documents.json", 'r', encoding='utf-8') as f:
+                documents = json.load(f)
         
         # Index documents
         rag.index_documents(documents)
@@ -700,4 +1363,4 @@ if __name__ == "__main__":
             for src in result['sources']:
                 print(f"   - {src['filename']} (Score: {src['score']:.4f})")
     else:
-        print("ERROR: No processed_documents.json found. Run document_processor.py first.")
+        print("ERROR: No processed_documents.jsonl.gz found. Run document_processor.py first.")
@@ -6,12 +6,19 @@ Prevents duplicate indexing by tracking processed documents
 import os
 import json
 import hashlib
-from pathlib import Path
-from realestate_rag import RealEstateRAG
-from document_processor import DocumentProcessor
-from ocr_engine import FolderOCR
+import logging
+import sqlite3
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from realestate_rag import RealEstateRAG, load_json_file
+from document_processor import DocumentProcessor, _init_pdf_worker, _pdf_worker_threads, _process_pdf_worker
 from scraper import MahaRERA_FullScraper
 
+try:
+    import ijson  # optional - streams metadata without building every document's text
+except ImportError:
+    ijson = None
+
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -42,6 +49,10 @@ config = load_config()
 PDF_FOLDER = os.getenv("RAG_PDF_FOLDER", config.get("pdf_folder", r"C:\Users\manis\Downloads\cloverrag"))
 INDEX_PATH = os.path.join(SCRIPT_DIR, config.get("index_path", "realestate_index"))
 TRACKING_FILE = os.path.join(SCRIPT_DIR, config.get("tracking_file", "indexed_documents.txt"))
+# Threads used to hash PDFs on startup (hashing releases the GIL, so reads overlap)
+HASH_WORKERS = int(os.getenv("RAG_HASH_WORKERS", config.get("hash_workers", 8)))
+# Processes used to OCR new PDFs (each loads its own PaddleOCR model; 1 = in-process)
+OCR_WORKERS = int(os.getenv("RAG_OCR_WORKERS", config.get("ocr_workers", 1)))
 
 
 class AutoIndexer:
@@ -51,51 +62,145 @@ class AutoIndexer:
         self.pdf_folder = pdf_folder
         self.index_path = index_path
         self.tracking_file = tracking_file
-        self.indexed_files = self.load_indexed_files()
+        # Indexed files live in a SQLite table next to the configured tracking file
+        self.tracking_db = os.path.splitext(tracking_file)[0] + ".sqlite"
+        self.db = self.load_indexed_files()
         
     def load_indexed_files(self):
-        """Load the list of already indexed files"""
-        if os.path.exists(self.tracking_file):
+        """Open the indexed-files database (importing a legacy text tracking file once)"""
+        is_new = not os.path.exists(self.tracking_db)
+        db = sqlite3.connect(self.tracking_db)
+        # Write-ahead log: each commit appends the changed pages and fsyncs once at
+        # checkpoints, and readers (e.g. the API server) aren't blocked by the indexer
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS indexed (file_id TEXT PRIMARY KEY, filename TEXT, hash TEXT)")
+        db.execute("CREATE INDEX IF NOT EXISTS idx_hash ON indexed(hash)")
+        db.execute("CREATE INDEX IF NOT EXISTS idx_filename ON indexed(filename)")
+        # Last seen (mtime, size) -> hash per path, so unchanged files aren't re-read
+        db.execute("CREATE TABLE IF NOT EXISTS file_hashes (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, hash TEXT)")
+        
+        # Older versions kept one "filename:hash" line per document in a text file
+        if is_new and self.tracking_file != self.tracking_db and os.path.exists(self.tracking_file):
             with open(self.tracking_file, 'r', encoding='utf-8') as f:
-                return set(line.strip() for line in f if line.strip())
-        return set()
+                rows = [(line, *line.rsplit(':', 1)) for line in (l.strip() for l in f) if ':' in line]
+            db.executemany("INSERT OR IGNORE INTO indexed VALUES (?, ?, ?)", rows)
+            print(f"Imported {len(rows)} tracked documents from {self.tracking_file}")
+        db.commit()
+        return db
+    
+    def is_indexed(self, file_id):
+        """Check whether this exact file version (filename:hash) was indexed"""
+        return self.db.execute("SELECT 1 FROM indexed WHERE file_id = ?", (file_id,)).fetchone() is not None
     
-    def save_indexed_files(self):
-        """Save the list of indexed files"""
-        with open(self.tracking_file, 'w', encoding='utf-8') as f:
-            for filename in sorted(self.indexed_files):
-                f.write(f"{filename}\n")
+    def save_indexed_files(self, docs):
+        """Record newly indexed documents (dicts with 'id', 'filename' and 'hash')"""
+        self.db.executemany(
+            "INSERT OR IGNORE INTO indexed VALUES (?, ?, ?)",
+            [(doc['id'], doc['filename'], doc['hash']) for doc in docs]
+        )
+        self.db.commit()
+    
+    def forget_document(self, filename):
+        """Drop every tracked version of a file so it is indexed again if re-added"""
+        self.db.execute("DELETE FROM indexed WHERE filename = ?", (filename,))
+        self.db.commit()
     
     def get_file_hash(self, filepath):
         """Get hash of file to detect changes"""
-        hasher = hashlib.sha256()
         with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            # Python 3.11+: hashed in C with a reused buffer, GIL released per block
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, 'sha256').hexdigest()
+            hasher = hashlib.sha256()
+            for chunk in iter(lambda: f.read(1 << 20), b""):  # 1 MiB reads
                 hasher.update(chunk)
         return hasher.hexdigest()
     
+    def load_existing_documents(self, metadata_path, full=False):
+        """
+        Load the documents list from the index metadata
+        
+        Unless full=True, only each document's filename and source_type are
+        returned - with ijson installed these are streamed from the file, so
+        the (large) text and chunk fields are never materialized.
+        """
+        if full or ijson is None:
+            docs = load_json_file(metadata_path).get('documents', [])
+            if full:
+                return docs
+            return [{k: d[k] for k in ('filename', 'source_type') if k in d} for d in docs]
+        
+        docs = []
+        with open(metadata_path, 'rb') as f:
+            for prefix, event, value in ijson.parse(f):
+                if prefix == 'documents.item' and event == 'start_map':
+                    docs.append({})
+                elif prefix == 'documents.item.filename' or prefix == 'documents.item.source_type':
+                    docs[-1][prefix[len('documents.item.'):]] = value
+        return docs
+    
+    def get_file_hashes(self, pdf_paths):
+        """
+        Hash a list of files, reusing cached hashes for files whose
+        (mtime, size) hasn't changed since the last scan
+        """
+        cached = {path: (mtime_ns, size, file_hash)
+                  for path, mtime_ns, size, file_hash in self.db.execute("SELECT path, mtime_ns, size, hash FROM file_hashes")}
+        
+        hashes = [None] * len(pdf_paths)
+        stale = []  # (position, path, mtime_ns, size) of files that must be read
+        for pos, pdf_path in enumerate(pdf_paths):
+            st = os.stat(pdf_path)
+            entry = cached.get(pdf_path)
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                hashes[pos] = entry[2]
+            else:
+                stale.append((pos, pdf_path, st.st_mtime_ns, st.st_size))
+        
+        # Hash changed/new files concurrently
+        stale_paths = [path for _, path, _, _ in stale]
+        if len(stale_paths) > 1 and HASH_WORKERS > 1:
+            with ThreadPoolExecutor(max_workers=HASH_WORKERS) as ex:
+                new_hashes = list(ex.map(self.get_file_hash, stale_paths))
+        else:
+            new_hashes = [self.get_file_hash(path) for path in stale_paths]
+        
+        for (pos, _, _, _), file_hash in zip(stale, new_hashes):
+            hashes[pos] = file_hash
+        if stale:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)",
+                [(path, mtime_ns, size, file_hash) for (_, path, mtime_ns, size), file_hash in zip(stale, new_hashes)]
+            )
+            self.db.commit()
+        return hashes
+    
     def get_pdf_files(self):
         """Get all PDF files from the folder"""
         if not os.path.exists(self.pdf_folder):
             print(f"WARNING: Folder not found: {self.pdf_folder}")
             return []
         
-        pdf_files = []
-        for file in Path(self.pdf_folder).glob("*.pdf"):
-            pdf_files.append(str(file))
-        return pdf_files
+        # scandir gets the file type from the directory listing (no Path objects
+        # or extra stat per entry)
+        with os.scandir(self.pdf_folder) as entries:
+            return [entry.path for entry in entries
+                    if os.path.normcase(entry.name).endswith('.pdf') and entry.is_file()]
     
     def get_new_documents(self):
         """Get list of new documents that haven't been indexed"""
         all_pdfs = self.get_pdf_files()
         new_docs = []
         
-        for pdf_path in all_pdfs:
+        # Hash all files first (cached/concurrent), then check them against the tracking database
+        hashes = self.get_file_hashes(all_pdfs)
+        
+        for pdf_path, file_hash in zip(all_pdfs, hashes):
             filename = os.path.basename(pdf_path)
-            file_hash = self.get_file_hash(pdf_path)
             file_id = f"{filename}:{file_hash}"
             
-            if file_id not in self.indexed_files:
+            if not self.is_indexed(file_id):
                 new_docs.append({
                     'path': pdf_path,
                     'filename': filename,
@@ -111,8 +216,9 @@ class AutoIndexer:
         print("Scanning for new documents...")
         print("="*70)
         
-        # Initialize processor early (needed for both user docs and authority docs)
-        processor = DocumentProcessor(ocr_engine=FolderOCR())
+        # Initialize processor early (needed for both user docs and authority docs);
+        # PaddleOCR is loaded on first use, not when OCR_WORKERS processes do the OCR
+        processor = DocumentProcessor()
         
         # Get new user documents
         new_docs = self.get_new_documents()
@@ -131,9 +237,8 @@ class AutoIndexer:
         if os.path.exists(metadata_path):
             print("Loading existing documents metadata...")
             try:
-                with open(metadata_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    existing_docs = data.get('documents', [])
+                # Filenames/types are enough unless the index has to be rebuilt (loaded then)
+                existing_docs = self.load_existing_documents(metadata_path)
                 print(f"Loaded {len(existing_docs)} existing documents")
             except Exception as e:
                 print(f"WARNING: Error loading metadata: {e}")
@@ -153,10 +258,21 @@ class AutoIndexer:
             print("\nProcessing new user documents...")
             total_new = len(new_docs)
             
+            pool, pending = None, None
+            if OCR_WORKERS > 1 and total_new > 1:
+                # OCR PDFs in parallel; results are still handled in order below
+                workers = min(OCR_WORKERS, total_new)
+                pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker,
+                                           initargs=(_pdf_worker_threads(workers),))
+                pending = [pool.submit(_process_pdf_worker, doc_info['path']) for doc_info in new_docs]
+            
             for idx, doc_info in enumerate(new_docs, 1):
                 try:
                     print(f"\nProcessing [{idx}/{total_new}]: {doc_info['filename']}")
-                    processed_doc = processor.process_pdf(doc_info['path'])
+                    if pending is not None:
+                        processed_doc = pending[idx - 1].result()
+                    else:
+                        processed_doc = processor.process_pdf(doc_info['path'])
                     
                     if processed_doc and processed_doc.get('text'):
                         text_length = len(processed_doc['text'])
@@ -182,8 +298,10 @@ class AutoIndexer:
                         
                 except Exception as e:
                     print(f"   ERROR: {str(e)}")
-                    import traceback
                     traceback.print_exc()
+            
+            if pool is not None:
+                pool.shutdown()
         
         # ALWAYS check for new MahaRERA documents on startup
         print("\n" + "="*70)
@@ -194,7 +312,7 @@ class AutoIndexer:
         updated_authority_filenames = set()  # Track which docs are being updated
         
         try:
-            scraper = MahaRERA_FullScraper()
+            scraper = MahaRERA_FullScraper(ocr_workers=OCR_WORKERS)
             scraped = scraper.run(dry_run=False) or []
             
             if scraped:
@@ -246,7 +364,6 @@ class AutoIndexer:
                 
         except Exception as e:
             print(f"WARNING: Error running scraper: {e}")
-            import traceback
             traceback.print_exc()
         
         # Check if anything new to index
@@ -261,39 +378,69 @@ class AutoIndexer:
         print("\nInitializing RAG system...")
         rag_system = RealEstateRAG(use_llm=True)
 
+        # Add to the saved index when there is one: chunk IDs keep counting up and
+        # txtai's upsert appends vectors, so only new documents are embedded.
+        # Without a usable saved index, build a fresh one from all documents.
+        incremental = False
+        if existing_docs and os.path.exists(self.index_path):
+            try:
+                rag_system.load_index(self.index_path)
+                # Indexes saved before chunks recorded their FAISS ids can't be appended to
+                incremental = rag_system.can_upsert()
+                if not incremental:
+                    print("Existing index has no FAISS ids for its chunks, rebuilding it with all documents")
+                    rag_system = RealEstateRAG(use_llm=True)
+            except Exception as e:
+                print(f"WARNING: Could not load existing index, rebuilding from scratch: {e}")
+                rag_system = RealEstateRAG(use_llm=True)
+        
+        if existing_docs and not incremental:
+            # Rebuilding re-embeds existing documents, so their chunks are needed
+            existing_docs = self.load_existing_documents(metadata_path, full=True)
+            existing_user_docs = [d for d in existing_docs if d.get('source_type') != 'AUTHORITY']
+            existing_authority_docs = [d for d in existing_docs if d.get('source_type') == 'AUTHORITY']
+
+        # A user PDF re-added with new content (same filename, new hash) replaces its old version
+        existing_user_filenames = {d['filename'] for d in existing_user_docs}
+        updated_user_filenames = {d['filename'] for d in new_processed_docs if d['filename'] in existing_user_filenames}
+        
         # Remove old versions of updated authority docs (memory management)
         existing_authority_docs_filtered = [
             d for d in existing_authority_docs 
             if d['filename'] not in updated_authority_filenames
         ]
+        existing_user_docs_filtered = [
+            d for d in existing_user_docs
+            if d['filename'] not in updated_user_filenames
+        ]
         
         if updated_authority_filenames:
             print(f"Removing {len(updated_authority_filenames)} outdated authority doc(s) from index")
 
         # Combine: existing user docs + new user docs + filtered existing authority + new authority
-        all_docs = existing_user_docs + new_processed_docs + existing_authority_docs_filtered + new_authority_docs
+        all_docs = existing_user_docs_filtered + new_processed_docs + existing_authority_docs_filtered + new_authority_docs
+        docs_to_index = new_processed_docs + new_authority_docs if incremental else all_docs
         
-        # Validate combined documents
-        print(f"\nValidating {len(all_docs)} total documents...")
-        for idx, doc in enumerate(all_docs):
+        # Validate documents being embedded
+        print(f"\nValidating {len(docs_to_index)} documents...")
+        for idx, doc in enumerate(docs_to_index):
             text_len = len(doc.get('text', ''))
             if text_len < 100:
                 print(f"WARNING: Document {idx} has only {text_len} chars of text!")
                 print(f"   Filename: {doc.get('filename', 'unknown')}")
         
-        # Re-index everything from scratch (IMPORTANT: this creates fresh chunk IDs)
-        # We don't append to existing index because:
-        # 1. txtai doesn't support true incremental indexing
-        # 2. Re-indexing ensures no chunk ID collisions
-        # 3. Guarantees consistency between embeddings and metadata
-        print(f"\nBuilding fresh index with {len(all_docs)} documents...")
-        rag_system.index_documents(all_docs)
+        if incremental:
+            print(f"\nAdding {len(docs_to_index)} documents to the existing index...")
+            rag_system.upsert_documents(
+                docs_to_index, delete_filenames=sorted(updated_authority_filenames | updated_user_filenames)
+            )
+        else:
+            print(f"\nBuilding fresh index with {len(all_docs)} documents...")
+            rag_system.index_documents(all_docs)
         rag_system.save_index(self.index_path)
         
-        # Update tracking file for user docs
-        for doc in new_docs:
-            self.indexed_files.add(doc['id'])
-        self.save_indexed_files()
+        # Update tracking database for user docs
+        self.save_indexed_files(new_docs)
         
         print("\n" + "="*70)
         print("Indexing complete!")
@@ -302,7 +449,7 @@ class AutoIndexer:
         print(f"New MahaRERA documents: {len(new_authority_docs) - len(updated_authority_filenames)}")
         print(f"Updated MahaRERA documents: {len(updated_authority_filenames)}")
         print(f"Total documents in index: {len(all_docs)}")
-        print(f"   - User documents: {len(existing_user_docs) + len(new_processed_docs)}")
+        print(f"   - User documents: {len(existing_user_docs_filtered) + len(new_processed_docs)}")
         print(f"   - Authority documents: {len(existing_authority_docs_filtered) + len(new_authority_docs)}")
         print(f"Index saved to: {self.index_path}")
         print("="*70)
@@ -312,6 +459,8 @@ class AutoIndexer:
 
 def auto_index_on_startup():
     """Run auto-indexing on startup"""
+    # Entry point (also run in a subprocess by gunicorn): show RAG engine progress
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     indexer = AutoIndexer(PDF_FOLDER, INDEX_PATH, TRACKING_FILE)
     return indexer.index_new_documents()
 
@@ -339,5 +488,4 @@ if __name__ == '__main__':
             
     except Exception as e:
         print(f"\nERROR: Error during indexing: {str(e)}")
-        import traceback
         traceback.print_exc()
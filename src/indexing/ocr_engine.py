@@ -1,4 +1,8 @@
+import hashlib
 import os
+import queue
+import tempfile
+import threading
 import cv2
 import numpy as np
 from pdf2image import convert_from_path
@@ -21,32 +25,150 @@ elif not os.path.exists(POPPLER_PATH):
         print("   Set POPPLER_PATH environment variable or install poppler")
 
 # Import PaddleOCR after setting environment variables
+import paddleocr
 from paddleocr import PaddleOCR
 
+try:
+    import pymupdf  # optional - reads the text layer of digitally generated pages
+except ImportError:
+    try:
+        import fitz as pymupdf  # PyMuPDF < 1.24
+    except ImportError:
+        pymupdf = None
+
+OCR_LANG = "mr"
+
+# Directory caching OCR text per rendered page image, so re-indexing a PDF
+# (or one sharing pages with another) skips PaddleOCR; "" disables the cache
+OCR_CACHE_DIR = os.getenv("OCR_CACHE", ".ocr_cache")
+
+# Pages whose embedded text has at least this many letters/digits use it instead of OCR
+MIN_TEXT_LAYER_CHARS = 200
+
+# Denoising FolderOCR applies to pages before OCR by default: "none" (pages go to
+# PaddleOCR as rendered), "median" (grayscale + 3x3 median blur, a few ms per page)
+# or "nlmeans" (grayscale + non-local means, much slower)
+OCR_DENOISE = os.getenv("OCR_DENOISE", "none")
+
+# Device FolderOCR runs PaddleOCR on by default: "gpu", "cpu" or "auto" (GPU if Paddle sees one)
+OCR_DEVICE = os.getenv("OCR_DEVICE", "auto")
+
+def _paddle_has_gpu():
+    """True if Paddle is built with CUDA and can see at least one GPU"""
+    try:
+        import paddle
+        return paddle.device.is_compiled_with_cuda() and paddle.device.cuda.device_count() > 0
+    except Exception:
+        return False
+
+def _create_ocr_engine(use_gpu, cpu_threads=None, log=print):
+    """
+    Create the PaddleOCR engine (Marathi includes English): on the GPU in half
+    precision (TensorRT FP16), or on the CPU with oneDNN (MKL-DNN) kernels and
+    cpu_threads threads (default one per core; processes OCRing side by side
+    should each pass their share). On PaddleOCR 3.x, enable_hpi also picks the
+    fastest installed inference backend per model.
+    Each attempt falls back to plainer settings if its options aren't supported.
+    """
+    base = dict(lang=OCR_LANG, use_angle_cls=True)
+    cpu_threads = cpu_threads or os.cpu_count() or 1
+    if hasattr(PaddleOCR, 'predict'):  # PaddleOCR 3.x
+        device = dict(device="gpu" if use_gpu else "cpu")
+    else:  # PaddleOCR 2.x
+        device = dict(use_gpu=use_gpu, rec_batch_num=16, cls_batch_num=16)
+        if use_gpu:
+            device['gpu_mem'] = 4096
+    if use_gpu:
+        fast = dict(use_tensorrt=True, precision="fp16")
+    else:
+        fast = dict(enable_mkldnn=True, cpu_threads=cpu_threads)
+    
+    attempts = [{**base, **device, **fast}, {**base, **device}, base]
+    if 'device' in device:
+        # High-performance inference needs extra packages; without them keep the rest
+        attempts.insert(0, {**attempts[0], 'enable_hpi': True})
+    for i, kwargs in enumerate(attempts):
+        if i and kwargs == attempts[i - 1]:
+            continue
+        try:
+            ocr = PaddleOCR(**kwargs)
+            on_gpu = kwargs.get('device') == "gpu" or kwargs.get('use_gpu')
+            log(f"PaddleOCR ready on {'GPU' if on_gpu else 'CPU'}"
+                f"{' (' + kwargs['precision'] + ')' if 'precision' in kwargs else ''}"
+                f"{' with high-performance inference' if kwargs.get('enable_hpi') else ''}")
+            return ocr
+        except Exception as e:
+            if kwargs is base:
+                raise
+            log(f"   PaddleOCR options unavailable ({type(e).__name__}: {e}), retrying with defaults")
+
+# PaddleOCR engines shared by all FolderOCR instances in this process, keyed on
+# (use_gpu, cpu_threads): (engine, lock serializing its calls, as Paddle predictors
+# aren't thread-safe)
+_engine_cache = {}
+_engine_cache_lock = threading.Lock()
+
+def _get_ocr_engine(use_gpu, cpu_threads=None):
+    """Return the cached (PaddleOCR, lock) for this device, loading the models once"""
+    key = (use_gpu, cpu_threads)
+    with _engine_cache_lock:
+        if key not in _engine_cache:
+            # Marathi model includes English by default (using local cached models)
+            print("Initializing PaddleOCR (using local models)...")
+            _engine_cache[key] = (_create_ocr_engine(use_gpu, cpu_threads), threading.Lock())
+        return _engine_cache[key]
+
 class FolderOCR:
-    def __init__(self, dpi=200):
-        # Marathi model includes English by default (using local cached models)
-        print("Initializing PaddleOCR (using local models)...")
-        self.ocr = PaddleOCR(lang="mr", use_angle_cls=True)
-        print("PaddleOCR ready")
+    def __init__(self, dpi=200, denoise_mode=None, device=None, cpu_threads=None):
+        # Denoising of OCR'd pages (preprocess_array): "none", "median" or "nlmeans"
+        # (default: OCR_DENOISE)
+        denoise_mode = (denoise_mode or OCR_DENOISE).lower()
+        if denoise_mode not in ("median", "nlmeans", "none"):
+            raise ValueError(f"Unknown denoise_mode: {denoise_mode}")
+        self.denoise_mode = denoise_mode
+        # PaddleOCR device: "gpu", "cpu" or "auto" (default: OCR_DEVICE)
+        device = (device or OCR_DEVICE).lower()
+        if device not in ("auto", "gpu", "cpu"):
+            raise ValueError(f"Unknown device: {device}")
+
+        # Loaded once per process and device, then shared by later FolderOCR instances.
+        # cpu_threads: CPU inference threads (default one per core; OCR worker
+        # processes get their share of the cores)
+        use_gpu = device == "gpu" or (device == "auto" and _paddle_has_gpu())
+        self.ocr, self._ocr_lock = _get_ocr_engine(use_gpu, cpu_threads)
         self.dpi = dpi
+        # Most pages passed to PaddleOCR in one call (PaddleOCR 3.x batches them)
+        self.ocr_batch_size = max(1, int(os.getenv("PADDLEOCR_BATCH", "8")))
+        self.cache_dir = OCR_CACHE_DIR
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        # Cached text is only reused by the same language, PaddleOCR version and denoising
+        self._cache_salt = f"{OCR_LANG}|{getattr(paddleocr, '__version__', '')}|{denoise_mode}".encode()
 
     # ----------------------------
     # Image Preprocessing
     # ----------------------------
-    def preprocess_image(self, img_path):
-        img = cv2.imread(img_path)
-
+    def preprocess_array(self, img):
+        """Grayscale and denoise a page array in memory (RGB as from PIL, or gray)"""
         # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
 
         # Light denoising only
-        denoised = cv2.fastNlMeansDenoising(gray, h=10)
+        if self.denoise_mode == "median":
+            denoised = cv2.medianBlur(gray, 3)
+        elif self.denoise_mode == "nlmeans":
+            denoised = cv2.fastNlMeansDenoising(gray, h=10)
+        else:
+            denoised = gray
 
-        # Upscale if needed for better OCR
-        height, width = denoised.shape
-        if height < 1500:
-            denoised = cv2.resize(denoised, (width * 2, height * 2), interpolation=cv2.INTER_CUBIC)
+        # No upscaling: PaddleOCR's detector resizes every image to its own
+        # det_limit_side_len target, so upscaling here would only be undone
+        return denoised
+
+    def preprocess_image(self, img_path):
+        """preprocess_array for an image file, saved next to it as <name>_proc (returns that path)"""
+        img = cv2.imread(img_path)
+        denoised = self.preprocess_array(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
 
         # Use rsplit to safely handle filenames with multiple dots
         base, ext = img_path.rsplit('.', 1) if '.' in img_path else (img_path, '')
@@ -67,73 +189,236 @@ class FolderOCR:
     # ----------------------------
     def run_ocr(self, img):
         try:
-            # Convert PIL Image to numpy array
-            img_array = np.array(img)
-            
-            result = self.ocr.ocr(img_array)
-            if not result or len(result) == 0:
-                return ""
-            
-            # New PaddleOCR returns OCRResult object
-            ocr_result = result[0]
-            if hasattr(ocr_result, 'get'):
-                texts = ocr_result.get('rec_texts', [])
-                return "\n".join(texts)
-            
-            # Handle list format [[bbox, (text, confidence)], ...]
-            if isinstance(ocr_result, list):
-                texts = [line[1][0] for line in ocr_result if line and len(line) > 1]
-                return "\n".join(texts)
-            
-            return ""
+            return self._ocr_page(img)
         except Exception as e:
             print(f"      WARNING: OCR error on this page: {str(e)}")
             return ""
 
+    def _ocr_page(self, img):
+        """OCR one page, raising on errors"""
+        # Convert PIL Image to numpy array (pages from extract_pdf already are)
+        img_array = img if isinstance(img, np.ndarray) else np.array(img)
+        
+        with self._ocr_lock:
+            result = self.ocr.ocr(img_array)
+        if not result or len(result) == 0:
+            return ""
+        
+        return self._result_text(result[0])
+
+    def run_ocr_batch(self, imgs):
+        """
+        OCR several page arrays, in a single predict() call on PaddleOCR 3.x.
+        Pages found in the OCR cache are not OCR'd again; the others are
+        denoised first unless denoise_mode is "none".
+        """
+        keys = [self._cache_key(img) for img in imgs] if self.cache_dir else [None] * len(imgs)
+        texts = [self._cached_text(key) for key in keys]
+        todo = [n for n, text in enumerate(texts) if text is None]
+        
+        pages = [imgs[n] for n in todo]
+        if self.denoise_mode != "none":
+            # Back to 3 channels, the layout PaddleOCR's models take
+            pages = [cv2.cvtColor(self.preprocess_array(page), cv2.COLOR_GRAY2RGB) for page in pages]
+        for n, text in zip(todo, self._ocr_pages(pages)):
+            if text is not None:
+                self._cache_text(keys[n], text)
+            texts[n] = text or ""
+        return texts
+
+    def _ocr_pages(self, imgs):
+        """OCR page arrays, returning each page's text (None where OCR failed)"""
+        if len(imgs) > 1 and hasattr(self.ocr, 'predict'):
+            try:
+                with self._ocr_lock:
+                    results = list(self.ocr.predict(imgs))
+                if len(results) == len(imgs):
+                    return [self._result_text(ocr_result) for ocr_result in results]
+            except Exception as e:
+                print(f"      WARNING: Batched OCR failed, retrying page by page: {str(e)}")
+        
+        # PaddleOCR 2.x takes one image per call
+        texts = []
+        for img in imgs:
+            try:
+                texts.append(self._ocr_page(img))
+            except Exception as e:
+                print(f"      WARNING: OCR error on this page: {str(e)}")
+                texts.append(None)
+        return texts
+
+    def _result_text(self, ocr_result):
+        """Text of one page's PaddleOCR result"""
+        if not ocr_result:
+            return ""
+        
+        # New PaddleOCR returns OCRResult object
+        if hasattr(ocr_result, 'get'):
+            texts = ocr_result.get('rec_texts', [])
+            return "\n".join(texts)
+        
+        # Handle list format [[bbox, (text, confidence)], ...]
+        if isinstance(ocr_result, list):
+            texts = [line[1][0] for line in ocr_result if line and len(line) > 1]
+            return "\n".join(texts)
+        
+        return ""
+
+    # ----------------------------
+    # OCR cache
+    # ----------------------------
+    def _cache_key(self, img_array):
+        """Content hash of a rendered page (pixels and shape), language and OCR version"""
+        hasher = hashlib.blake2b(self._cache_salt, digest_size=16)
+        hasher.update(str(img_array.shape).encode())
+        hasher.update(np.ascontiguousarray(img_array))
+        return hasher.hexdigest()
+
+    def _cached_text(self, key):
+        """Cached OCR text for a page key, or None"""
+        if key is None:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.txt"), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _cache_text(self, key, text):
+        """Store a page's OCR text (written to a temp file and renamed, so readers never see part of it)"""
+        if key is None:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, os.path.join(self.cache_dir, f"{key}.txt"))
+        except OSError as e:
+            print(f"      WARNING: Could not cache OCR text: {str(e)}")
+
     # ----------------------------
     # Extract text from PDF
     # ----------------------------
-    def extract_pdf(self, pdf_path):
-        print(f"\nProcessing: {pdf_path}")
+    def _text_layer_pages(self, pdf_path, total_pages):
+        """
+        {page number: embedded text} for the pages of a digitally generated PDF
+        whose text layer can be used as is (empty without PyMuPDF)
+        """
+        if pymupdf is None:
+            return {}
         try:
-            # Get page count first without loading all pages
-            from pdf2image.pdf2image import pdfinfo_from_path
-            info = pdfinfo_from_path(pdf_path)
-            total_pages = info.get('Pages', 0)
-            
-            text_chunks = []
+            with pymupdf.open(pdf_path) as doc:
+                texts = [doc[i].get_text().strip() for i in range(min(doc.page_count, total_pages))]
+        except Exception as e:
+            print(f"   WARNING: Could not read text layer: {str(e)}")
+            return {}
+        
+        pages = {}
+        for i, text in enumerate(texts, 1):
+            alnum = sum(c.isalnum() for c in text)
+            # Scanned pages have little or no text; legacy Devanagari fonts
+            # (Shree-Lipi, Kruti Dev, ...) extract as Latin-1 gibberish
+            latin1 = sum(1 for c in text if '\x80' <= c <= '\xff')
+            if alnum >= MIN_TEXT_LAYER_CHARS and latin1 <= alnum * 0.05:
+                pages[i] = text
+        return pages
+
+    def _rasterize_pages(self, pdf_path, page_numbers, page_queue, stop, batch_size=10):
+        """Render the given pages batch by batch and queue (page number, array), then None"""
+        try:
+            # Consecutive pages are rendered together, at most batch_size per call
+            batches = []
+            for page in page_numbers:
+                if batches and page == batches[-1][1] + 1 and page - batches[-1][0] < batch_size:
+                    batches[-1][1] = page
+                else:
+                    batches.append([page, page])
             
-            # Process in batches of 10 pages to manage memory
-            batch_size = 10
-            for start_page in range(1, total_pages + 1, batch_size):
-                end_page = min(start_page + batch_size - 1, total_pages)
+            for start_page, end_page in batches:
+                if stop.is_set():
+                    break
                 
                 try:
-                    # Load only current batch
+                    # Load only current batch, split across one pdftoppm process per thread
                     pages = convert_from_path(
                         pdf_path, 
                         dpi=self.dpi,
                         first_page=start_page,
-                        last_page=end_page
+                        last_page=end_page,
+                        thread_count=max(1, min(os.cpu_count() or 1, end_page - start_page + 1))
                     )
-                    
-                    for i, page in enumerate(pages, start_page):
-                        try:
-                            print(f"   -> OCR: Page {i}/{total_pages}")
-                            text = self.run_ocr(page)
-                            if text.strip():
-                                text_chunks.append(text)
-                        except Exception as e:
-                            print(f"      WARNING: Skipping page {i} due to error: {str(e)}")
-                            continue
-                    
-                    # Clear memory after each batch
-                    del pages
-                    
                 except Exception as e:
                     print(f"   WARNING: Error processing batch {start_page}-{end_page}: {str(e)}")
                     continue
+                
+                for i, page in enumerate(pages, start_page):
+                    page_queue.put((i, np.array(page)))
+                    page.close()
+                
+                # Clear memory after each batch
+                del pages
+        finally:
+            page_queue.put(None)
+
+    def extract_pdf(self, pdf_path):
+        print(f"\nProcessing: {pdf_path}")
+        try:
+            # Get page count first without loading all pages
+            from pdf2image.pdf2image import pdfinfo_from_path
+            info = pdfinfo_from_path(pdf_path)
+            total_pages = info.get('Pages', 0)
+            
+            # Pages with a usable text layer skip rendering and OCR
+            page_texts = self._text_layer_pages(pdf_path, total_pages)
+            if page_texts:
+                print(f"   Using embedded text for {len(page_texts)}/{total_pages} pages")
+            ocr_pages = [i for i in range(1, total_pages + 1) if i not in page_texts]
+            
+            # Pages are rasterized (poppler + PIL -> numpy) on a background thread
+            # while this thread runs OCR, so PaddleOCR doesn't wait on pdftoppm.
+            # The queue holds at most one batch (10 pages) ahead to cap memory.
+            # Each OCR call takes every page already rendered, up to ocr_batch_size
+            batch_size = 10
+            page_queue = queue.Queue(maxsize=batch_size)
+            stop = threading.Event()
+            producer = threading.Thread(
+                target=self._rasterize_pages,
+                args=(pdf_path, ocr_pages, page_queue, stop, batch_size),
+                daemon=True
+            )
+            producer.start()
+            
+            finished = False
+            try:
+                while not finished:
+                    batch = [page_queue.get()]
+                    while batch[-1] is not None and len(batch) < self.ocr_batch_size:
+                        try:
+                            batch.append(page_queue.get_nowait())
+                        except queue.Empty:
+                            break
+                    if batch[-1] is None:
+                        batch.pop()
+                        finished = True
+                    if not batch:
+                        continue
+                    
+                    # One progress line per OCR call rather than per page
+                    first, last = batch[0][0], batch[-1][0]
+                    print(f"   -> OCR: Page {first}/{total_pages}" if first == last
+                          else f"   -> OCR: Pages {first}-{last}/{total_pages} ({len(batch)} pages)")
+                    texts = self.run_ocr_batch([page for _, page in batch])
+                    for (i, _), text in zip(batch, texts):
+                        page_texts[i] = text
+            finally:
+                if not finished:
+                    # Early exit: stop the producer and unblock it until it ends
+                    stop.set()
+                    while page_queue.get() is not None:
+                        pass
+                producer.join()
             
+            text_chunks = [page_texts[i] for i in sorted(page_texts) if page_texts[i].strip()]
             if not text_chunks:
                 print(f"   WARNING: No text extracted from any page")
                 
@@ -157,13 +442,19 @@ class FolderOCR:
 
         for pdf_name in pdf_files:
             pdf_path = os.path.join(folder_path, pdf_name)
-            extracted_text = self.extract_pdf(pdf_path)
-
-            # Save text
             output_path = os.path.join(
                 output_folder,
                 pdf_name.replace(".pdf", ".txt")
             )
+
+            # Skip PDFs whose text was saved after their last change
+            if os.path.exists(output_path) and os.path.getmtime(output_path) > os.path.getmtime(pdf_path):
+                print(f"Skipping (up to date): {pdf_name}")
+                continue
+
+            extracted_text = self.extract_pdf(pdf_path)
+
+            # Save text
             with open(output_path, "w", encoding="utf-8") as f:
                 f.write(extracted_text)
 
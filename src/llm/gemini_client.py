@@ -3,8 +3,78 @@ Gemini LLM Integration for Real Estate RAG
 Handles communication with Google's Gemini API
 """
 import os
+import unicodedata
+from datetime import datetime
 import google.generativeai as genai
-from typing import Optional
+from typing import Iterator, Optional
+
+# str.translate table deleting every 'So' (Symbol, Other - includes emojis)
+# character; So codepoints are only assigned in planes 0-1
+_SYMBOL_DELETE = dict.fromkeys(cp for cp in range(0x20000) if unicodedata.category(chr(cp)) == 'So')
+
+# System instruction for multilingual_answer
+MULTILINGUAL_SYSTEM_PROMPT = """You are analyzing multiple real estate documents together. Based on the user's question, you can:
+
+1. CHECK COMPLIANCE: If asked about compliance, check if user documents comply with MahaRERA regulations, circulars, orders, or SOPs. Identify any violations, missing clauses, or non-compliant terms.
+
+2. COMPARE DOCUMENTS: If asked to compare, analyze differences and similarities between documents.
+
+3. ANSWER QUESTIONS: Provide comprehensive answers using information from all selected documents.
+
+4. Do every thing user asks but in just provided context.
+
+Always:
+- Use simple, easy-to-understand English. Avoid complex legal jargon or difficult words.
+- Write short sentences. Keep explanations clear and direct.
+- Be specific and reference which document each point comes from
+- For compliance checks, clearly state what is compliant and what is not
+- Cite specific clauses, sections, or requirements
+- Provide actionable recommendations if non-compliance is found
+
+Answer in PLAIN TEXT without markdown formatting.
+        """
+
+# GenerativeModel instances shared across GeminiLLM instances, keyed on
+# (api_key, model_name, system_prompt); None marks an SDK without system_instruction
+_model_cache = {}
+
+
+def _get_model(api_key: str, model_name: str, system_prompt: Optional[str] = None):
+    """Return the cached GenerativeModel for this key/model/system prompt, creating it once"""
+    key = (api_key, model_name, system_prompt)
+    if key not in _model_cache:
+        if system_prompt is None:
+            _model_cache[key] = genai.GenerativeModel(model_name)
+        else:
+            try:
+                _model_cache[key] = genai.GenerativeModel(model_name, system_instruction=system_prompt)
+            except TypeError:  # google-generativeai < 0.5
+                _model_cache[key] = None
+    return _model_cache[key]
+
+
+def _clean_response(text: str) -> str:
+    """Strip Markdown emphasis markers and emojis from generated text"""
+    # Clean up Markdown formatting (stars) if requested
+    text = text.replace('**', '').replace('__', '')
+    
+    # Remove emojis from response using Unicode categories
+    # 'So' = Symbol, Other (includes emojis)
+    # This preserves all language characters (including Marathi) while removing emojis.
+    # ASCII has no 'So' codepoints, so plain-English answers skip the table lookups
+    if text.isascii():
+        return text
+    return text.translate(_SYMBOL_DELETE)
+
+
+def _multilingual_prompt(query: str, context: str) -> str:
+    """Build the user prompt for multilingual_answer"""
+    return f"""Context:
+        {context}
+        
+        Question: {query}
+        
+        Answer:"""
 
 class GeminiLLM:
     def __init__(self, api_key: str, model_name: str = "gemini-2.5-flash"):
@@ -41,7 +111,7 @@ class GeminiLLM:
             
             # Verify model availability
             print(f"Connecting to Gemini ({model_name})...")
-            self.model = genai.GenerativeModel(model_name)
+            self.model = _get_model(api_key, model_name)
             
             # Simple test generation to verify connection
             # We won't run it here to avoid latency during init, 
@@ -49,7 +119,6 @@ class GeminiLLM:
             self.available = True
             
             # Set session start time
-            from datetime import datetime
             self.usage_stats['session_start'] = datetime.now().isoformat()
             
         except Exception as e:
@@ -60,14 +129,47 @@ class GeminiLLM:
         """Check if Gemini is available"""
         return self.available
 
+    def _prepare_request(self, prompt: str, system_prompt: Optional[str]):
+        """Pick the model and prompt for a request and record input usage"""
+        # The system prompt is sent as the system instruction of a model cached per
+        # prompt (no per-call prompt concatenation); SDKs without system_instruction
+        # get it prepended instead
+        model, full_prompt, input_chars = self.model, prompt, len(prompt)
+        if system_prompt:
+            system_model = _get_model(self.api_key, self.model_name, system_prompt)
+            if system_model is not None:
+                model = system_model
+                input_chars += len(system_prompt)
+            else:
+                full_prompt = f"{system_prompt}\n\nUser Query: {prompt}"
+                input_chars = len(full_prompt)
+        
+        # Track input (rough estimate: 4 chars per token, i.e. chars >> 2)
+        stats = self.usage_stats
+        stats['total_input_chars'] += input_chars
+        stats['estimated_input_tokens'] += input_chars >> 2
+        return model, full_prompt
+
+    def _track_output(self, output_chars: int):
+        """Record output usage of a successful request"""
+        stats = self.usage_stats
+        stats['total_output_chars'] += output_chars
+        stats['estimated_output_tokens'] += output_chars >> 2
+        stats['successful_requests'] += 1
+
+    def _finish_response(self, text: str) -> str:
+        """Record output usage and clean up the response text"""
+        self._track_output(len(text))
+        return _clean_response(text)
+
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """
         Generate response from Gemini
         
         Args:
             prompt: User query/prompt
-            system_prompt: Optional system context (Gemini supports this via system_instruction in newer versions, 
-                         or we can prepend it)
+            system_prompt: Optional system context (sent as system_instruction, or
+                         prepended on SDKs that don't support it)
                          
         Returns:
             Generated text response
@@ -78,46 +180,82 @@ class GeminiLLM:
         self.usage_stats['total_requests'] += 1
             
         try:
-            # Construct the full prompt
-            full_prompt = prompt
-            if system_prompt:
-                # For simplicity and compatibility, we'll prepend the system prompt
-                # Newer Gemini API supports system_instruction in constructor, but we initialized already
-                full_prompt = f"{system_prompt}\n\nUser Query: {prompt}"
-            
-            # Track input
-            input_chars = len(full_prompt)
-            self.usage_stats['total_input_chars'] += input_chars
-            self.usage_stats['estimated_input_tokens'] += input_chars // 4  # Rough estimate: 4 chars per token
-            
-            response = self.model.generate_content(full_prompt)
-            text = response.text
+            model, full_prompt = self._prepare_request(prompt, system_prompt)
+            response = model.generate_content(full_prompt)
+            return self._finish_response(response.text)
             
-            # Track output
-            output_chars = len(text)
-            self.usage_stats['total_output_chars'] += output_chars
-            self.usage_stats['estimated_output_tokens'] += output_chars // 4
-            self.usage_stats['successful_requests'] += 1
-            
-            # Clean up Markdown formatting (stars) if requested
-            text = text.replace('**', '').replace('__', '')
-            
-            # Remove emojis from response using Unicode categories
-            # 'So' = Symbol, Other (includes emojis)
-            # This preserves all language characters (including Marathi) while removing emojis
-            import unicodedata
-            text = ''.join(c for c in text if unicodedata.category(c)[0:2] != 'So')
+        except Exception as e:
+            print(f"ERROR: Gemini Generation Error: {str(e)}")
+            self.usage_stats['failed_requests'] += 1
+            return f"Error generating response: {str(e)}"
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """
+        Async variant of generate() using generate_content_async, so an event loop
+        can keep several Gemini requests in flight at once
+        
+        Args:
+            prompt: User query/prompt
+            system_prompt: Optional system context (as in generate())
+                         
+        Returns:
+            Generated text response
+        """
+        if not self.available or not self.model:
+            return "Gemini is not available."
+        
+        self.usage_stats['total_requests'] += 1
             
-            return text
+        try:
+            model, full_prompt = self._prepare_request(prompt, system_prompt)
+            response = await model.generate_content_async(full_prompt)
+            return self._finish_response(response.text)
             
         except Exception as e:
             print(f"ERROR: Gemini Generation Error: {str(e)}")
             self.usage_stats['failed_requests'] += 1
             return f"Error generating response: {str(e)}"
     
+    def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Iterator[str]:
+        """
+        Streaming variant of generate(): yields cleaned text pieces as Gemini
+        produces them (usage is recorded once the stream completes)
+        
+        Args:
+            prompt: User query/prompt
+            system_prompt: Optional system context (as in generate())
+        """
+        if not self.available or not self.model:
+            yield "Gemini is not available."
+            return
+        
+        self.usage_stats['total_requests'] += 1
+        
+        try:
+            model, full_prompt = self._prepare_request(prompt, system_prompt)
+            output_chars = 0
+            pending = ''
+            for chunk in model.generate_content(full_prompt, stream=True):
+                piece = chunk.text
+                output_chars += len(piece)
+                # Hold back a trailing run of '*'/'_' so a '**' or '__' split
+                # across chunks is still removed
+                text = pending + piece
+                head = text.rstrip('*_')
+                pending = text[len(head):]
+                if head:
+                    yield _clean_response(head)
+            if pending:
+                yield _clean_response(pending)
+            self._track_output(output_chars)
+            
+        except Exception as e:
+            print(f"ERROR: Gemini Generation Error: {str(e)}")
+            self.usage_stats['failed_requests'] += 1
+            yield f"Error generating response: {str(e)}"
+    
     def get_usage_stats(self) -> dict:
         """Get current usage statistics"""
-        from datetime import datetime
         stats = self.usage_stats.copy()
         stats['model'] = self.model_name
         stats['is_available'] = self.available
@@ -126,7 +264,6 @@ class GeminiLLM:
     
     def reset_usage_stats(self):
         """Reset usage statistics"""
-        from datetime import datetime
         self.usage_stats = {
             'total_requests': 0,
             'successful_requests': 0,
@@ -149,32 +286,12 @@ class GeminiLLM:
         Returns:
             Answer string
         """
-        system_prompt = """You are analyzing multiple real estate documents together. Based on the user's question, you can:
-
-1. CHECK COMPLIANCE: If asked about compliance, check if user documents comply with MahaRERA regulations, circulars, orders, or SOPs. Identify any violations, missing clauses, or non-compliant terms.
+        return self.generate(_multilingual_prompt(query, context), MULTILINGUAL_SYSTEM_PROMPT)
 
-2. COMPARE DOCUMENTS: If asked to compare, analyze differences and similarities between documents.
+    def multilingual_answer_stream(self, query: str, context: str) -> Iterator[str]:
+        """Streaming variant of multilingual_answer() built on generate_stream()"""
+        return self.generate_stream(_multilingual_prompt(query, context), MULTILINGUAL_SYSTEM_PROMPT)
 
-3. ANSWER QUESTIONS: Provide comprehensive answers using information from all selected documents.
-
-4. Do every thing user asks but in just provided context.
-
-Always:
-- Use simple, easy-to-understand English. Avoid complex legal jargon or difficult words.
-- Write short sentences. Keep explanations clear and direct.
-- Be specific and reference which document each point comes from
-- For compliance checks, clearly state what is compliant and what is not
-- Cite specific clauses, sections, or requirements
-- Provide actionable recommendations if non-compliance is found
-
-Answer in PLAIN TEXT without markdown formatting.
-        """
-        
-        prompt = f"""Context:
-        {context}
-        
-        Question: {query}
-        
-        Answer:"""
-        
-        return self.generate(prompt, system_prompt)
+    async def amultilingual_answer(self, query: str, context: str) -> str:
+        """Async variant of multilingual_answer() built on agenerate()"""
+        return await self.agenerate(_multilingual_prompt(query, context), MULTILINGUAL_SYSTEM_PROMPT)
@@ -17,18 +17,82 @@ import json
 from datetime import datetime
 import time
 import os
+import hashlib
 import logging
+import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
 import numpy as np
-from pdf2image import convert_from_bytes
+from pdf2image import convert_from_bytes, pdfinfo_from_bytes
 from pathlib import Path
-from paddleocr import PaddleOCR
+from ocr_engine import _create_ocr_engine, _paddle_has_gpu
+
+try:
+    import orjson  # optional - much faster metadata save/load
+except ImportError:
+    orjson = None
+
+try:
+    import pymupdf  # optional - reads the text layer of digitally generated PDFs
+except ImportError:
+    try:
+        import fitz as pymupdf  # PyMuPDF < 1.24
+    except ImportError:
+        pymupdf = None
+
+try:
+    import lxml  # optional - C parser backend for BeautifulSoup, faster than html.parser
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Numeric listing dates accepted by _parse_date (same day/month/year ranges as
+# strptime's %d/%m/%Y; out-of-range values are rejected by datetime())
+_DMY_DATE_RE = re.compile(r'(0?[1-9]|[12][0-9]|3[01])([/.-])(0?[1-9]|1[0-2])\2([0-9]{4})$')
+_ISO_DATE_RE = re.compile(r'([0-9]{4})-(0?[1-9]|1[0-2])-(0?[1-9]|[12][0-9]|3[01]| [1-9])$')
+
+
+def _ocr_result_lines(ocr_result):
+    """Extract the text lines from one page's PaddleOCR result."""
+    if not ocr_result:
+        return []
+    # Handle new PaddleOCR OCRResult object
+    if hasattr(ocr_result, 'get'):
+        return ocr_result.get('rec_texts', [])
+    # Handle list format [[bbox, (text, confidence)], ...]
+    if isinstance(ocr_result, list):
+        return [line[1][0] for line in ocr_result if line and len(line) > 1]
+    return []
+
+
+# Per-process PaddleOCR engine for page OCR worker processes
+_worker_ocr = None
+
+
+def _init_ocr_worker(cpu_threads):
+    global _worker_ocr
+    _worker_ocr = _create_ocr_engine(_paddle_has_gpu(), cpu_threads, log=logging.getLogger(__name__).info)
+
+
+def _ocr_page_worker(img_array):
+    """OCR one page in a worker process, returning its text lines"""
+    if hasattr(_worker_ocr, 'predict'):
+        result = list(_worker_ocr.predict(img_array))
+    else:
+        result = _worker_ocr.ocr(img_array)
+    return _ocr_result_lines(result[0] if result else None)
+
+# _should_download sentinel for files missing from metadata["documents"]
+_NOT_TRACKED = object()
 
 class MahaRERA_FullScraper:
     """
     Combined scraper that discovers and processes PDFs
     """
     
-    def __init__(self, output_dir="extracted_text", metadata_file="extracted_text/metadata.json"):
+    def __init__(self, output_dir="extracted_text", metadata_file="extracted_text/metadata.json", ocr_workers=1):
         # --- Setup Logging ---
         logging.basicConfig(
             level=logging.INFO,
@@ -45,6 +109,7 @@ class MahaRERA_FullScraper:
         self.metadata_file = Path(metadata_file)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.combined_file = self.output_dir / "all_documents_combined.txt"
+        self.ocr_cache = self._open_ocr_cache()
         
         # --- Statistics ---
         self.stats = {
@@ -58,6 +123,7 @@ class MahaRERA_FullScraper:
         }
         
         # --- Network Setup ---
+        self.download_workers = 4  # Concurrent PDF downloads while OCR runs
         self.session = requests.Session()
         retries = Retry(
             total=3, 
@@ -65,7 +131,13 @@ class MahaRERA_FullScraper:
             status_forcelist=[500, 502, 503, 504],
             allowed_methods=["GET"]
         )
-        adapter = HTTPAdapter(max_retries=retries)
+        # Keep-alive pool per host sized so every download thread (plus a listing
+        # page fetch) reuses a connection instead of opening and discarding one
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max(10, self.download_workers * 2),
+            max_retries=retries
+        )
         self.session.mount('https://', adapter)
         self.session.mount('http://', adapter)
         self.session.headers.update({
@@ -81,9 +153,12 @@ class MahaRERA_FullScraper:
         
         # --- PaddleOCR Setup (multilingual support) ---
         self.logger.info("Initializing PaddleOCR for scraper...")
-        self.ocr = PaddleOCR(lang="mr", use_angle_cls=True)  # Marathi includes English
+        self.ocr = _create_ocr_engine(_paddle_has_gpu(), log=self.logger.info)
+        self.ocr_workers = ocr_workers  # > 1: OCR the pages of each PDF in this many processes
+        self._ocr_pool = None
         self.logger.info("PaddleOCR ready for scraper")
         self.max_pdf_size_mb = 50  # Skip PDFs larger than 50MB
+        self.page_ocr_cache_size = 2000  # Rendered-page hash -> OCR text entries kept in ocr_cache.sqlite
         
         # --- Monitoring Pages ---
         # Note: regulations, forms, rules pages return 404 as of Dec 2024
@@ -115,10 +190,43 @@ class MahaRERA_FullScraper:
         
         # --- Load Metadata ---
         self.metadata = self._load_metadata()
+        # Page texts used to be cached in the metadata file; move them to the OCR cache
+        old_page_cache = self.metadata.pop("page_ocr_cache", None)
+        if old_page_cache:
+            self._store_page_texts(old_page_cache)
+    
+    def _open_ocr_cache(self):
+        """
+        Open the OCR cache kept next to the output: PDF SHA-256 -> extracted text,
+        and rendered-page hash -> OCR text ('used' orders pages by last use).
+        """
+        db = sqlite3.connect(self.output_dir / "ocr_cache.sqlite")
+        db.execute("CREATE TABLE IF NOT EXISTS ocr_text (sha256 TEXT PRIMARY KEY, text TEXT)")
+        db.execute("CREATE TABLE IF NOT EXISTS page_text (hash TEXT PRIMARY KEY, text TEXT, used INTEGER)")
+        db.commit()
+        return db
+    
+    def _cached_page_texts(self, page_keys):
+        """OCR text of the rendered pages with these hashes that are cached, as {hash: text}."""
+        page_keys = list(page_keys)
+        placeholders = ",".join("?" * len(page_keys))
+        return dict(self.ocr_cache.execute(f"SELECT hash, text FROM page_text WHERE hash IN ({placeholders})", page_keys))
+    
+    def _store_page_texts(self, page_texts):
+        """Save {hash: text} page OCR results as the most recently used, keeping at most page_ocr_cache_size pages."""
+        used = self.ocr_cache.execute("SELECT COALESCE(MAX(used), 0) FROM page_text").fetchone()[0]
+        self.ocr_cache.executemany("INSERT OR REPLACE INTO page_text VALUES (?, ?, ?)",
+                                   [(key, text, used + n) for n, (key, text) in enumerate(page_texts.items(), 1)])
+        # Drop the least recently used pages
+        self.ocr_cache.execute("DELETE FROM page_text WHERE hash NOT IN (SELECT hash FROM page_text ORDER BY used DESC LIMIT ?)",
+                               (self.page_ocr_cache_size,))
+        self.ocr_cache.commit()
     
     def _load_metadata(self):
         """Load metadata from JSON file."""
         if self.metadata_file.exists():
+            if orjson is not None:
+                return orjson.loads(self.metadata_file.read_bytes())
             with open(self.metadata_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
         return {
@@ -132,21 +240,24 @@ class MahaRERA_FullScraper:
         
         # Atomic write: write to temp file, then rename
         temp_file = self.metadata_file.with_suffix('.tmp')
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, indent=2, fp=f)
+        if orjson is not None:
+            temp_file.write_bytes(orjson.dumps(self.metadata, option=orjson.OPT_INDENT_2))
+        else:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.metadata, indent=2, fp=f)
         
         # Atomic rename (replaces existing file)
         temp_file.replace(self.metadata_file)
         self.logger.info(f"Metadata saved to {self.metadata_file}")
     
-    def _is_compliance_document(self, title, url):
-        """Check if document is compliance-related (not case-specific)."""
-        text = f"{title} {url}".lower()
+    def _is_compliance_document(self, title_lower, url_lower):
+        """Check if document is compliance-related (not case-specific), given its lowercased title and URL."""
+        text = f"{title_lower} {url_lower}"
         
         # First check exclusions
         for keyword in self.exclusion_keywords:
             if keyword in text:
-                self.logger.debug(f"Excluding (case-specific): {title}")
+                self.logger.debug("Excluding (case-specific): %s", title_lower)
                 return False
         
         # Then check if it matches compliance keywords
@@ -160,19 +271,29 @@ class MahaRERA_FullScraper:
         """Parse date string to YYYY-MM-DD format."""
         if not date_str:
             return None
+        date_str = date_str.strip()
         
-        date_patterns = [
-            "%d/%m/%Y",
-            "%d-%m-%Y",
-            "%Y-%m-%d",
-            "%d.%m.%Y",
-            "%d %B %Y",
-            "%d %b %Y"
-        ]
+        # Numeric dates (dd/mm/yyyy, dd-mm-yyyy, dd.mm.yyyy, yyyy-mm-dd) are
+        # matched directly instead of trying each strptime pattern in turn
+        match = _DMY_DATE_RE.match(date_str)
+        if match:
+            day, month, year = match.group(1, 3, 4)
+        else:
+            match = _ISO_DATE_RE.match(date_str)
+            if match:
+                year, month, day = match.groups()
+        if match:
+            try:
+                return datetime(int(year), int(month), int(day)).strftime("%Y-%m-%d")
+            except ValueError:
+                return None
         
-        for pattern in date_patterns:
+        # Only month-name dates ("5 January 2024", "5 Jan 2024") are left
+        if not any(c.isalpha() for c in date_str):
+            return None
+        for pattern in ("%d %B %Y", "%d %b %Y"):
             try:
-                dt = datetime.strptime(date_str.strip(), pattern)
+                dt = datetime.strptime(date_str, pattern)
                 return dt.strftime("%Y-%m-%d")
             except ValueError:
                 continue
@@ -181,10 +302,12 @@ class MahaRERA_FullScraper:
     
     def _should_download(self, filename, date_str):
         """Check if document should be downloaded based on metadata."""
-        if filename not in self.metadata["documents"]:
+        # One dict lookup; stored dates may be None, so absence uses a sentinel.
+        # Dates are ISO "YYYY-MM-DD" strings, which compare chronologically as-is
+        existing_date = self.metadata["documents"].get(filename, _NOT_TRACKED)
+        if existing_date is _NOT_TRACKED:
             return True
         
-        existing_date = self.metadata["documents"][filename]
         if date_str and existing_date:
             return date_str > existing_date
         
@@ -203,6 +326,56 @@ class MahaRERA_FullScraper:
         }
         return precedence_map.get(category, 0)
     
+    def _parse_listing(self, content, category):
+        """Parse a listing page into PDF entries (not yet checked against the keyword lists or metadata)."""
+        entries = []
+        soup = BeautifulSoup(content, HTML_PARSER)
+        
+        # Find table rows
+        rows = soup.find_all('tr')
+        
+        for row in rows:
+            cells = row.find_all('td')
+            if len(cells) < 2:
+                continue
+            
+            # Find PDF link (handle query parameters)
+            link = row.find('a', href=lambda x: x and ('.pdf' in x.lower()))
+            if not link:
+                continue
+            
+            pdf_url = link['href']
+            if not pdf_url.startswith('http'):
+                # Ensure leading slash for relative URLs
+                if not pdf_url.startswith('/'):
+                    pdf_url = '/' + pdf_url
+                pdf_url = 'https://maharera.maharashtra.gov.in' + pdf_url
+            elif 'maharera.maharashtra.gov.in' not in pdf_url:
+                # Skip external domain PDFs
+                self.logger.debug(f"Skipping external URL: {pdf_url}")
+                continue
+            
+            title = link.text.strip()
+            # Extract filename, removing query parameters
+            filename = pdf_url.split('/')[-1].split('?')[0].split('#')[0]
+            if not filename or not filename.endswith('.pdf'):
+                self.logger.debug(f"Invalid filename from URL: {pdf_url}")
+                continue
+            
+            # Extract date from first cell
+            date_str = cells[0].text.strip() if cells else None
+            parsed_date = self._parse_date(date_str)
+            
+            entries.append({
+                'url': pdf_url,
+                'filename': filename,
+                'title': title,
+                'category': category,
+                'date': parsed_date
+            })
+        
+        return entries
+    
     def discover_documents(self, dry_run=False):
         """Discover compliance documents from monitoring pages."""
         self.logger.info("\n" + "="*80)
@@ -221,77 +394,67 @@ class MahaRERA_FullScraper:
                 discovered.append(doc)
                 self.logger.info(f"  Found: {doc['title']} ({doc['date']})")
         
+        # Per listing page: validators and the PDF entries parsed from it (unfiltered,
+        # so keyword list changes apply to unchanged listings too)
+        listing_cache = self.metadata.setdefault("listing_cache", {})
+        cache_changed = False
+        
         for category, url in self.monitoring_pages.items():
             self.logger.info(f"\nScanning {category}: {url}")
             
             try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
+                # Conditional GET: an unchanged page answers 304 without a body
+                cached = listing_cache.get(url)
+                if cached and 'entries' not in cached:
+                    cached = None  # saved before entries were cached unfiltered
+                headers = {}
+                if cached:
+                    if cached.get('etag'):
+                        headers['If-None-Match'] = cached['etag']
+                    if cached.get('last_modified'):
+                        headers['If-Modified-Since'] = cached['last_modified']
+                response = self.session.get(url, timeout=30, headers=headers)
                 
-                # Find table rows
-                rows = soup.find_all('tr')
+                if cached and response.status_code == 304:
+                    self.logger.info("  Listing not modified, reusing cached entries")
+                    entries = cached['entries']
+                else:
+                    response.raise_for_status()
+                    body_sha256 = hashlib.sha256(response.content).hexdigest()
+                    if cached and cached.get('body_sha256') == body_sha256:
+                        # Server without conditional GET support, same content
+                        self.logger.info("  Listing unchanged, reusing cached entries")
+                        entries = cached['entries']
+                    else:
+                        entries = self._parse_listing(response.content, category)
+                    listing_cache[url] = {
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'body_sha256': body_sha256,
+                        'entries': entries
+                    }
+                    cache_changed = True
                 
-                for row in rows:
-                    cells = row.find_all('td')
-                    if len(cells) < 2:
-                        continue
-                    
-                    # Find PDF link (handle query parameters)
-                    link = row.find('a', href=lambda x: x and ('.pdf' in x.lower()))
-                    if not link:
-                        continue
-                    
-                    # Verify it's actually a PDF link
-                    href = link.get('href', '')
-                    if '.pdf' not in href.lower():
-                        continue
-                    
-                    pdf_url = href
-                    if not pdf_url.startswith('http'):
-                        # Ensure leading slash for relative URLs
-                        if not pdf_url.startswith('/'):
-                            pdf_url = '/' + pdf_url
-                        pdf_url = 'https://maharera.maharashtra.gov.in' + pdf_url
-                    elif 'maharera.maharashtra.gov.in' not in pdf_url:
-                        # Skip external domain PDFs
-                        self.logger.debug(f"Skipping external URL: {pdf_url}")
-                        continue
-                    
-                    title = link.text.strip()
-                    # Extract filename, removing query parameters
-                    filename = pdf_url.split('/')[-1].split('?')[0].split('#')[0]
-                    if not filename or not filename.endswith('.pdf'):
-                        self.logger.debug(f"Invalid filename from URL: {pdf_url}")
-                        continue
-                    
-                    # Extract date from first cell
-                    date_str = cells[0].text.strip() if cells else None
-                    parsed_date = self._parse_date(date_str)
-                    
-                    # Check if compliance document
-                    if not self._is_compliance_document(title, pdf_url):
+                # Filter against the keyword lists and metadata on every run: documents
+                # that failed to download last time are retried even if the listing
+                # is unchanged
+                for doc in entries:
+                    if not self._is_compliance_document(doc['title'].lower(), doc['url'].lower()):
                         continue
-                    
-                    # Check if should download
-                    if not self._should_download(filename, parsed_date):
-                        self.logger.info(f"  Skipping (exists): {filename}")
+                    if not self._should_download(doc['filename'], doc['date']):
+                        self.logger.info(f"  Skipping (exists): {doc['filename']}")
                         self.stats['skipped_existing'] += 1
                         continue
                     
-                    discovered.append({
-                        'url': pdf_url,
-                        'filename': filename,
-                        'title': title,
-                        'category': category,
-                        'date': parsed_date
-                    })
-                    
-                    self.logger.info(f"  Found: {title} ({parsed_date})")
+                    discovered.append(dict(doc))
+                    self.logger.info(f"  Found: {doc['title']} ({doc['date']})")
                 
             except Exception as e:
                 self.logger.error(f"Error scanning {category}: {e}")
         
+        if cache_changed:
+            self._save_metadata()
+        
         self.stats['discovered'] = len(discovered)
         self.stats['new_documents'] = len(discovered)
         
@@ -302,24 +465,18 @@ class MahaRERA_FullScraper:
     # PROCESSING LOGIC (Simplified Threading)
     # =========================================================================
 
-    def download_and_ocr(self, document):
-        """Download and OCR a single document, return structured dict for RAG system."""
+    def _download_pdf(self, document):
+        """
+        Download and validate a document's PDF.
+        Returns (pdf_bytes, None) on success or (None, failure reason). Only
+        logs, so it is safe to run on the download threads.
+        """
         url = document.get('url', '')
         filename = document.get('filename', 'unknown')
-        title = document.get('title', '')
-        category = document.get('category', 'unknown')
-        date = document.get('date', 'Unknown')
-        
-        self.logger.info(f"Processing: {filename}")
-        
-        # Helper to track failed links
-        def track_failure(reason):
-            self.stats['link_errors'].append({'filename': filename, 'url': url, 'reason': reason})
-            self.stats['ocr_failed'] += 1
         
         # Download PDF with comprehensive error handling
         try:
-            response = self.session.get(url, timeout=60, verify=True)
+            response = self.session.get(url, timeout=60, verify=True, stream=True)
             response.raise_for_status()
         except requests.exceptions.SSLError as e:
             # SSL certificate issues - try without verification for known government domains
@@ -327,76 +484,120 @@ class MahaRERA_FullScraper:
             if any(domain in url for domain in known_domains):
                 self.logger.warning(f"SSL error, retrying without verification: {filename}")
                 try:
-                    response = self.session.get(url, timeout=60, verify=False)
+                    response = self.session.get(url, timeout=60, verify=False, stream=True)
                     response.raise_for_status()
                 except Exception as retry_e:
                     self.logger.error(f"[X] Failed after SSL retry {filename}: {retry_e}")
-                    track_failure(f"SSL retry failed: {retry_e}")
-                    return None
+                    return None, f"SSL retry failed: {retry_e}"
             else:
                 self.logger.error(f"[X] SSL error for {filename}: {e}")
-                track_failure(f"SSL error")
-                return None
+                return None, "SSL error"
         except requests.exceptions.Timeout:
             self.logger.error(f"[X] Timeout downloading {filename} (URL: {url})")
-            track_failure("Timeout (60s)")
-            return None
+            return None, "Timeout (60s)"
         except requests.exceptions.ConnectionError as e:
             self.logger.error(f"[X] Connection error for {filename}: {e}")
-            track_failure("Connection error")
-            return None
+            return None, "Connection error"
         except requests.exceptions.HTTPError as e:
             status_code = e.response.status_code if e.response is not None else 0
             if status_code == 404:
                 self.logger.warning(f"[X] File not found (404): {filename} - URL may be outdated")
-                track_failure("404 Not Found")
+                return None, "404 Not Found"
             elif status_code == 403:
                 self.logger.warning(f"[X] Access forbidden (403): {filename}")
-                track_failure("403 Forbidden")
+                return None, "403 Forbidden"
             elif status_code >= 500:
                 self.logger.warning(f"[X] Server error ({status_code}): {filename} - try again later")
-                track_failure(f"Server error {status_code}")
+                return None, f"Server error {status_code}"
             else:
                 self.logger.error(f"[X] HTTP error ({status_code}) for {filename}: {e}")
-                track_failure(f"HTTP {status_code}")
-            return None
+                return None, f"HTTP {status_code}"
         except Exception as e:
             self.logger.error(f"[X] Unexpected download error for {filename}: {type(e).__name__}: {e}")
-            track_failure(f"{type(e).__name__}")
-            return None
+            return None, f"{type(e).__name__}"
+        
+        # Read the body in chunks, giving up as soon as it passes the size cap
+        # (or before reading anything if Content-Length already does)
+        max_bytes = self.max_pdf_size_mb * 1024 * 1024
+        with response:
+            declared = response.headers.get('Content-Length', '')
+            if declared.isdigit() and int(declared) > max_bytes:
+                size_mb = int(declared) / (1024 * 1024)
+                self.logger.warning(f"[X] Skipping {filename}: too large ({size_mb:.1f}MB > {self.max_pdf_size_mb}MB)")
+                return None, f"Too large ({size_mb:.1f}MB)"
+            try:
+                chunks = []
+                total = 0
+                for chunk in response.iter_content(65536):
+                    total += len(chunk)
+                    if total > max_bytes:
+                        self.logger.warning(f"[X] Skipping {filename}: too large (over {self.max_pdf_size_mb}MB)")
+                        return None, f"Too large (>{self.max_pdf_size_mb}MB)"
+                    chunks.append(chunk)
+                pdf_bytes = b''.join(chunks)
+            except requests.exceptions.ConnectionError as e:
+                self.logger.error(f"[X] Connection error for {filename}: {e}")
+                return None, "Connection error"
+            except Exception as e:
+                self.logger.error(f"[X] Unexpected download error for {filename}: {type(e).__name__}: {e}")
+                return None, f"{type(e).__name__}"
         
         # Validate response content
-        pdf_bytes = response.content
         if not pdf_bytes or len(pdf_bytes) < 1000:
             self.logger.warning(f"[X] Empty or too small response for {filename} ({len(pdf_bytes) if pdf_bytes else 0} bytes)")
-            track_failure("Empty/small response")
-            return None
+            return None, "Empty/small response"
         
         # Check content type - reject HTML responses (redirects/login pages)
         content_type = response.headers.get('Content-Type', '').lower()
         if 'html' in content_type:
             self.logger.warning(f"[X] Received HTML instead of PDF for {filename}: {content_type}")
             self.logger.warning(f"  URL may require auth or has been moved: {url}")
-            track_failure("Received HTML (redirect/login page)")
-            return None
+            return None, "Received HTML (redirect/login page)"
         if 'pdf' not in content_type and 'octet-stream' not in content_type:
             self.logger.warning(f"[X] Unexpected content type for {filename}: {content_type}")
             # Continue anyway - some servers misconfigure headers
         
-        # Check file size
-        size_mb = len(pdf_bytes) / (1024 * 1024)
-        if size_mb > self.max_pdf_size_mb:
-            self.logger.warning(f"[X] Skipping {filename}: too large ({size_mb:.1f}MB > {self.max_pdf_size_mb}MB)")
-            track_failure(f"Too large ({size_mb:.1f}MB)")
-            return None
+        return pdf_bytes, None
+
+    def download_and_ocr(self, document, download=None):
+        """
+        Download and OCR a single document, return structured dict for RAG system.
+        download is an already finished _download_pdf() result, if any.
+        """
+        url = document.get('url', '')
+        filename = document.get('filename', 'unknown')
+        title = document.get('title', '')
+        category = document.get('category', 'unknown')
+        date = document.get('date', 'Unknown')
         
-        # OCR the PDF with error handling
-        try:
-            text = self._ocr_pdf_bytes(pdf_bytes)
-        except Exception as ocr_error:
-            self.logger.error(f"[X] OCR failed for {filename}: {type(ocr_error).__name__}: {ocr_error}")
-            track_failure(f"OCR error: {type(ocr_error).__name__}")
+        self.logger.info(f"Processing: {filename}")
+        
+        # Helper to track failed links
+        def track_failure(reason):
+            self.stats['link_errors'].append({'filename': filename, 'url': url, 'reason': reason})
+            self.stats['ocr_failed'] += 1
+        
+        pdf_bytes, failure = download if download is not None else self._download_pdf(document)
+        if pdf_bytes is None:
+            track_failure(failure)
             return None
+        size_mb = len(pdf_bytes) / (1024 * 1024)
+        
+        # A PDF processed before (often re-listed under another URL/filename)
+        # reuses its stored text instead of being OCR'd again
+        pdf_sha256 = hashlib.sha256(pdf_bytes).hexdigest()
+        cached = self.ocr_cache.execute("SELECT text FROM ocr_text WHERE sha256 = ?", (pdf_sha256,)).fetchone()
+        if cached is not None:
+            text = cached[0]
+            self.logger.info(f"Reusing extracted text for {filename} (same PDF content seen before)")
+        else:
+            # OCR the PDF with error handling
+            try:
+                text = self._ocr_pdf_bytes(pdf_bytes)
+            except Exception as ocr_error:
+                self.logger.error(f"[X] OCR failed for {filename}: {type(ocr_error).__name__}: {ocr_error}")
+                track_failure(f"OCR error: {type(ocr_error).__name__}")
+                return None
         
         # Validate extracted text (at least 100 chars and some alphanumeric content)
         if not text or len(text.strip()) < 100 or not any(c.isalnum() for c in text):
@@ -404,6 +605,10 @@ class MahaRERA_FullScraper:
             track_failure("Insufficient text extracted")
             return None
         
+        if cached is None:
+            self.ocr_cache.execute("INSERT OR REPLACE INTO ocr_text VALUES (?, ?)", (pdf_sha256, text))
+            self.ocr_cache.commit()
+        
         # Update metadata
         self.metadata["documents"][filename] = date
         
@@ -424,53 +629,139 @@ class MahaRERA_FullScraper:
         self.stats['ocr_success'] += 1
         return authority_doc
     
+    def _extract_text_layer(self, pdf_bytes, max_pages):
+        """
+        Return the PDF's embedded text in the same per-page format as OCR, or
+        None when PyMuPDF isn't installed or the text layer can't be trusted
+        (scanned pages, or legacy non-Unicode Devanagari fonts)
+        """
+        if pymupdf is None:
+            return None
+        try:
+            with pymupdf.open(stream=pdf_bytes, filetype='pdf') as doc:
+                if doc.page_count > max_pages:
+                    self.logger.warning(f"PDF has {doc.page_count} pages, processing first {max_pages}")
+                pages = [doc[i].get_text().strip() for i in range(min(doc.page_count, max_pages))]
+        except Exception as e:
+            self.logger.debug("No usable text layer: %s", e)
+            return None
+        
+        # Every page needs real text - a partly scanned PDF still goes to OCR
+        page_alnum = [sum(c.isalnum() for c in page) for page in pages]
+        if not pages or min(page_alnum) < 20 or sum(page_alnum) < 500:
+            return None
+        # Legacy Devanagari fonts (Shree-Lipi, Kruti Dev, ...) extract as Latin-1 gibberish
+        latin1 = sum(1 for page in pages for c in page if '\x80' <= c <= '\xff')
+        if latin1 > sum(page_alnum) * 0.05:
+            return None
+        
+        self.logger.info(f"Using embedded text layer ({len(pages)} pages), OCR skipped")
+        return "\n\n".join(f"--- Page {i+1} ---\n{page}" for i, page in enumerate(pages))
+    
+    def _page_hash(self, img_array):
+        """Exact content hash of a rendered page (pixels and shape)."""
+        hasher = hashlib.blake2b(str(img_array.shape).encode(), digest_size=16)
+        hasher.update(np.ascontiguousarray(img_array))
+        return hasher.hexdigest()
+    
     def _ocr_pdf_bytes(self, pdf_bytes):
-        """Convert PDF bytes to text using PaddleOCR."""
+        """Convert PDF bytes to text, using the PDF's own text layer or PaddleOCR."""
         try:
-            # Convert PDF to images
+            # Limit pages to prevent very long processing times
+            max_pages = 30
+            
+            # Digitally generated PDFs already contain their text; OCR only the rest
+            native_text = self._extract_text_layer(pdf_bytes, max_pages)
+            if native_text is not None:
+                return native_text
+            
+            page_count = pdfinfo_from_bytes(pdf_bytes, poppler_path=self.poppler_path)['Pages']
+            if page_count > max_pages:
+                self.logger.warning(f"PDF has {page_count} pages, processing first {max_pages}")
+            
+            # Convert PDF to images (raw PPM: lossless like PNG, but skips the
+            # zlib encode in pdftoppm and the decode in PIL for every page).
+            # Only the pages we OCR are rasterized; pdf2image splits them across
+            # one pdftoppm process per thread
+            pages = min(page_count, max_pages)
             images = convert_from_bytes(
                 pdf_bytes,
                 poppler_path=self.poppler_path,
                 dpi=150,
-                fmt='png',
-                thread_count=2
+                fmt='ppm',
+                last_page=pages,
+                thread_count=max(1, min(os.cpu_count() or 1, pages))
             )
             
             if not images:
                 self.logger.warning("No images extracted from PDF")
                 return None
             
-            # Limit pages to prevent very long processing times
-            max_pages = 30
-            if len(images) > max_pages:
-                self.logger.warning(f"PDF has {len(images)} pages, processing first {max_pages}")
-                images = images[:max_pages]
+            # Convert PIL Images to numpy arrays for PaddleOCR, closing each image
+            # once converted so the decoded pages aren't held twice
+            img_arrays = []
+            for image in images:
+                img_arrays.append(np.array(image))
+                image.close()
+            del images
             
-            text_parts = []
-            for i, image in enumerate(images):
+            # Pages rendered pixel-identical to a page OCR'd before (repeated cover
+            # pages, letterheads, blank pages) reuse its text; only the first page
+            # with each new hash is OCR'd
+            page_keys = [self._page_hash(img_array) for img_array in img_arrays]
+            page_cache = self._cached_page_texts(set(page_keys))
+            page_texts = [page_cache.get(key) for key in page_keys]
+            first_index = {}
+            for i, key in enumerate(page_keys):
+                if page_texts[i] is None:
+                    first_index.setdefault(key, i)
+            todo = list(first_index.values())
+            if len(todo) < len(img_arrays):
+                self.logger.info(f"Reusing cached OCR text for {len(img_arrays) - len(todo)} of {len(img_arrays)} pages")
+            
+            # With OCR worker processes the pages are OCR'd in parallel; otherwise
+            # PaddleOCR 3.x predict() takes the whole list and batches the pages
+            # through detection/recognition, and older versions OCR one page per call
+            page_futures = None
+            page_results = None
+            if self._ocr_pool is not None and len(todo) > 1:
+                page_futures = [self._ocr_pool.submit(_ocr_page_worker, img_arrays[i]) for i in todo]
+            elif todo and hasattr(self.ocr, 'predict'):
                 try:
-                    # Convert PIL Image to numpy array for PaddleOCR
-                    img_array = np.array(image)
-                    
-                    # Run PaddleOCR
-                    result = self.ocr.ocr(img_array)
-                    
-                    # Extract text from OCR result
-                    page_lines = []
-                    if result and len(result) > 0:
-                        ocr_result = result[0]
-                        # Handle new PaddleOCR OCRResult object
-                        if hasattr(ocr_result, 'get'):
-                            page_lines = ocr_result.get('rec_texts', [])
-                        # Handle list format [[bbox, (text, confidence)], ...]
-                        elif isinstance(ocr_result, list):
-                            page_lines = [line[1][0] for line in ocr_result if line and len(line) > 1]
+                    page_results = list(self.ocr.predict([img_arrays[i] for i in todo]))
+                    if len(page_results) != len(todo):
+                        page_results = None
+                except Exception as batch_error:
+                    self.logger.warning(f"Batched OCR failed, retrying page by page: {batch_error}")
+                    page_results = None
+            
+            for n, i in enumerate(todo):
+                try:
+                    if page_futures is not None:
+                        page_lines = page_futures[n].result()
+                    else:
+                        if page_results is not None:
+                            ocr_result = page_results[n]
+                        else:
+                            # Run PaddleOCR
+                            result = self.ocr.ocr(img_arrays[i])
+                            ocr_result = result[0] if result and len(result) > 0 else None
+                        page_lines = _ocr_result_lines(ocr_result)
                     
-                    page_text = "\n".join(page_lines)
-                    text_parts.append(f"--- Page {i+1} ---\n{page_text}")
+                    page_cache[page_keys[i]] = "\n".join(page_lines)
                 except Exception as page_error:
                     self.logger.warning(f"Error OCR'ing page {i+1}: {page_error}")
+            
+            text_parts = []
+            for i, key in enumerate(page_keys):
+                page_text = page_cache.get(key)
+                if page_text is None:
                     text_parts.append(f"--- Page {i+1} [OCR Error] ---\n")
+                else:
+                    text_parts.append(f"--- Page {i+1} ---\n{page_text}")
+            
+            # Store new pages and mark this PDF's pages as recently used
+            self._store_page_texts({key: page_cache[key] for key in page_keys if key in page_cache})
             
             return "\n\n".join(text_parts)
             
@@ -479,7 +770,7 @@ class MahaRERA_FullScraper:
             return None
     
     def process_all_documents(self, documents):
-        """Process all discovered documents sequentially, return list of authority docs."""
+        """Process all discovered documents (downloads overlapped with OCR), return list of authority docs."""
         if not documents:
             self.logger.info("No documents to process.")
             return []
@@ -491,24 +782,49 @@ class MahaRERA_FullScraper:
         print(f"{'='*60}")
         
         authority_documents = []
-        for idx, doc in enumerate(documents, 1):
-            filename = doc.get('filename', 'unknown')
-            
-            # Progress bar
-            progress = idx / total
-            bar_length = 40
-            filled = int(bar_length * progress)
-            bar = '#' * filled + '-' * (bar_length - filled)
-            percent = progress * 100
-            
-            print(f"\r[{bar}] {percent:5.1f}% ({idx}/{total}) - {filename[:30]:<30}", end='', flush=True)
+        bar_length = 40
+        bar_full = '#' * bar_length
+        bar_empty = '-' * bar_length
+        # Downloads run ahead on a thread pool while this thread OCRs (PaddleOCR
+        # stays on one thread); at most download_workers * 2 PDFs are in flight
+        # or waiting, and results are consumed in document order
+        # Page OCR processes (each loads its own PaddleOCR) live for the whole batch
+        ocr_pool = None
+        if self.ocr_workers > 1:
+            ocr_pool = ProcessPoolExecutor(
+                max_workers=self.ocr_workers,
+                initializer=_init_ocr_worker,
+                initargs=(max(1, (os.cpu_count() or 1) // self.ocr_workers),)
+            )
+        with ThreadPoolExecutor(max_workers=self.download_workers) as pool, (ocr_pool or nullcontext()):
+            self._ocr_pool = ocr_pool
+            pending = deque()
+            doc_iter = iter(documents)
+            for doc in islice(doc_iter, self.download_workers * 2):
+                pending.append(pool.submit(self._download_pdf, doc))
             
-            result = self.download_and_ocr(doc)
-            if result is not None:
-                authority_documents.append(result)
-                print(f"\r[{bar}] {percent:5.1f}% ({idx}/{total}) - [OK] {filename[:30]:<30}")
-            else:
-                print(f"\r[{bar}] {percent:5.1f}% ({idx}/{total}) - [X] {filename[:30]:<30}")
+            for idx, doc in enumerate(documents, 1):
+                filename = doc.get('filename', 'unknown')
+                
+                # Progress bar (prefix and padded name are shared by both lines)
+                progress = idx / total
+                filled = int(bar_length * progress)
+                prefix = f"\r[{bar_full[:filled]}{bar_empty[filled:]}] {progress * 100:5.1f}% ({idx}/{total}) - "
+                name = f"{filename[:30]:<30}"
+                
+                print(prefix + name, end='', flush=True)
+                
+                download = pending.popleft().result()
+                for next_doc in islice(doc_iter, 1):
+                    pending.append(pool.submit(self._download_pdf, next_doc))
+                
+                result = self.download_and_ocr(doc, download)
+                if result is not None:
+                    authority_documents.append(result)
+                    print(f"{prefix}[OK] {name}")
+                else:
+                    print(f"{prefix}[X] {name}")
+        self._ocr_pool = None
         
         print(f"\n{'='*60}")
         print(f"Completed: {len(authority_documents)}/{total} documents processed successfully")
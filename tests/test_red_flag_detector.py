@@ -0,0 +1,116 @@
+"""
+Red flag detector with the optional pcre2 bindings stubbed out
+
+Run from the repository root: python -m unittest discover tests
+"""
+import importlib
+import os
+import re
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'compliance'))
+
+CLAUSES = [
+    "The booking deposit is non-refundable in all cases.",
+    "No refund shall be made if the allottee cancels the booking.",
+    "Possession will be handed over on the agreed date.",
+    "",
+]
+AUTHORITY = [{'text': "The allottee shall be entitled to refund along with interest under section 18."}]
+
+
+class MatchError(Exception):
+    pass
+
+
+class CompileError(Exception):
+    pass
+
+
+class LibraryError(Exception):
+    pass
+
+
+def make_pcre2_stub(compile_error=False):
+    """pcre2 module with the bindings' API: Pattern.match()/scan(), MatchError on no match"""
+    class Pattern:
+        def __init__(self, pattern):
+            # Python re stands in for PCRE2 (Unicode classes mapped back to \d/\w)
+            self._re = re.compile(pattern.replace(r'[\p{L}\p{N}\p{M}_]', r'\w').replace(r'\p{Nd}', r'\d'))
+
+        def match(self, subject, offset=0):
+            m = self._re.search(subject, offset)
+            if m is None:
+                raise MatchError("no match")
+            return m
+
+        def scan(self, subject, offset=0):
+            return iter(self._re.finditer(subject, offset))
+
+    def compile(pattern, jit=False):
+        if compile_error:
+            raise CompileError("JIT compilation failed")
+        return Pattern(pattern)
+
+    module = types.ModuleType('pcre2')
+    module.compile = compile
+    module.exceptions = types.ModuleType('pcre2.exceptions')
+    module.exceptions.MatchError = MatchError
+    module.exceptions.CompileError = CompileError
+    module.exceptions.LibraryError = LibraryError
+    return module
+
+
+def load_detector(pcre2_module):
+    """Import a fresh red_flag_detector with only pcre2 (or no engine) available"""
+    names = ('pcre2', 'pcre2.exceptions', 're2', 'hyperscan', 'red_flag_detector')
+    saved = {name: sys.modules.get(name) for name in names}
+    sys.modules['pcre2'] = pcre2_module
+    sys.modules['pcre2.exceptions'] = pcre2_module.exceptions if pcre2_module else None
+    sys.modules['re2'] = sys.modules['hyperscan'] = None
+    sys.modules.pop('red_flag_detector', None)
+    try:
+        return importlib.import_module('red_flag_detector')
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+def rule_ids(detector, clause):
+    return [flag['rule_id'] for flag in detector.detect_red_flags(clause, AUTHORITY)]
+
+
+class PCRE2ScanTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.plain = load_detector(None)
+
+    def test_fused_scan_uses_match_api(self):
+        detector = load_detector(make_pcre2_stub())
+        scan = detector._fuse_patterns([r"\bno\s+refund\b"])
+        self.assertIsInstance(scan, detector._PCRE2Scan)
+        self.assertTrue(scan.search("there is no refund"))
+        self.assertFalse(scan.search("refund with interest"))
+
+    def test_same_flags_as_re(self):
+        detector = load_detector(make_pcre2_stub())
+        for clause in CLAUSES:
+            self.assertEqual(rule_ids(detector, clause), rule_ids(self.plain, clause))
+        self.assertIn('RF-REFUND-001', rule_ids(detector, CLAUSES[0]))
+        text = " ".join(CLAUSES)
+        self.assertEqual(detector.check_compliance(text), self.plain.check_compliance(text))
+
+    def test_compile_error_falls_back_to_re(self):
+        detector = load_detector(make_pcre2_stub(compile_error=True))
+        self.assertIsInstance(detector._fuse_patterns([r"\bno\s+refund\b"]), re.Pattern)
+        for clause in CLAUSES:
+            self.assertEqual(rule_ids(detector, clause), rule_ids(self.plain, clause))
+
+
+if __name__ == '__main__':
+    unittest.main()